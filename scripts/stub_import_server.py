@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Stub Store Manager Import Server
+
+A small local stand-in for the store manager import endpoint, used to try
+out and test export_configs.py without access to the real import. Every
+POSTed body is saved to a directory; a configurable share of requests can
+fail with 503 to exercise the exporter's retries.
+
+Usage:
+    python stub_import_server.py
+    python stub_import_server.py --port 8081 --save-dir stub_imports --fail-rate 0.2
+"""
+
+import argparse
+import random
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+class StubImportHandler(BaseHTTPRequestHandler):
+    """Accepts configuration uploads and stores them on disk."""
+
+    protocol_version = "HTTP/1.1"
+    save_dir = Path("stub_imports")
+    fail_rate = 0.0
+    lock = threading.Lock()
+    received = 0
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(length)
+
+        if random.random() < self.fail_rate:
+            self._reply(503, "Service temporarily unavailable")
+            return
+
+        if not body.lstrip().startswith(b"<?xml"):
+            self._reply(400, "Body is not an XML document")
+            return
+
+        file_name = self.headers.get("X-Config-File") or Path(self.path).name or "upload.xml"
+        file_name = re.sub(r"[^A-Za-z0-9._-]", "_", file_name)
+        (self.save_dir / file_name).write_bytes(body)
+
+        with self.lock:
+            type(self).received += 1
+        self._reply(200, f"Imported {file_name}")
+
+    def _reply(self, status: int, message: str) -> None:
+        body = message.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        print(f"   {self.address_string()} - {format % args}")
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Run a local stub of the store manager import endpoint")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                       help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8081,
+                       help="Port to listen on (default: 8081)")
+    parser.add_argument("--save-dir", type=str, default="stub_imports",
+                       help="Directory where received files are saved (default: stub_imports)")
+    parser.add_argument("--fail-rate", type=float, default=0.0,
+                       help="Share of requests answered with 503, 0.0-1.0 (default: 0.0)")
+
+    args = parser.parse_args()
+
+    save_dir = Path(args.save_dir)
+    save_dir.mkdir(parents=True, exist_ok=True)
+    StubImportHandler.save_dir = save_dir
+    StubImportHandler.fail_rate = args.fail_rate
+
+    server = ThreadingHTTPServer((args.host, args.port), StubImportHandler)
+    server.daemon_threads = True
+    print(f"🧪 Stub import server listening on http://{args.host}:{args.port} - saving to {save_dir}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n👋 Stub import server stopped ({StubImportHandler.received} files received)")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
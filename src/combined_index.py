@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Combined Configuration Index
+
+Random access into a generated all_stores_config.xml. A sidecar index
+(<config>.idx) records the byte offset and length of every store's
+GKR-Store node together with the shared header and footer, so a single
+store can be viewed, extracted as a standalone configuration or validated
+by memory-mapping the file and slicing it, without parsing the other
+stores. The generator writes the index next to every combined file; it is
+rebuilt automatically when the file changes.
+
+Usage:
+    python combined_index.py --file output/all_stores_config.xml
+    python combined_index.py --file output/all_stores_config.xml --store 1161 --show
+    python combined_index.py --file output/all_stores_config.xml --store 1161 --extract extracted
+    python combined_index.py --file output/all_stores_config.xml --store 1161 --validate
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import unescape
+
+from validate_config import ConfigValidator
+
+# Bump when the sidecar layout changes so old indexes are rebuilt
+INDEX_VERSION = 1
+
+STORE_START = re.compile(rb'<node\b[^>]*\salias="GKR-Store"[^>]*>')
+RSID = re.compile(rb'\srsid="([^"]*)"')
+
+
+class CombinedConfigIndex:
+    """Memory-mapped combined configuration with a sidecar store offset index."""
+
+    def __init__(self, config_file: str, index_file: Optional[str] = None):
+        self.config_file = Path(config_file)
+        self.index_file = Path(index_file) if index_file else Path(f"{config_file}.idx")
+        # rsid -> [offset, length] of its GKR-Store node
+        self.stores: Dict[str, List[int]] = {}
+        # Byte ranges of everything before the first and after the last store node
+        self.header: List[int] = [0, 0]
+        self.footer: List[int] = [0, 0]
+        self.duplicates: List[str] = []
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+
+    def __enter__(self) -> "CombinedConfigIndex":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """Load (or build) the index and memory-map the configuration file."""
+        if self._map is not None:
+            return
+        stat = self.config_file.stat()
+        if stat.st_size == 0:
+            raise ValueError(f"Configuration file '{self.config_file}' is empty")
+        self._file = open(self.config_file, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if not self._load_index(stat):
+            self.build_index(stat)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _load_index(self, stat: os.stat_result) -> bool:
+        """Load the sidecar index if it exists and matches the configuration file."""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (index.get("version") != INDEX_VERSION or index.get("source_size") != stat.st_size
+                or index.get("source_mtime_ns") != stat.st_mtime_ns):
+            return False
+        self.stores = index["stores"]
+        self.header = index["header"]
+        self.footer = index["footer"]
+        self.duplicates = index.get("duplicates", [])
+        return True
+
+    def build_index(self, stat: Optional[os.stat_result] = None) -> None:
+        """Scan the whole file once and write the sidecar index."""
+        stat = stat or self.config_file.stat()
+        if self._map is not None:
+            self._scan(self._map)
+        else:
+            self._scan(self.config_file.read_bytes())
+
+        index = {
+            "version": INDEX_VERSION,
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "header": self.header,
+            "footer": self.footer,
+            "stores": self.stores,
+            "duplicates": self.duplicates,
+        }
+        temp_file = self.index_file.with_name(self.index_file.name + ".tmp")
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f, separators=(',', ':'))
+            os.replace(temp_file, self.index_file)
+            print(f"✓ Built store index for {len(self.stores)} stores: {self.index_file}")
+        except OSError as e:
+            # Read-only location: the index is still usable for this run
+            print(f"⚠️  Warning: Could not write store index '{self.index_file}': {e}")
+
+    def _scan(self, data: Any) -> None:
+        """
+        Record the byte range of each GKR-Store node. Store nodes are closed
+        by the first </node> at their own indentation, as pretty-printed by
+        the generator.
+        """
+        self.stores, self.duplicates = {}, []
+        first_line = last_end = None
+        pos = 0
+        while True:
+            match = STORE_START.search(data, pos)
+            if match is None:
+                break
+            rsid_match = RSID.search(match.group(0))
+            if rsid_match is None:
+                raise ValueError(f"Store node without rsid at byte {match.start()} of '{self.config_file}'")
+            rsid = unescape(rsid_match.group(1).decode('utf-8'), {"&quot;": '"'})
+
+            line_start = data.rfind(b"\n", 0, match.start()) + 1
+            if match.group(0).endswith(b"/>"):
+                end = match.end()
+            else:
+                indent = data[line_start:match.start()]
+                close = data.find(b"\n" + indent + b"</node>", match.end())
+                if close == -1:
+                    raise ValueError(f"Store node {rsid} is not closed in '{self.config_file}'")
+                end = close + 1 + len(indent) + len(b"</node>")
+
+            if rsid in self.stores:
+                self.duplicates.append(rsid)
+            self.stores[rsid] = [match.start(), end - match.start()]
+            if first_line is None:
+                first_line = line_start
+            last_end = pos = end
+
+        if first_line is None:
+            raise ValueError(f"No store nodes found in '{self.config_file}'")
+        self.header = [0, first_line]
+        self.footer = [last_end, len(data)]
+
+    def _slice(self, start: int, end: int) -> bytes:
+        if self._map is None:
+            self.open()
+        return self._map[start:end]
+
+    def rsids(self) -> List[str]:
+        """All store IDs in the file, in file order."""
+        if self._map is None:
+            self.open()
+        return list(self.stores)
+
+    def store_node(self, rsid: str) -> Optional[bytes]:
+        """Raw bytes of one store's GKR-Store node, or None if it is not in the file."""
+        if self._map is None:
+            self.open()
+        span = self.stores.get(rsid)
+        if span is None:
+            return None
+        return self._slice(span[0], span[0] + span[1])
+
+    def store_document(self, rsid: str) -> Optional[bytes]:
+        """
+        A standalone configuration for one store: the shared header, the
+        store's node and the footer.
+        """
+        node = self.store_node(rsid)
+        if node is None:
+            return None
+        offset = self.stores[rsid][0]
+        line_start = self._map.rfind(b"\n", 0, offset) + 1
+        return (self._slice(*self.header) + self._slice(line_start, offset) + node
+                + self._slice(*self.footer))
+
+    def extract_store(self, rsid: str, output_dir: str = "output") -> Optional[str]:
+        """Write a store's standalone configuration; returns the file, or None if unknown."""
+        document = self.store_document(rsid)
+        if document is None:
+            return None
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        output_file = f"{output_dir}/store_{rsid}_config.xml"
+        with open(output_file, 'wb') as f:
+            f.write(document)
+        return output_file
+
+    def validate_store(self, rsid: str, validator: Optional[ConfigValidator] = None) -> Optional[Dict[str, Any]]:
+        """Validate one store's standalone configuration in memory, or None if unknown."""
+        document = self.store_document(rsid)
+        if document is None:
+            return None
+        validator = validator or ConfigValidator()
+        label = f"{self.config_file} [store {rsid}]"
+        try:
+            root = ET.fromstring(document)
+        except ET.ParseError as e:
+            return {"file": label, "valid": False, "errors": [f"XML parsing error: {e}"], "warnings": []}
+        return validator.validate_element(root, label)
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Query single stores of a combined configuration file")
+    parser.add_argument("--file", type=str, default="output/all_stores_config.xml",
+                       help="Combined configuration file (default: output/all_stores_config.xml)")
+    parser.add_argument("--build", action="store_true",
+                       help="Rebuild the sidecar index even if it is up to date")
+    parser.add_argument("--store", type=str, action="append", default=[],
+                       help="Store ID to show, extract or validate (can be repeated)")
+    parser.add_argument("--show", action="store_true",
+                       help="Print the store's node")
+    parser.add_argument("--extract", type=str, metavar="DIR",
+                       help="Write each store as a standalone store_<id>_config.xml into DIR")
+    parser.add_argument("--validate", action="store_true",
+                       help="Validate each store's standalone configuration")
+    parser.add_argument("--list", action="store_true",
+                       help="List the store IDs in the file")
+
+    args = parser.parse_args()
+
+    try:
+        with CombinedConfigIndex(args.file) as index:
+            if args.build:
+                index.build_index()
+            if args.list:
+                for rsid in index.rsids():
+                    print(rsid)
+
+            missing = [rsid for rsid in args.store if rsid not in index.stores]
+            if missing:
+                print(f"❌ Store(s) not found in {args.file}: {', '.join(missing)}")
+                sys.exit(1)
+
+            invalid = 0
+            validator = ConfigValidator() if args.validate else None
+            for rsid in args.store:
+                if args.show or not (args.extract or args.validate):
+                    print(index.store_node(rsid).decode('utf-8'))
+                if args.extract:
+                    print(f"✓ Extracted store {rsid}: {index.extract_store(rsid, args.extract)}")
+                if args.validate:
+                    if not index.validate_store(rsid, validator)["valid"]:
+                        invalid += 1
+
+            if not args.store and not args.list:
+                print(f"📊 {len(index.stores)} stores indexed in {index.index_file}")
+            if index.duplicates:
+                print(f"   ⚠️  Duplicate rsids: {', '.join(index.duplicates)}")
+            if invalid:
+                sys.exit(1)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
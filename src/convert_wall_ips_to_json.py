@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Wall IP Sheet to JSON Converter
+
+This script imports the wall IP sheets from network engineering (one row
+per store and wall: store, wall, IP and an optional description) into
+store_wall_mapping.json. The sheet is cleaned and validated column-wise
+with pandas, and the result is merged into the existing mapping: names,
+parent_node and the other store fields are kept, sheet descriptions are
+added to wall_type_descriptions, and empty "" wall entries of the
+imported stores are dropped instead of being carried along. If any row
+is rejected, nothing is written unless --allow-partial is given.
+
+Usage:
+    python convert_wall_ips_to_json.py wall-ips.xlsx
+    python convert_wall_ips_to_json.py wall-ips.xlsx --output store_wall_mapping_new.json --dry-run
+    python convert_wall_ips_to_json.py wall-ips.xlsx --allow-partial
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# Accepted column headers (compared lower-case, without spaces, '_' and '-')
+COLUMNS = {
+    "store": ("store", "storeid", "siteid", "site", "butik", "butiksnummer"),
+    "wall": ("wall", "wallid", "vagg", "vägg"),
+    "ip": ("ip", "ipaddress", "ipadress", "clientid", "wallip"),
+    "description": ("description", "walltypedescription", "beskrivning"),
+    "name": ("name", "storename", "butiksnamn"),
+}
+REQUIRED_COLUMNS = ("store", "wall", "ip")
+
+# Warnings listed per kind before the rest are only counted
+MAX_LISTED = 20
+
+IPV4_PATTERN = r"(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(?:\.(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)){3}"
+
+
+def read_sheet(sheet_file: str, sheet_name: Optional[str] = None) -> pd.DataFrame:
+    """Read an Excel or CSV sheet as text columns, with the known headers renamed."""
+    if Path(sheet_file).suffix.lower() == ".csv":
+        df = pd.read_csv(sheet_file, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    else:
+        df = pd.read_excel(sheet_file, sheet_name=sheet_name or 0, dtype=str)
+
+    aliases = {alias: column for column, names in COLUMNS.items() for alias in names}
+    renamed = {}
+    for header in df.columns:
+        key = str(header).strip().lower().replace(" ", "").replace("_", "").replace("-", "")
+        if key in aliases and aliases[key] not in renamed.values():
+            renamed[header] = aliases[key]
+    df = df.rename(columns=renamed)
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise KeyError(f"Missing column(s) {', '.join(missing)}; found {', '.join(map(str, df.columns))}")
+    return df[[column for column in COLUMNS if column in df.columns]]
+
+
+def _ids(series: pd.Series) -> pd.Series:
+    """Store/wall IDs as text; numbers read as floats ("1161.0") lose their decimals."""
+    text = series.astype("string").str.strip()
+    numeric = pd.to_numeric(text, errors="coerce")
+    whole = numeric.notna() & (numeric % 1 == 0)
+    return text.mask(whole, numeric.where(whole).astype("Int64").astype("string"))
+
+
+def clean_sheet(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize the columns and add the sheet row number of every row."""
+    df = df.copy()
+    # Header is row 1 in the spreadsheet
+    df.insert(0, "row", df.index + 2)
+    df["store"] = _ids(df["store"])
+    wall = df["wall"].astype("string").str.strip().str.replace(r"(?i)^wall\s*", "", regex=True)
+    df["wall"] = _ids(wall.mask(wall.str.lower() == "disposal", "100"))
+    df["ip"] = df["ip"].astype("string").str.strip()
+    for column in ("description", "name"):
+        if column in df.columns:
+            df[column] = df[column].astype("string").str.strip()
+    return df.replace({"": pd.NA})
+
+
+def validate_sheet(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Split a cleaned sheet into importable rows, problems and warnings.
+
+    Rows without a store or wall, or with an invalid IP, are rejected;
+    rows with an empty IP are skipped. Conflicting IPs for the same store
+    and wall reject every row of that wall; repeated identical rows are
+    imported once. An IP used for several walls is reported as a warning.
+    """
+    problems: List[str] = []
+    warnings: List[str] = []
+
+    missing_id = df["store"].isna() | df["wall"].isna()
+    bad_id = ~missing_id & ~(df["store"].str.fullmatch(r"\d+") & df["wall"].str.fullmatch(r"\d+")).fillna(False)
+    empty_ip = ~missing_id & ~bad_id & df["ip"].isna()
+    bad_ip = ~missing_id & ~bad_id & ~empty_ip & ~df["ip"].str.fullmatch(IPV4_PATTERN).fillna(False)
+    for row in df.loc[missing_id, "row"]:
+        problems.append(f"Row {row}: store or wall is missing")
+    for row, store, wall in df.loc[bad_id, ["row", "store", "wall"]].itertuples(index=False):
+        problems.append(f"Row {row}: invalid store '{store}' or wall '{wall}'")
+    for row, store, wall, ip in df.loc[bad_ip, ["row", "store", "wall", "ip"]].itertuples(index=False):
+        problems.append(f"Row {row}: invalid IP address '{ip}' for store {store}, wall {wall}")
+
+    valid = df[~(missing_id | bad_id | empty_ip | bad_ip)]
+    ip_counts = valid.groupby(["store", "wall"])["ip"].nunique()
+    conflicting = ip_counts[ip_counts > 1]
+    if not conflicting.empty:
+        in_conflict = pd.Series(pd.MultiIndex.from_frame(valid[["store", "wall"]]).isin(conflicting.index),
+                                index=valid.index)
+        for (store, wall), rows in valid[in_conflict].groupby(["store", "wall"]):
+            listed = ", ".join(f"{ip} (row {row})" for row, ip in zip(rows["row"], rows["ip"]))
+            problems.append(f"Store {store}, wall {wall} has conflicting IPs: {listed}")
+        valid = valid[~in_conflict]
+    valid = valid.drop_duplicates(["store", "wall"], keep="last")
+
+    shared = valid[valid.duplicated("ip", keep=False)]
+    for ip, rows in shared.groupby("ip"):
+        used_by = ", ".join(f"store {store} wall {wall}" for store, wall in zip(rows["store"], rows["wall"]))
+        warnings.append(f"IP {ip} is used by {used_by}")
+
+    return {"rows": valid, "problems": problems, "warnings": warnings, "skipped_empty": int(empty_ip.sum())}
+
+
+def merge_into_mapping(mapping: Dict[str, Any], rows: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Merge validated rows into the mapping in place and return what changed.
+    New stores get the fleet's most common country and parent_node.
+    """
+    stores = mapping.setdefault("stores", {})
+    defaults = {field: Counter(store.get(field) for store in stores.values() if store.get(field)).most_common(1)
+                for field in ("country", "parent_node")}
+    report: Dict[str, Any] = {"stores": 0, "new_stores": [], "unnamed_stores": [], "changed_walls": 0,
+                              "unchanged_walls": 0, "dropped_empty": 0, "descriptions": 0, "skip_wdm": []}
+
+    has_description = "description" in rows.columns
+    has_name = "name" in rows.columns
+    # Grouping: one pass over the validated columns, in sheet order
+    columns = [rows["store"], rows["wall"], rows["ip"],
+               rows["description"] if has_description else [pd.NA] * len(rows),
+               rows["name"] if has_name else [pd.NA] * len(rows)]
+    seen = set()
+    for store_id, wall_id, ip, description, name in zip(*columns):
+        entry = stores.get(store_id)
+        if entry is None:
+            entry = {
+                "name": name if not pd.isna(name) else store_id,
+                "country": defaults["country"][0][0] if defaults["country"] else "SE",
+                "parent_node": defaults["parent_node"][0][0] if defaults["parent_node"] else "",
+                "walls": {},
+            }
+            stores[store_id] = entry
+            report["new_stores"].append(store_id)
+            if pd.isna(name):
+                report["unnamed_stores"].append(store_id)
+        walls = entry.get("walls")
+        if not isinstance(walls, dict):
+            walls = entry["walls"] = {}
+
+        if store_id not in seen:
+            seen.add(store_id)
+            report["stores"] += 1
+            if entry.get("skip_wdm"):
+                report["skip_wdm"].append(store_id)
+
+        if walls.get(wall_id) == ip:
+            report["unchanged_walls"] += 1
+        else:
+            walls[wall_id] = ip
+            report["changed_walls"] += 1
+        if not pd.isna(description):
+            descriptions = entry.setdefault("wall_type_descriptions", {})
+            if descriptions.get(wall_id) != description:
+                descriptions[wall_id] = description
+                report["descriptions"] += 1
+
+    # Empty "" walls the sheet did not fill are dropped; filled ones kept their position
+    for store_id in seen:
+        walls = stores[store_id]["walls"]
+        for empty_wall in [wall for wall, value in walls.items() if value == ""]:
+            del walls[empty_wall]
+            report["dropped_empty"] += 1
+
+    # The generator requires the mandatory walls
+    mandatory = [str(wall) for wall in mapping.get("metadata", {}).get("mandatory_walls", [])]
+    report["missing_mandatory"] = [f"Store {store_id} has no wall {wall}" for store_id in sorted(seen, key=int)
+                                   for wall in mandatory if wall not in stores[store_id]["walls"]]
+    return report
+
+
+def convert_wall_ips_to_json(sheet_file: str = "wall-ips.xlsx",
+                             mapping_file: str = "config/mappings/store_wall_mapping.json",
+                             output_file: Optional[str] = None, sheet_name: Optional[str] = None,
+                             dry_run: bool = False, allow_partial: bool = False) -> Dict[str, Any]:
+    """
+    Import a wall IP sheet into the mapping; returns a report of what was
+    imported. Nothing is written when rows were rejected, unless
+    allow_partial is set; report["written"] tells whether the file was saved.
+    """
+    print(f"📖 Reading wall IP sheet: {sheet_file}")
+    df = read_sheet(sheet_file, sheet_name)
+    validated = validate_sheet(clean_sheet(df))
+
+    with open(mapping_file, 'r', encoding='utf-8-sig') as f:
+        mapping = json.load(f)
+    report = merge_into_mapping(mapping, validated["rows"])
+    report.update(rows=len(df), imported=len(validated["rows"]), problems=validated["problems"],
+                  warnings=validated["warnings"], skipped_empty=validated["skipped_empty"],
+                  output_file=output_file or mapping_file, written=False)
+
+    if not dry_run and (allow_partial or not validated["problems"]):
+        with open(report["output_file"], 'w', encoding='utf-8') as f:
+            json.dump(mapping, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        report["written"] = True
+    return report
+
+
+def _listed(items: List[str], prefix: str) -> List[str]:
+    lines = [f"{prefix}{item}" for item in items[:MAX_LISTED]]
+    if len(items) > MAX_LISTED:
+        lines.append(f"{prefix}... and {len(items) - MAX_LISTED} more")
+    return lines
+
+
+def summary_lines(report: Dict[str, Any]) -> List[str]:
+    """Report lines shared by the command line and the GUI; rejected rows are always listed in full."""
+    lines = [f"   Rows read: {report['rows']} ({report['imported']} imported, "
+             f"{report['skipped_empty']} without IP, {len(report['problems'])} rejected)",
+             f"   Stores: {report['stores']} ({len(report['new_stores'])} new)",
+             f"   Walls: {report['changed_walls']} added or changed, {report['unchanged_walls']} unchanged",
+             f"   Descriptions: {report['descriptions']} added or changed",
+             f"   Empty \"\" wall entries dropped: {report['dropped_empty']}"]
+    lines += [f"   🚨 {problem}" for problem in report["problems"]]
+    lines += _listed(report["warnings"], "   ⚠️  ")
+    lines += _listed(report["missing_mandatory"], "   ⚠️  ")
+    unnamed = report["unnamed_stores"]
+    if unnamed:
+        listed = ", ".join(unnamed[:MAX_LISTED]) + (f" and {len(unnamed) - MAX_LISTED} more"
+                                                    if len(unnamed) > MAX_LISTED else "")
+        lines.append(f"   ⚠️  New stores without a name column (named by ID): {listed}")
+    if report["skip_wdm"]:
+        lines.append(f"   ⚠️  Stores with skip_wdm set (walls imported, not generated): {', '.join(report['skip_wdm'])}")
+    return lines
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Import a wall IP sheet into store_wall_mapping.json")
+    parser.add_argument("sheet", nargs="?", default="wall-ips.xlsx",
+                       help="Excel (.xlsx) or CSV file with store, wall, IP and optional description columns")
+    parser.add_argument("--mapping", type=str, default="config/mappings/store_wall_mapping.json",
+                       help="Mapping to merge into (default: config/mappings/store_wall_mapping.json)")
+    parser.add_argument("--output", type=str,
+                       help="Where to write the merged mapping (default: overwrite --mapping)")
+    parser.add_argument("--sheet-name", type=str,
+                       help="Excel worksheet to read (default: the first)")
+    parser.add_argument("--dry-run", action="store_true",
+                       help="Only report what would be imported")
+    parser.add_argument("--allow-partial", action="store_true",
+                       help="Write the valid rows even if some rows were rejected")
+
+    args = parser.parse_args()
+
+    try:
+        report = convert_wall_ips_to_json(args.sheet, args.mapping, args.output, args.sheet_name, args.dry_run,
+                                          args.allow_partial)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    print("\n📊 Summary:")
+    for line in summary_lines(report):
+        print(line)
+    if args.dry_run:
+        print("\n🔍 Dry run - nothing written")
+    elif report["written"]:
+        print(f"\n✅ Saved to: {report['output_file']}")
+    else:
+        print(f"\n🚫 Nothing written: {len(report['problems'])} row(s) rejected. "
+              f"Fix the sheet, or use --allow-partial to import the valid rows only")
+    if report["problems"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
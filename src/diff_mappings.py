@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Store Mapping Snapshot Diff
+
+Compares two store_wall_mapping JSON snapshots (for example the working
+mapping against a dated PROD snapshot) and reports added, removed and
+changed stores, moved wall IPs and metadata changes such as
+mandatory_walls. Each store is hashed once, so only stores whose hash
+differs are compared field by field.
+
+Usage:
+    python diff_mappings.py config/mappings/store_wall_mapping.json store_wall_mapping_PROD-20251111-134645.json
+    python diff_mappings.py OLD NEW --json diff.json
+    python diff_mappings.py OLD NEW --regenerate-list changed_stores.txt
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+# Store fields compared one by one; walls and wall_type_descriptions are compared per wall
+STORE_FIELDS = ("name", "country", "parent_node", "skip_wdm", "skip_webui")
+
+# Metadata keys that change the generated XML of every store
+GENERATION_METADATA = ("webui_address_rule",)
+# Metadata key with per-country templates; a change affects that country's stores without their own template
+TEMPLATE_METADATA = "templates"
+
+
+def load_mapping(path: str) -> Dict[str, Any]:
+    """Load a mapping snapshot (BOM tolerated)."""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        mapping = json.load(f)
+    if not isinstance(mapping, dict) or not isinstance(mapping.get("stores"), dict):
+        raise ValueError(f"'{path}' is not a store mapping (missing 'stores' object)")
+    return mapping
+
+
+def store_hash(store_data: Any) -> str:
+    """Stable content hash of one store entry (key order does not matter)."""
+    canonical = json.dumps(store_data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _compare_keyed(old: Any, new: Any, label: str) -> List[Dict[str, Any]]:
+    """Per-key changes between two {id: value} objects."""
+    old = old if isinstance(old, dict) else {}
+    new = new if isinstance(new, dict) else {}
+    changes: List[Dict[str, Any]] = []
+    for key in sorted(set(old) | set(new), key=lambda k: (len(k), k)):
+        if old.get(key) != new.get(key):
+            changes.append({"field": f"{label}.{key}", "old": old.get(key), "new": new.get(key)})
+    return changes
+
+
+def compare_store(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Field-level changes between two versions of a store."""
+    changes = [{"field": field, "old": old.get(field), "new": new.get(field)}
+               for field in STORE_FIELDS if old.get(field) != new.get(field)]
+    changes += _compare_keyed(old.get("walls"), new.get("walls"), "walls")
+    changes += _compare_keyed(old.get("wall_type_descriptions"), new.get("wall_type_descriptions"),
+                              "wall_type_descriptions")
+    known = set(STORE_FIELDS) | {"walls", "wall_type_descriptions"}
+    for field in sorted((set(old) | set(new)) - known):
+        if old.get(field) != new.get(field):
+            changes.append({"field": field, "old": old.get(field), "new": new.get(field)})
+    return changes
+
+
+def diff_mappings(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Compare two mappings and return a JSON-serializable report."""
+    old_stores, new_stores = old["stores"], new["stores"]
+    old_hashes = {store_id: store_hash(data) for store_id, data in old_stores.items()}
+    new_hashes = {store_id: store_hash(data) for store_id, data in new_stores.items()}
+
+    added = [store_id for store_id in new_hashes if store_id not in old_hashes]
+    removed = [store_id for store_id in old_hashes if store_id not in new_hashes]
+    changed: Dict[str, List[Dict[str, Any]]] = {}
+    unchanged = 0
+    for store_id, digest in new_hashes.items():
+        if store_id not in old_hashes:
+            continue
+        if old_hashes[store_id] == digest:
+            unchanged += 1
+        else:
+            changed[store_id] = compare_store(old_stores[store_id], new_stores[store_id])
+
+    metadata = _compare_keyed(old.get("metadata"), new.get("metadata"), "metadata")
+
+    # Removed stores have nothing to regenerate; a generation-relevant metadata change affects all
+    if any(change["field"] in (f"metadata.{key}" for key in GENERATION_METADATA) for change in metadata):
+        regenerate = list(new_stores)
+    else:
+        template_changes = _compare_keyed((old.get("metadata") or {}).get(TEMPLATE_METADATA),
+                                          (new.get("metadata") or {}).get(TEMPLATE_METADATA), TEMPLATE_METADATA)
+        countries = {change["field"].split(".", 1)[1] for change in template_changes}
+        regenerate = [store_id for store_id, store_data in new_stores.items()
+                      if store_id in changed or store_id not in old_stores
+                      or (not store_data.get("template") and store_data.get("country", "") in countries)]
+
+    return {
+        "summary": {"old_stores": len(old_stores), "new_stores": len(new_stores), "added": len(added),
+                    "removed": len(removed), "changed": len(changed), "unchanged": unchanged},
+        "metadata": metadata,
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "regenerate": regenerate,
+    }
+
+
+def _value(value: Any) -> str:
+    if value is None:
+        return "(none)"
+    if value == "":
+        return "(empty)"
+    return json.dumps(value, ensure_ascii=False) if not isinstance(value, str) else value
+
+
+def format_report(report: Dict[str, Any], old_label: str, new_label: str,
+                  new_mapping: Optional[Dict[str, Any]] = None,
+                  old_mapping: Optional[Dict[str, Any]] = None) -> str:
+    """Format a diff report for people."""
+    summary = report["summary"]
+    lines = [f"🔍 Comparing {old_label} ({summary['old_stores']} stores) -> {new_label} ({summary['new_stores']} stores)"]
+
+    if report["metadata"]:
+        lines.append("\n🧭 Metadata:")
+        for change in report["metadata"]:
+            lines.append(f"   ~ {change['field']}: {_value(change['old'])} -> {_value(change['new'])}")
+
+    def name_of(store_id: str, mapping: Optional[Dict[str, Any]]) -> str:
+        store = (mapping or {}).get("stores", {}).get(store_id, {})
+        return f" {store['name']}" if isinstance(store, dict) and store.get("name") else ""
+
+    if report["added"]:
+        lines.append(f"\n➕ Added stores ({len(report['added'])}):")
+        lines += [f"   + {store_id}{name_of(store_id, new_mapping)}" for store_id in report["added"]]
+    if report["removed"]:
+        lines.append(f"\n➖ Removed stores ({len(report['removed'])}):")
+        lines += [f"   - {store_id}{name_of(store_id, old_mapping)}" for store_id in report["removed"]]
+    if report["changed"]:
+        lines.append(f"\n✏️  Changed stores ({len(report['changed'])}):")
+        for store_id, changes in report["changed"].items():
+            lines.append(f"   ~ {store_id}{name_of(store_id, new_mapping)}")
+            for change in changes:
+                lines.append(f"       {change['field']}: {_value(change['old'])} -> {_value(change['new'])}")
+
+    lines.append(f"\n📊 Diff Summary:")
+    lines.append(f"   ➕ Added: {summary['added']}")
+    lines.append(f"   ➖ Removed: {summary['removed']}")
+    lines.append(f"   ✏️  Changed: {summary['changed']}")
+    lines.append(f"   ✅ Unchanged: {summary['unchanged']}")
+    lines.append(f"   🔄 Stores to regenerate: {len(report['regenerate'])}")
+    return "\n".join(lines)
+
+
+def _write(path: str, text: str) -> None:
+    if path == "-":
+        sys.stdout.write(text)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Compare two store mapping snapshots",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python diff_mappings.py config/mappings/store_wall_mapping.json store_wall_mapping_PROD-20251111-134645.json
+  python diff_mappings.py OLD NEW --json diff.json
+  python diff_mappings.py OLD NEW --regenerate-list changed_stores.txt
+  python generate_store_config.py --stores-file changed_stores.txt
+        """
+    )
+
+    parser.add_argument("old", help="Older mapping snapshot")
+    parser.add_argument("new", help="Newer mapping snapshot")
+    parser.add_argument("--json", type=str, metavar="FILE",
+                       help="Write the report as JSON ('-' for stdout)")
+    parser.add_argument("--regenerate-list", type=str, metavar="FILE",
+                       help="Write the IDs of added/changed stores, one per line ('-' for stdout)")
+    parser.add_argument("--quiet", action="store_true",
+                       help="Do not print the human-readable report")
+
+    args = parser.parse_args()
+
+    try:
+        old_mapping = load_mapping(args.old)
+        new_mapping = load_mapping(args.new)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    report = diff_mappings(old_mapping, new_mapping)
+
+    if not args.quiet and "-" not in (args.json, args.regenerate_list):
+        print(format_report(report, args.old, args.new, new_mapping, old_mapping))
+    if args.json:
+        _write(args.json, json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+    if args.regenerate_list:
+        _write(args.regenerate_list, "\n".join(report["regenerate"]) + ("\n" if report["regenerate"] else ""))
+
+    # Exit code 1 signals differences, like diff(1)
+    summary = report["summary"]
+    if report["metadata"] or summary["added"] or summary["removed"] or summary["changed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Configuration Exporter
+
+This script uploads generated store configuration files to the store
+manager import endpoint (or copies them to a local staging directory)
+with bounded concurrency, pooled keep-alive connections and retries with
+exponential backoff. Progress is recorded in a manifest so an interrupted
+run resumes where it stopped.
+
+Usage:
+    python export_configs.py --source output --url http://127.0.0.1:8081/import
+    python export_configs.py --source output --target-dir staging
+    python export_configs.py --help
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import shutil
+import ssl
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+MANIFEST_NAME = ".export_manifest.json"
+
+
+class ExportError(Exception):
+    """Raised when a file could not be exported."""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class ExportManifest:
+    """
+    Record of exported files per target, keyed by file name, used to resume
+    partial runs. One manifest file can hold several targets.
+    """
+
+    def __init__(self, path: Path, target: str):
+        self.path = path
+        self.target = target
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"targets": {}}
+
+    def load(self) -> None:
+        """Load the entries recorded for this target, if any."""
+        self.entries = self._read().get("targets", {}).get(self.target, {})
+
+    def save(self) -> None:
+        """Write this target's entries atomically, keeping other targets intact."""
+        data = self._read()
+        data.setdefault("targets", {})[self.target] = self.entries
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        temp_path.replace(self.path)
+
+    def is_done(self, name: str, digest: str) -> bool:
+        """Return True if this exact file content was already exported."""
+        entry = self.entries.get(name)
+        return entry is not None and entry.get("sha256") == digest and entry.get("status") == "done"
+
+    def mark(self, name: str, digest: str, status: str, detail: str = "") -> None:
+        """Record the outcome of one file."""
+        self.entries[name] = {"sha256": digest, "status": status, "detail": detail,
+                              "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+class DirectoryTarget:
+    """Export target that copies files into a local staging directory."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.description = f"dir:{self.directory.resolve()}"
+
+    async def open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    async def send(self, file_path: Path, body: bytes) -> str:
+        destination = self.directory / file_path.name
+        await asyncio.get_running_loop().run_in_executor(None, self._write, destination, body)
+        return str(destination)
+
+    def _write(self, destination: Path, body: bytes) -> None:
+        temp_path = destination.with_suffix(destination.suffix + ".part")
+        with open(temp_path, 'wb') as f:
+            f.write(body)
+        shutil.move(str(temp_path), str(destination))
+
+    async def close(self) -> None:
+        pass
+
+
+class HttpTarget:
+    """
+    Export target that POSTs each file to an HTTP endpoint.
+
+    Connections are HTTP/1.1 keep-alive and pooled, so a run opens at most
+    pool_size connections regardless of the number of files. The URL may
+    contain {store_id} and {file} placeholders.
+    """
+
+    def __init__(self, url: str, pool_size: int = 8, timeout: float = 30.0):
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"Unsupported export URL: {url}")
+        self.url = url
+        self.description = f"url:{url}"
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self.ssl_context = ssl.create_default_context() if parsed.scheme == "https" else None
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def open(self) -> None:
+        self._slots = asyncio.Semaphore(self.pool_size)
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        if self._idle:
+            return self._idle.pop()
+        return await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl_context), self.timeout)
+
+    def _release(self, connection: Tuple[asyncio.StreamReader, asyncio.StreamWriter], reusable: bool) -> None:
+        if reusable and not connection[1].is_closing():
+            self._idle.append(connection)
+        else:
+            connection[1].close()
+
+    async def send(self, file_path: Path, body: bytes) -> str:
+        store_id = file_path.stem.replace("store_", "").replace("_config", "")
+        # Only the two placeholders are substituted; other braces in the URL are kept as they are
+        parsed = urlparse(self.url.replace("{store_id}", store_id).replace("{file}", file_path.name))
+        target = parsed.path or "/"
+        if parsed.query:
+            target += f"?{parsed.query}"
+
+        assert self._slots is not None, "open() must be called before send()"
+        async with self._slots:
+            try:
+                connection = await self._connect()
+            except (OSError, asyncio.TimeoutError) as e:
+                raise ExportError(f"Connection error: {str(e) or type(e).__name__}")
+            reusable = False
+            try:
+                reader, writer = connection
+                headers = (
+                    f"POST {target} HTTP/1.1\r\n"
+                    f"Host: {self.host}:{self.port}\r\n"
+                    f"Content-Type: application/xml; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"X-Config-File: {file_path.name}\r\n"
+                    f"Connection: keep-alive\r\n\r\n"
+                )
+                writer.write(headers.encode("ascii") + body)
+                await writer.drain()
+                status, response_body, reusable = await asyncio.wait_for(self._read_response(reader), self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                raise ExportError(f"Connection error: {str(e) or type(e).__name__}")
+            except ValueError as e:
+                raise ExportError(f"Malformed HTTP response: {e}")
+            finally:
+                self._release(connection, reusable)
+
+        if status >= 500 or status == 429:
+            raise ExportError(f"HTTP {status}: {response_body[:200]}")
+        if status >= 400:
+            raise ExportError(f"HTTP {status}: {response_body[:200]}", retryable=False)
+        return f"HTTP {status}"
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+        """Read a status line and its headers; return (status, lower-cased headers)."""
+        status_line = await reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].strip().isdigit():
+            raise ValueError(f"invalid status line {status_line[:100]!r}")
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return int(parts[1]), headers
+
+    async def _read_response(self, reader: asyncio.StreamReader) -> Tuple[int, str, bool]:
+        """Read one response; return (status, body, connection_reusable)."""
+        status, headers = await self._read_head(reader)
+        while status < 200:
+            # Interim 1xx responses have no body; the final response follows
+            status, headers = await self._read_head(reader)
+
+        reusable = headers.get("connection", "").lower() != "close"
+        if status in (204, 304):
+            # These responses never carry a body, whatever the headers say
+            body = b""
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                body += await reader.readexactly(size)
+                await reader.readline()
+        elif not reusable:
+            # No length given: the body runs until the server closes the connection
+            body = await reader.read()
+        else:
+            # A kept-alive connection without a length has no body we can delimit
+            body = b""
+            reusable = False
+        return status, body.decode("utf-8", errors="replace"), reusable
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+class ConfigExporter:
+    """Uploads files to a target with bounded concurrency, retries and a resume manifest."""
+
+    def __init__(self, target: Any, manifest_path: Path, concurrency: int = 8,
+                 retries: int = 3, backoff: float = 0.5, resume: bool = True):
+        self.target = target
+        self.manifest = ExportManifest(manifest_path, target.description)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.resume = resume
+
+    async def _export_one(self, file_path: Path, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        async with semaphore:
+            body = await asyncio.get_running_loop().run_in_executor(None, file_path.read_bytes)
+            digest = hashlib.sha256(body).hexdigest()
+            if self.resume and self.manifest.is_done(file_path.name, digest):
+                return {"file": file_path.name, "status": "skipped", "detail": "already exported"}
+
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    detail = await self.target.send(file_path, body)
+                    self.manifest.mark(file_path.name, digest, "done", detail)
+                    print(f"   ✓ {file_path.name} ({detail})")
+                    return {"file": file_path.name, "status": "done", "detail": detail}
+                except ExportError as e:
+                    if not e.retryable or attempt > self.retries:
+                        self.manifest.mark(file_path.name, digest, "failed", str(e))
+                        print(f"   ❌ {file_path.name}: {e}")
+                        return {"file": file_path.name, "status": "failed", "detail": str(e)}
+                    delay = self.backoff * (2 ** (attempt - 1))
+                    print(f"   ⚠️  {file_path.name}: {e} - retrying in {delay:.1f}s ({attempt}/{self.retries})")
+                    await asyncio.sleep(delay)
+
+    async def export(self, files: List[Path]) -> List[Dict[str, Any]]:
+        """Export all files and return one result per file."""
+        if self.resume:
+            self.manifest.load()
+        await self.target.open()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            tasks = [asyncio.create_task(self._export_one(file_path, semaphore)) for file_path in files]
+            results: List[Dict[str, Any]] = []
+            for task in asyncio.as_completed(tasks):
+                results.append(await task)
+                # Persist progress regularly so an interrupted run can resume
+                if len(results) % 50 == 0:
+                    self.manifest.save()
+            return results
+        finally:
+            self.manifest.save()
+            await self.target.close()
+
+
+def find_config_files(source: str, include_combined: bool = False) -> List[Path]:
+    """Return the store configuration files in a directory."""
+    files = sorted(Path(source).glob("store_*_config.xml"))
+    if include_combined and (Path(source) / "all_stores_config.xml").exists():
+        files.append(Path(source) / "all_stores_config.xml")
+    return files
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Export generated store configuration files to the store manager import",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python export_configs.py --source output --url http://127.0.0.1:8081/import
+  python export_configs.py --source output --url "http://127.0.0.1:8081/import/{store_id}"
+  python export_configs.py --source output --target-dir staging
+  python export_configs.py --source output --url http://127.0.0.1:8081/import --no-resume
+        """
+    )
+
+    parser.add_argument("--source", type=str, default="output",
+                       help="Directory with generated configuration files (default: output)")
+    parser.add_argument("--url", type=str,
+                       help="HTTP import endpoint (placeholders: {store_id}, {file})")
+    parser.add_argument("--target-dir", type=str,
+                       help="Copy files to this local directory instead of uploading")
+    parser.add_argument("--include-combined", action="store_true",
+                       help="Also export all_stores_config.xml")
+    parser.add_argument("--concurrency", type=int, default=8,
+                       help="Maximum concurrent uploads and pooled connections (default: 8)")
+    parser.add_argument("--retries", type=int, default=3,
+                       help="Retries per file for transient errors (default: 3)")
+    parser.add_argument("--backoff", type=float, default=0.5,
+                       help="Initial retry delay in seconds, doubled on every retry (default: 0.5)")
+    parser.add_argument("--manifest", type=str,
+                       help=f"Manifest file for resuming (default: <source>/{MANIFEST_NAME})")
+    parser.add_argument("--no-resume", action="store_true",
+                       help="Export every file again, ignoring the manifest")
+
+    args = parser.parse_args()
+
+    if bool(args.url) == bool(args.target_dir):
+        parser.print_help()
+        sys.exit(1)
+
+    files = find_config_files(args.source, args.include_combined)
+    if not files:
+        print(f"⚠️  No configuration files found in: {args.source}")
+        sys.exit(1)
+
+    try:
+        target = HttpTarget(args.url, pool_size=args.concurrency) if args.url else DirectoryTarget(args.target_dir)
+    except ValueError as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+    manifest_path = Path(args.manifest) if args.manifest else Path(args.source) / MANIFEST_NAME
+    exporter = ConfigExporter(target, manifest_path, concurrency=args.concurrency,
+                              retries=args.retries, backoff=args.backoff, resume=not args.no_resume)
+
+    print(f"🚀 Exporting {len(files)} files to {target.description}...")
+    started = time.perf_counter()
+    results = asyncio.run(exporter.export(files))
+    elapsed = time.perf_counter() - started
+
+    done = sum(1 for r in results if r["status"] == "done")
+    skipped = sum(1 for r in results if r["status"] == "skipped")
+    failed = [r for r in results if r["status"] == "failed"]
+
+    print(f"\n📊 Export Summary ({elapsed:.2f}s):")
+    print(f"   ✅ Exported: {done}")
+    print(f"   ⏭️  Skipped (already exported): {skipped}")
+    print(f"   ❌ Failed: {len(failed)}")
+    print(f"   📝 Manifest: {manifest_path}")
+
+    if failed:
+        sys.exit(1)
+
+    print("\n✅ Export completed successfully!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Fleet Query Index
+
+A local SQLite index over generated (or deployed) structure XML files, so
+questions like "which store owns IP 10.29.27.33", "which stores have wall
+3" or "which stores carry card 9908455" are answered with an indexed
+lookup instead of grepping output/. The index lives next to the files
+(<directory>/.fleet_index.sqlite) and is updated incrementally: only files
+whose content changed since the last update are parsed again.
+
+Usage:
+    python fleet_index.py build --directory output
+    python fleet_index.py query --ip 10.29.27.33
+    python fleet_index.py query --wall 3
+    python fleet_index.py query --card 9908455
+    python fleet_index.py query 9908455
+"""
+
+import argparse
+import hashlib
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from generate_store_config import normalize_identifier
+from reverse_import import scan_file
+
+INDEX_FILE = ".fleet_index.sqlite"
+
+# Bump when the schema changes so old indexes are rebuilt
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE files (name TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT);
+CREATE TABLE stores (store_id TEXT, file TEXT, name TEXT, search_name TEXT, country TEXT,
+                     parent_node TEXT, webui_ip TEXT);
+CREATE TABLE walls (store_id TEXT, file TEXT, wall_id TEXT, ip TEXT, wall_type TEXT, description TEXT);
+CREATE TABLE cards (store_id TEXT, file TEXT, position INTEGER, card TEXT);
+CREATE INDEX stores_id ON stores (store_id);
+CREATE INDEX stores_file ON stores (file);
+CREATE INDEX stores_webui_ip ON stores (webui_ip);
+CREATE INDEX walls_ip ON walls (ip);
+CREATE INDEX walls_wall ON walls (wall_id);
+CREATE INDEX walls_type ON walls (wall_type);
+CREATE INDEX walls_file ON walls (file);
+CREATE INDEX cards_card ON cards (card);
+CREATE INDEX cards_file ON cards (file);
+"""
+
+IPV4 = re.compile(r"\d{1,3}(\.\d{1,3}){3}")
+
+
+def search_key(text: str) -> str:
+    """Lower-case, diacritic-free form used for name matching."""
+    return normalize_identifier(text).lower()
+
+
+class FleetIndex:
+    """SQLite index of stores, walls, IPs, wall types, web-ui addresses and cards."""
+
+    def __init__(self, directory: str = "output", index_file: Optional[str] = None):
+        self.directory = Path(directory)
+        self.index_file = Path(index_file) if index_file else self.directory / INDEX_FILE
+        self.db: Optional[sqlite3.Connection] = None
+
+    def __enter__(self) -> "FleetIndex":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """Open the database, creating (or recreating) the schema if needed."""
+        if self.db is not None:
+            return
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.index_file))
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            for (table,) in self.db.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+                self.db.execute(f'DROP TABLE "{table}"')
+            self.db.executescript(SCHEMA)
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.db.commit()
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def update(self) -> Dict[str, int]:
+        """
+        Bring the index in line with the directory's XML files. Files with an
+        unchanged size and mtime are skipped without reading; others are
+        hashed and only re-parsed if their content changed.
+        """
+        self.open()
+        db = self.db
+        known = {name: (size, mtime_ns, sha256) for name, size, mtime_ns, sha256
+                 in db.execute("SELECT name, size, mtime_ns, sha256 FROM files")}
+        stats = {"files": 0, "parsed": 0, "unchanged": 0, "removed": 0}
+
+        present = set()
+        for xml_file in sorted(self.directory.glob("*.xml")):
+            name = xml_file.name
+            present.add(name)
+            stats["files"] += 1
+            stat = xml_file.stat()
+            entry = known.get(name)
+            if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+                stats["unchanged"] += 1
+                continue
+            digest = hashlib.sha256(xml_file.read_bytes()).hexdigest()
+            if entry is not None and entry[2] == digest:
+                db.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE name = ?",
+                           (stat.st_size, stat.st_mtime_ns, name))
+                stats["unchanged"] += 1
+                continue
+            try:
+                stores = scan_file(str(xml_file))
+            except ValueError as e:
+                print(f"⚠️  Warning: Not indexing {xml_file}: {e}")
+                stores = []
+            self._remove_file(name)
+            self._add_file(name, stores)
+            db.execute("INSERT INTO files VALUES (?, ?, ?, ?)", (name, stat.st_size, stat.st_mtime_ns, digest))
+            stats["parsed"] += 1
+
+        for name in set(known) - present:
+            self._remove_file(name)
+            stats["removed"] += 1
+
+        db.commit()
+        return stats
+
+    def _remove_file(self, name: str) -> None:
+        for table in ("files", "stores", "walls", "cards"):
+            column = "name" if table == "files" else "file"
+            self.db.execute(f"DELETE FROM {table} WHERE {column} = ?", (name,))
+
+    def _add_file(self, name: str, stores: List[Tuple[str, Dict[str, Any]]]) -> None:
+        for store_id, imported in stores:
+            entry = imported["entry"]
+            self.db.execute("INSERT INTO stores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (store_id, name, entry["name"], search_key(entry["name"]), entry["country"],
+                             entry["parent_node"], imported["ip"]))
+            descriptions = entry.get("wall_type_descriptions", {})
+            wall_ids = list(entry["walls"]) + [w for w in imported["wall_types"] if w not in entry["walls"]]
+            self.db.executemany("INSERT INTO walls VALUES (?, ?, ?, ?, ?, ?)",
+                                [(store_id, name, wall_id, entry["walls"].get(wall_id),
+                                  imported["wall_types"].get(wall_id), descriptions.get(wall_id))
+                                 for wall_id in wall_ids])
+            self.db.executemany("INSERT INTO cards VALUES (?, ?, ?, ?)",
+                                [(store_id, name, position, card)
+                                 for position, card in enumerate(imported["cards"], 1)])
+
+    def _stores(self, where: str, params: Tuple[Any, ...], detail: str) -> List[Dict[str, Any]]:
+        """Distinct stores matching a condition on the joined tables, with the files they are in."""
+        rows = self.db.execute(
+            f"SELECT s.store_id, s.name, s.file, {detail} FROM stores s {where} ORDER BY s.store_id, s.file",
+            params).fetchall()
+        results: Dict[str, Dict[str, Any]] = {}
+        for store_id, name, file_name, match in rows:
+            result = results.setdefault(store_id, {"store": store_id, "name": name, "matches": [], "files": []})
+            if match not in result["matches"]:
+                result["matches"].append(match)
+            if file_name not in result["files"]:
+                result["files"].append(file_name)
+        return list(results.values())
+
+    def by_ip(self, ip: str) -> List[Dict[str, Any]]:
+        """Stores with a wall or web-ui address on this IP."""
+        self.open()
+        return self._stores(
+            "JOIN walls w ON w.store_id = s.store_id AND w.file = s.file WHERE w.ip = ? "
+            "UNION SELECT s.store_id, s.name, s.file, 'web-ui' FROM stores s WHERE s.webui_ip = ?",
+            (ip, ip), "'wall ' || w.wall_id")
+
+    def by_wall(self, wall_id: str) -> List[Dict[str, Any]]:
+        """Stores that have this wall, with its IP."""
+        self.open()
+        return self._stores("JOIN walls w ON w.store_id = s.store_id AND w.file = s.file "
+                            "WHERE w.wall_id = ? AND w.ip IS NOT NULL", (wall_id,), "w.ip")
+
+    def by_wall_type(self, wall_type: str) -> List[Dict[str, Any]]:
+        """Stores with a wall of this wall type."""
+        self.open()
+        return self._stores("JOIN walls w ON w.store_id = s.store_id AND w.file = s.file WHERE w.wall_type = ?",
+                            (wall_type,), "'wall ' || w.wall_id")
+
+    def by_card(self, card: str) -> List[Dict[str, Any]]:
+        """Stores carrying this service card."""
+        self.open()
+        return self._stores("JOIN cards c ON c.store_id = s.store_id AND c.file = s.file WHERE c.card = ?",
+                            (card,), "'position ' || c.position")
+
+    def by_store(self, store_id: str) -> List[Dict[str, Any]]:
+        """The store with this ID."""
+        self.open()
+        return self._stores("WHERE s.store_id = ?", (store_id,), "s.parent_node")
+
+    def by_name(self, text: str) -> List[Dict[str, Any]]:
+        """Stores whose name contains the text (case and diacritics ignored)."""
+        self.open()
+        return self._stores("WHERE s.search_name LIKE ? ESCAPE '\\'",
+                            ("%" + re.sub(r"([%_\\])", r"\\\1", search_key(text)) + "%",), "s.parent_node")
+
+    def by_webui(self, ip: str) -> List[Dict[str, Any]]:
+        """Stores whose web-ui server address is on this IP."""
+        self.open()
+        return self._stores("WHERE s.webui_ip = ?", (ip,), "'web-ui'")
+
+    def search(self, text: str) -> List[Dict[str, Any]]:
+        """Guess what the text is (IP, wall type, card or store ID, name) and look it up."""
+        text = text.strip()
+        if IPV4.fullmatch(text):
+            return self.by_ip(text)
+        if text.upper().startswith("WALL_TYPE_"):
+            return self.by_wall_type(text.upper())
+        if text.isdigit():
+            return self.by_store(text) + [result for result in self.by_card(text)
+                                          if result["store"] != text]
+        return self.by_name(text)
+
+    def counts(self) -> Dict[str, int]:
+        self.open()
+        return {table: self.db.execute(f"SELECT COUNT(DISTINCT {column}) FROM {table}").fetchone()[0]
+                for table, column in (("files", "name"), ("stores", "store_id"),
+                                      ("walls", "store_id || '/' || wall_id"), ("cards", "card"))}
+
+
+def format_results(results: List[Dict[str, Any]]) -> List[str]:
+    """One line per store, for printing."""
+    return [f"{result['store']} - {result['name']}: {', '.join(str(m) for m in result['matches'] if m)} "
+            f"[{', '.join(result['files'])}]" for result in results]
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Build and query the fleet index over generated configuration files",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python fleet_index.py build --directory output
+  python fleet_index.py query --ip 10.29.27.33
+  python fleet_index.py query --wall 3
+  python fleet_index.py query --card 9908455
+  python fleet_index.py query krokek
+        """
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    build_parser = subparsers.add_parser("build", help="Update the index from the directory's XML files")
+    query_parser = subparsers.add_parser("query", help="Query the index (updated first)")
+    for sub in (build_parser, query_parser):
+        sub.add_argument("--directory", type=str, default="output",
+                         help="Directory with the structure XML files (default: output)")
+    query_parser.add_argument("text", nargs="?", help="IP, wall type, store ID, card or part of a store name")
+    query_parser.add_argument("--ip", type=str, help="Stores with a wall or web-ui address on this IP")
+    query_parser.add_argument("--wall", type=str, help="Stores that have this wall ID")
+    query_parser.add_argument("--wall-type", type=str, help="Stores with a wall of this type")
+    query_parser.add_argument("--card", type=str, help="Stores carrying this service card")
+    query_parser.add_argument("--store", type=str, help="Store with this ID")
+    query_parser.add_argument("--name", type=str, help="Stores whose name contains this text")
+    query_parser.add_argument("--webui", type=str, help="Stores whose web-ui address is on this IP")
+
+    args = parser.parse_args()
+    if args.command is None:
+        parser.print_help()
+        sys.exit(1)
+
+    try:
+        with FleetIndex(args.directory) as index:
+            stats = index.update()
+            if args.command == "build":
+                counts = index.counts()
+                print(f"✓ Indexed {stats['files']} file(s) in {index.index_file}: {stats['parsed']} parsed, "
+                      f"{stats['unchanged']} unchanged, {stats['removed']} removed")
+                print(f"📊 {counts['stores']} stores, {counts['walls']} walls, {counts['cards']} distinct cards")
+                return
+
+            queries = [(index.by_ip, args.ip), (index.by_wall, args.wall), (index.by_wall_type, args.wall_type),
+                       (index.by_card, args.card), (index.by_store, args.store), (index.by_name, args.name),
+                       (index.by_webui, args.webui), (index.search, args.text)]
+            queries = [(lookup, value) for lookup, value in queries if value]
+            if not queries:
+                query_parser.print_help()
+                sys.exit(1)
+
+            # Several criteria narrow the result down to stores matching all of them
+            results = queries[0][0](queries[0][1])
+            for lookup, value in queries[1:]:
+                wanted = {result["store"] for result in lookup(value)}
+                results = [result for result in results if result["store"] in wanted]
+    except (OSError, sqlite3.Error) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    for line in format_results(results):
+        print(line)
+    print(f"\n📊 {len(results)} store(s) found")
+    if not results:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,14 @@ import sys
 from pathlib import Path
 import ipaddress
 import re
-from typing import Dict, List, Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional, Set, Tuple
+
+from validate_config import ConfigValidator
+from service_card_index import ServiceCardIndex
+from mapping_reader import LazyMappingReader
+from combined_index import CombinedConfigIndex
 
 
 def normalize_identifier(text: str) -> str:
@@ -54,44 +61,472 @@ def normalize_identifier(text: str) -> str:
     return normalized
 
 
+def store_unique_name(store_data: Dict[str, Any]) -> str:
+    """Build the unique-name of a store node from its parent node and name."""
+    return f"{store_data['parent_node']}.{normalize_identifier(store_data['name']).upper()}"
+
+
+def store_region(store_data: Dict[str, Any]) -> str:
+    """Return the region prefix of a store name ("Östra - 1161 Coop Krokek" -> "Östra"), or ''."""
+    region, separator, _ = store_data.get("name", "").partition(" - ")
+    return region.strip() if separator else ""
+
+
+def parse_store_ids(text: str) -> List[str]:
+    """Split a comma/whitespace separated list of store IDs, dropping duplicates and # comments."""
+    store_ids: List[str] = []
+    seen: Set[str] = set()
+    for line in text.splitlines():
+        line = line.split('#', 1)[0]
+        for store_id in re.split(r'[\s,;]+', line):
+            if store_id and store_id not in seen:
+                seen.add(store_id)
+                store_ids.append(store_id)
+    return store_ids
+
+
+def ipv4_to_int(ip: str) -> Optional[int]:
+    """
+    Parse a dotted IPv4 address into an integer, or return None if invalid.
+
+    Much cheaper than ipaddress.IPv4Address for bulk checks, and follows the
+    same rules (four decimal octets, no leading zeros).
+    """
+    parts = ip.split('.')
+    if len(parts) != 4:
+        return None
+    value = 0
+    for part in parts:
+        if not part or len(part) > 3 or not part.isascii() or not part.isdigit():
+            return None
+        if len(part) > 1 and part[0] == '0':
+            return None
+        octet = int(part)
+        if octet > 255:
+            return None
+        value = (value << 8) | octet
+    return value
+
+
+def int_to_ipv4(value: int) -> str:
+    """Format an integer as a dotted IPv4 address."""
+    return ".".join(str((value >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+
+
+def parse_webui_rule(rule: str) -> Tuple[str, int]:
+    """
+    Parse a web-ui server address derivation rule.
+
+    Supported rules:
+        wall:<wall_id>  use the IP of that wall (e.g. wall:1)
+        host:<octet>    use wall 1's /24 subnet with the given host octet (e.g. host:30)
+    """
+    match = re.fullmatch(r'(wall|host):(\d+)', rule.strip())
+    if not match:
+        raise ValueError(f"Invalid web-ui address rule '{rule}' (expected 'wall:<id>' or 'host:<octet>')")
+    kind, number = match.group(1), int(match.group(2))
+    if kind == "host" and not 0 < number < 255:
+        raise ValueError(f"Invalid host octet in web-ui address rule '{rule}'")
+    return kind, number
+
+
+def canonical_rsid(store_id: str) -> str:
+    """Canonical form of a store ID, so that '1008', ' 1008' and '01008' compare equal."""
+    stripped = store_id.strip()
+    return str(int(stripped)) if stripped.isdigit() else stripped
+
+
+class CollisionIndex:
+    """
+    Fleet-wide index of node unique-names and store rsids.
+
+    Built in one pass over the store mapping before any XML is generated, so
+    a duplicate is reported up front instead of failing the import later.
+    """
+
+    def __init__(self):
+        # key -> list of (store_id, node alias) owning it
+        self.unique_names: Dict[str, List[Tuple[str, str]]] = {}
+        self.rsids: Dict[str, List[Tuple[str, str]]] = {}
+        self._conflicts: Optional[List[Tuple[str, str, List[Tuple[str, str]]]]] = None
+
+    def add_unique_name(self, unique_name: str, store_id: str, alias: str) -> None:
+        """Register a node unique-name owned by a store."""
+        self.unique_names.setdefault(unique_name, []).append((store_id, alias))
+        self._conflicts = None
+
+    def add_rsid(self, store_id: str, alias: str = "GKR-Store") -> None:
+        """Register a store rsid."""
+        self.rsids.setdefault(canonical_rsid(store_id), []).append((store_id, alias))
+        self._conflicts = None
+
+    def conflicts(self, store_ids: Optional[List[str]] = None) -> List[Tuple[str, str, List[Tuple[str, str]]]]:
+        """
+        Return (kind, key, owners) for every colliding unique-name or rsid,
+        optionally limited to collisions involving the given stores.
+        """
+        if self._conflicts is None:
+            self._conflicts = []
+            for key, owners in self.rsids.items():
+                if len(owners) > 1:
+                    self._conflicts.append(("rsid", key, owners))
+            for key, owners in self.unique_names.items():
+                if len(owners) > 1:
+                    self._conflicts.append(("unique-name", key, owners))
+
+        if store_ids is None:
+            return self._conflicts
+
+        wanted: Set[str] = set(store_ids)
+        return [c for c in self._conflicts if any(owner[0] in wanted for owner in c[2])]
+
+    def format_report(self, conflicts: List[Tuple[str, str, List[Tuple[str, str]]]]) -> str:
+        """Format conflicts as a multi-line report."""
+        lines = [f"Found {len(conflicts)} unique-name/rsid collision(s):"]
+        for kind, key, owners in conflicts:
+            used_by = ", ".join(f"store {store_id} ({alias})" for store_id, alias in owners)
+            lines.append(f"   - {kind} '{key}' used by: {used_by}")
+        return "\n".join(lines)
+
+
+class StoreIpTable:
+    """
+    store_ip_mapping.properties parsed once into a table indexed by store ID.
+
+    Tables are cached per file and only re-parsed when the file's mtime or
+    size changes, so every generator in the same process shares one parse.
+    """
+
+    _cache: Dict[str, Tuple[Tuple[int, int], "StoreIpTable"]] = {}
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, str] = {}
+        self.line_numbers: Dict[str, int] = {}
+        self.warnings: List[str] = []
+
+    @classmethod
+    def load(cls, path: str) -> "StoreIpTable":
+        """Return the parsed table for a properties file, re-parsing only if it changed."""
+        stat = Path(path).stat()
+        key = str(Path(path).resolve())
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = cls._cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        table = cls(path)
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            table._parse(f)
+        cls._cache[key] = (signature, table)
+        return table
+
+    def _parse(self, lines) -> None:
+        """Parse store_id:ip_address lines, collecting warnings for bad ones."""
+        for line_num, line in enumerate(lines, 1):
+            line = line.strip()
+
+            # Skip empty lines and comments
+            if not line or line.startswith('#') or line.startswith('!'):
+                continue
+
+            store_id, separator, ip_address = line.partition(':')
+            if not separator:
+                self.warnings.append(f"Invalid format on line {line_num}: {line}")
+                continue
+
+            store_id = store_id.strip()
+            ip_address = ip_address.strip()
+            if ipv4_to_int(ip_address) is None:
+                self.warnings.append(f"Invalid IP address '{ip_address}' for store {store_id} on line {line_num}")
+                continue
+
+            self.entries[store_id] = ip_address
+            self.line_numbers[store_id] = line_num
+
+
+def wall_type_for(wall_id: str) -> str:
+    """Derive the wall type name from a wall ID."""
+    return "WALL_TYPE_DISPOSAL" if wall_id == "100" else f"WALL_TYPE_{wall_id}"
+
+
+class ChangeBuilder:
+    """
+    Factory for <change> elements with precomputed URL strings.
+
+    URLs for the known wall IDs and card positions are formatted once and
+    reused for every store; each change is created with a single Element
+    call instead of an Element plus three set() calls.
+    """
+
+    WALL_FILE = "wall-config.xml"
+    CARD_FILE = "service-cards.xml"
+    CARD_URL = "service-cards-config.service-cards.service-card"
+
+    def __init__(self, max_wall_id: int = 3, max_cards: int = 16):
+        # wall ID -> (clientId URL, wallType URL, wall type, description URL)
+        self.wall_urls: Dict[str, Tuple[str, str, str, str]] = {}
+        self.card_urls: List[str] = []
+        self.prepare_walls([str(wall_id) for wall_id in range(1, max_wall_id + 1)] + ["100"])
+        self.prepare_cards(max_cards)
+
+    def prepare_walls(self, wall_ids: Iterable[str]) -> None:
+        """Precompute URLs for the given wall IDs."""
+        for wall_id in wall_ids:
+            if wall_id not in self.wall_urls:
+                wall_type = wall_type_for(wall_id)
+                self.wall_urls[wall_id] = (f"wall-config.walls.{wall_id}.clientId",
+                                           f"wall-config.walls.{wall_id}.wallType",
+                                           wall_type,
+                                           f"wall-config.wall-types.{wall_type}.description")
+
+    def prepare_cards(self, count: int) -> None:
+        """Precompute URLs for the first count card positions (first card has no suffix)."""
+        for idx in range(len(self.card_urls), count):
+            self.card_urls.append(self.CARD_URL if idx == 0 else f"{self.CARD_URL}:{idx + 1}")
+
+    def _wall(self, wall_id: str) -> Tuple[str, str, str, str]:
+        urls = self.wall_urls.get(wall_id)
+        if urls is None:
+            self.prepare_walls([wall_id])
+            urls = self.wall_urls[wall_id]
+        return urls
+
+    @staticmethod
+    def change(file: str, url: str, value: str) -> ET.Element:
+        """Create one change element (attributes keep file, url, value order)."""
+        return ET.Element("change", {"file": file, "url": url, "value": value})
+
+    def bulk(self, file: str, pairs: Iterable[Tuple[str, str]]) -> List[ET.Element]:
+        """Create change elements for (url, value) pairs of one file."""
+        make = ET.Element
+        return [make("change", {"file": file, "url": url, "value": value}) for url, value in pairs]
+
+    def wall_changes(self, walls: Dict[str, str], described: Dict[str, Any]) -> List[ET.Element]:
+        """clientId changes for every wall, plus wallType for walls with a description entry."""
+        make = ET.Element
+        file = self.WALL_FILE
+        changes: List[ET.Element] = []
+        for wall_id, ip_address in walls.items():
+            client_url, type_url, wall_type, _ = self._wall(wall_id)
+            changes.append(make("change", {"file": file, "url": client_url, "value": ip_address}))
+            if wall_id in described:
+                changes.append(make("change", {"file": file, "url": type_url, "value": wall_type}))
+        return changes
+
+    def wall_type_description_changes(self, walls: Dict[str, str], descriptions: Dict[str, Any]) -> List[ET.Element]:
+        """Description changes for used walls with a non-empty description."""
+        pairs = ((self._wall(wall_id)[3], description) for wall_id, description in descriptions.items()
+                 if wall_id in walls and description and description.strip())
+        return self.bulk(self.WALL_FILE, pairs)
+
+    def card_changes(self, cards: List[str]) -> List[ET.Element]:
+        """Service card changes in list order."""
+        if len(cards) > len(self.card_urls):
+            self.prepare_cards(len(cards))
+        return self.bulk(self.CARD_FILE, zip(self.card_urls, cards))
+
+
+class FragmentRenderer:
+    """
+    Serializes store structures with the invariant template parts rendered once.
+
+    The template is pretty-printed a single time with marker values in the
+    store-specific attributes and split into fragments. Per store, only the
+    marker values and the change elements are written, and the result is
+    byte-identical to format_xml() of the equivalent element tree.
+    """
+
+    # Private-use characters never appear in mapping data
+    MARKER = "\ue000{}\ue001"
+    MARKER_PATTERN = re.compile("\ue000(\\w+)\ue001")
+    STORE_FIELDS = {"country": "country", "name": "name", "parent-node-ident": "parent_node"}
+
+    def __init__(self, template_root: ET.Element, format_xml: Callable[[ET.Element], str]):
+        template_store_node = template_root.find(".//node[@alias='GKR-Store']")
+        if template_store_node is None or template_store_node.find("node[@alias='CSE-wdm']") is None:
+            raise ValueError("Template has no GKR-Store node with a CSE-wdm child")
+
+        self.escapes = self._probe_escapes(format_xml)
+        skeleton = self._skeleton(template_root, template_store_node)
+        text = format_xml(skeleton)
+
+        # The marker change line stands for all change lines of a store
+        marker_line = re.search(r"\n( *)<change file=\"" + self.MARKER.format("changes") + r"\"/>\n", text)
+        store_tag = text.index("<node alias=\"GKR-Store\"")
+        store_start = text.rindex("\n", 0, store_tag) + 1
+        closing = "\n" + " " * (store_tag - store_start) + "</node>\n"
+        store_end = text.index(closing, marker_line.end() - 1) + len(closing)
+
+        self.header = text[:store_start]
+        self.footer = text[store_end:]
+        self.change_indent = marker_line.group(1)
+        self.before_changes = self._compile(text[store_start:marker_line.start() + 1])
+        self.after_changes = self._compile(text[marker_line.end():store_end])
+
+    def _probe_escapes(self, format_xml: Callable[[ET.Element], str]) -> Dict[int, str]:
+        """Learn how format_xml escapes attribute values, so splicing matches it exactly."""
+        escapes: Dict[int, str] = {}
+        for char in "&<>\"'\n\r\t":
+            rendered = format_xml(ET.Element("probe", {"value": char}))
+            escaped = rendered[rendered.index('value="') + 7:rendered.rindex('"')]
+            if escaped != char:
+                escapes[ord(char)] = escaped
+        return escapes
+
+    def _skeleton(self, template_root: ET.Element, template_store_node: ET.Element) -> ET.Element:
+        """Template structure with one store whose varying attributes are markers."""
+        skeleton = ET.Element("structure")
+        for section in ("systems", "time-regimes", "central-is"):
+            target = ET.SubElement(skeleton, section)
+            template_section = template_root.find(section)
+            if template_section is not None:
+                for child in template_section:
+                    target.append(ET.fromstring(ET.tostring(child)))
+
+        nodes = ET.SubElement(skeleton, "nodes")
+        store_node = ET.SubElement(nodes, "node")
+        store_node.set("alias", "GKR-Store")
+        for attribute in ("country", "name", "parent-node-ident", "rsid", "unique-name"):
+            store_node.set(attribute, self.MARKER.format(attribute.replace("-", "_")))
+
+        for child_node in template_store_node:
+            if child_node.tag != "node":
+                continue
+            new_child = ET.fromstring(ET.tostring(child_node))
+            unique_name = new_child.get("unique-name")
+            if unique_name:
+                new_child.set("unique-name", unique_name.replace("9999", self.MARKER.format("rsid")))
+            if new_child.get("alias") == "CSE-wdm":
+                ET.SubElement(new_child, "change", {"file": self.MARKER.format("changes")})
+            store_node.append(new_child)
+        return skeleton
+
+    def _compile(self, text: str) -> List[str]:
+        """Split text into alternating literal parts and field names."""
+        return self.MARKER_PATTERN.split(text)
+
+    def _fill(self, parts: List[str], fields: Dict[str, str], out: List[str]) -> None:
+        for position, part in enumerate(parts):
+            out.append(fields[part] if position % 2 else part)
+
+    def render_store(self, store_id: str, store_data: Dict[str, Any], changes: List[ET.Element], out: List[str]) -> None:
+        """Append the serialized node of one store to out."""
+        escapes = self.escapes
+        fields = {
+            "country": store_data["country"].translate(escapes),
+            "name": store_data["name"].translate(escapes),
+            "parent_node_ident": store_data["parent_node"].translate(escapes),
+            "rsid": store_id.translate(escapes),
+            "unique_name": store_unique_name(store_data).translate(escapes),
+        }
+        if not changes:
+            # A CSE-wdm node without changes is written self-closing
+            before = self.before_changes[:-1] + [self.before_changes[-1][:-2] + "/>\n"]
+            after = self.after_changes[:]
+            after[0] = after[0].split("\n", 1)[1]
+            self._fill(before, fields, out)
+            self._fill(after, fields, out)
+            return
+
+        self._fill(self.before_changes, fields, out)
+        indent = self.change_indent
+        for change in changes:
+            attributes = "".join(f' {key}="{value.translate(escapes)}"' for key, value in change.attrib.items())
+            out.append(f"{indent}<change{attributes}/>\n")
+        self._fill(self.after_changes, fields, out)
+
+    def render(self, stores: List[Tuple[str, Dict[str, Any], List[ET.Element]]]) -> str:
+        """Serialize a structure holding the given (store_id, store_data, changes)."""
+        out = [self.header]
+        for store_id, store_data, changes in stores:
+            self.render_store(store_id, store_data, changes, out)
+        out.append(self.footer)
+        return "".join(out)
+
+
 class StoreConfigGenerator:
     """Main class for generating store configurations."""
     
     def __init__(self, mapping_file: str = "config/mappings/store_wall_mapping.json",
                  template_file: str = "config/templates/template.xml",
                  ip_mapping_file: str = "config/mappings/store_ip_mapping.properties",
-                 service_cards_file: str = "config/mappings/service_cards_mapping.json"):
+                 service_cards_file: str = "config/mappings/service_cards_mapping.json",
+                 webui_rule: Optional[str] = None):
+        if webui_rule is not None:
+            parse_webui_rule(webui_rule)
         self.mapping_file = mapping_file
         self.template_file = template_file
         self.ip_mapping_file = ip_mapping_file
         self.service_cards_file = service_cards_file
+        # Rule for deriving the web-ui server address when a store has no properties entry
+        self.webui_rule = webui_rule
         self.store_mapping: Optional[Dict[str, Any]] = None
         self.template_root: Optional[ET.Element] = None
         self.store_ip_mapping: Optional[Dict[str, str]] = None
         self.service_cards_mapping: Optional[Dict[str, Any]] = None
-        
-    def load_store_mapping(self) -> Dict[str, Any]:
-        """Load and validate the store mapping JSON file."""
+        self.collision_index: Optional[CollisionIndex] = None
+        self.service_card_index: Optional[ServiceCardIndex] = None
+        self.duplicate_store_ids: List[str] = []
+        # Store ID -> unique-name for stores known from the offset index but not decoded
+        self.indexed_store_names: Dict[str, Optional[str]] = {}
+        self.change_builder = ChangeBuilder()
+        # Compiled templates other than the default, and serializers per template (or template set)
+        self.templates: Dict[str, ET.Element] = {}
+        self._fragment_renderers: Dict[str, Optional[FragmentRenderer]] = {}
+
+    def _mapping_object_hook(self, pairs: List[Tuple[str, Any]]) -> Dict[str, Any]:
+        """Build a JSON object while recording store IDs that appear more than once."""
+        obj: Dict[str, Any] = {}
+        for key, value in pairs:
+            # json.load silently keeps the last duplicate key, which would hide an rsid collision
+            if key in obj and isinstance(value, dict) and "parent_node" in value:
+                self.duplicate_store_ids.append(key)
+            obj[key] = value
+        return obj
+
+    def load_store_mapping(self, store_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Load and validate the store mapping JSON file.
+
+        With store_ids, only those stores are decoded through the offset
+        index (see mapping_reader.py); the rest of the fleet is known by ID
+        and unique-name only, which is enough for the collision checks.
+        """
         try:
-            with open(self.mapping_file, 'r', encoding='utf-8') as f:
-                self.store_mapping = json.load(f)
+            self.duplicate_store_ids = []
+            self.indexed_store_names = {}
+            self.collision_index = None
+            if store_ids is not None:
+                with LazyMappingReader(self.mapping_file) as reader:
+                    self.store_mapping = reader.load_mapping(store_ids)
+                    self.duplicate_store_ids = list(reader.duplicates)
+                    self.indexed_store_names = {store_id: unique_name
+                                                for store_id, unique_name in reader.unique_names().items()
+                                                if store_id not in self.store_mapping["stores"]}
+            else:
+                # utf-8-sig also accepts mapping snapshots saved with a BOM
+                with open(self.mapping_file, 'r', encoding='utf-8-sig') as f:
+                    self.store_mapping = json.load(f, object_pairs_hook=self._mapping_object_hook)
 
-            # Validate mandatory walls
+            # Validate mandatory walls, reporting every bad store at once
             if self.store_mapping and 'metadata' in self.store_mapping:
-                mandatory_walls = self.store_mapping['metadata'].get('mandatory_walls', [])
+                problems: List[str] = []
                 for store_id, store_data in self.store_mapping['stores'].items():
-                    if store_data.get('skip_wdm', False):
-                        continue
-                    walls = store_data.get('walls')
-                    if walls is None:
-                        raise ValueError(f"Store {store_id} missing 'walls' definition")
-                    if not isinstance(walls, dict):
-                        raise ValueError(f"Store {store_id} has invalid walls definition (expected object)")
-                    for wall_id in mandatory_walls:
-                        if str(wall_id) not in walls:
-                            raise ValueError(f"Store {store_id} missing mandatory wall {wall_id}")
+                    problems.extend(self._check_store_walls(store_id, store_data))
+                if problems:
+                    raise ValueError("\n   - ".join([f"{len(problems)} problem(s) in mapping:"] + problems))
             if self.store_mapping is not None:
-                print(f"✓ Loaded mapping for {len(self.store_mapping['stores'])} stores")
+                for store_data in self.store_mapping['stores'].values():
+                    walls = store_data.get('walls')
+                    if isinstance(walls, dict):
+                        self.change_builder.prepare_walls(walls)
+                if store_ids is not None:
+                    total = len(self.store_mapping['stores']) + len(self.indexed_store_names)
+                    print(f"✓ Loaded mapping for {len(self.store_mapping['stores'])} of {total} stores (indexed)")
+                else:
+                    print(f"✓ Loaded mapping for {len(self.store_mapping['stores'])} stores")
                 return self.store_mapping
             else:
                 raise ValueError("Failed to load store mapping")
@@ -106,42 +541,45 @@ class StoreConfigGenerator:
             print(f"❌ Error loading mapping: {e}")
             sys.exit(1)
     
+    def skip_wdm_store_ids(self) -> Set[str]:
+        """IDs of the stores that keep their template unchanged (skip_wdm)."""
+        if not self.store_mapping:
+            return set()
+        return {store_id for store_id, store_data in self.store_mapping["stores"].items()
+                if store_data.get("skip_wdm", False)}
+
+    def _mandatory_walls(self) -> List[str]:
+        """Return the mandatory wall IDs declared in the mapping metadata."""
+        if not self.store_mapping:
+            return []
+        return [str(wall_id) for wall_id in self.store_mapping.get('metadata', {}).get('mandatory_walls', [])]
+
+    def _check_store_walls(self, store_id: str, store_data: Dict[str, Any]) -> List[str]:
+        """Return structural problems with a store's walls definition."""
+        if store_data.get('skip_wdm', False):
+            return []
+        walls = store_data.get('walls')
+        if walls is None:
+            return [f"Store {store_id} missing 'walls' definition"]
+        if not isinstance(walls, dict):
+            return [f"Store {store_id} has invalid walls definition (expected object)"]
+        return [f"Store {store_id} missing mandatory wall {wall_id}"
+                for wall_id in self._mandatory_walls() if wall_id not in walls]
+
     def load_store_ip_mapping(self) -> Dict[str, str]:
         """Load the store IP mapping properties file."""
         try:
-            store_ip_mapping = {}
-            
-            with open(self.ip_mapping_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    
-                    # Skip empty lines and comments
-                    if not line or line.startswith('#') or line.startswith('!'):
-                        continue
-                    
-                    # Parse store_id:ip_address format
-                    if ':' in line:
-                        parts = line.split(':', 1)
-                        if len(parts) == 2:
-                            store_id = parts[0].strip()
-                            ip_address = parts[1].strip()
-                            
-                            # Validate IP address
-                            if self.validate_ip_address(ip_address):
-                                store_ip_mapping[store_id] = ip_address
-                            else:
-                                print(f"⚠️  Warning: Invalid IP address '{ip_address}' for store {store_id} on line {line_num}")
-                        else:
-                            print(f"⚠️  Warning: Invalid format on line {line_num}: {line}")
-                    else:
-                        print(f"⚠️  Warning: Invalid format on line {line_num}: {line}")
+            table = StoreIpTable.load(self.ip_mapping_file)
+            for warning in table.warnings:
+                print(f"⚠️  Warning: {warning}")
             
-            self.store_ip_mapping = store_ip_mapping
-            print(f"✓ Loaded IP mapping for {len(store_ip_mapping)} stores from '{self.ip_mapping_file}'")
-            return store_ip_mapping
+            self.store_ip_mapping = table.entries
+            print(f"✓ Loaded IP mapping for {len(table.entries)} stores from '{self.ip_mapping_file}'")
+            return table.entries
             
         except FileNotFoundError:
-            print(f"⚠️  Warning: IP mapping file '{self.ip_mapping_file}' not found - web-ui-config changes will be skipped")
+            fallback = "only derived addresses will be used" if self.effective_webui_rule() else "web-ui-config changes will be skipped"
+            print(f"⚠️  Warning: IP mapping file '{self.ip_mapping_file}' not found - {fallback}")
             self.store_ip_mapping = {}
             return {}
         except Exception as e:
@@ -152,6 +590,7 @@ class StoreConfigGenerator:
     def load_service_cards_mapping(self) -> Dict[str, Any]:
         """Load the service cards mapping JSON file."""
         try:
+            self.service_card_index = ServiceCardIndex()
             with open(self.service_cards_file, 'r', encoding='utf-8') as f:
                 self.service_cards_mapping = json.load(f)
             
@@ -159,6 +598,16 @@ class StoreConfigGenerator:
                 total_stores = len(self.service_cards_mapping['stores'])
                 total_cards = sum(store_data['card_count'] for store_data in self.service_cards_mapping['stores'].values())
                 print(f"✓ Loaded service cards mapping: {total_stores} stores, {total_cards} cards from '{self.service_cards_file}'")
+                
+                # Index every card once so problems are known before generation
+                self.service_card_index = ServiceCardIndex.from_mapping(self.service_cards_mapping)
+                self.change_builder.prepare_cards(max((len(store_data.get('cards', []))
+                                                       for store_data in self.service_cards_mapping['stores'].values()),
+                                                      default=0))
+                index = self.service_card_index
+                if index.malformed or index.duplicates or index.shared_cards():
+                    print(f"⚠️  Service cards: {len(index.malformed)} malformed, {len(index.duplicates)} duplicated "
+                          f"within a store, {len(index.shared_cards())} shared by several stores")
                 return self.service_cards_mapping
             else:
                 raise ValueError("Invalid service cards mapping structure")
@@ -181,6 +630,8 @@ class StoreConfigGenerator:
         try:
             tree = ET.parse(self.template_file)
             self.template_root = tree.getroot()
+            # Other compiled templates stay cached; only serializers built from the old default go
+            self._forget_renderers(self.template_file)
             print(f"✓ Loaded template from '{self.template_file}'")
             return self.template_root
             
@@ -191,6 +642,106 @@ class StoreConfigGenerator:
             print(f"❌ Error: Invalid XML in template file: {e}")
             sys.exit(1)
     
+    def forget_template(self, path: str) -> None:
+        """Drop a compiled non-default template so it is loaded again on next use."""
+        self.templates.pop(path, None)
+        self._forget_renderers(path)
+
+    def _forget_renderers(self, path: str) -> None:
+        """Drop the serializers built from a template, including combined ones."""
+        for key in [key for key in self._fragment_renderers if path in key.split("\n")]:
+            del self._fragment_renderers[key]
+
+    def template_path_for(self, store_data: Dict[str, Any]) -> str:
+        """
+        Template file for a store: its 'template' key, else the template for
+        its country in metadata.templates, else the default template.
+
+        Relative names are resolved against the default template's directory.
+        """
+        name = store_data.get("template")
+        if not name and self.store_mapping:
+            name = self.store_mapping.get("metadata", {}).get("templates", {}).get(store_data.get("country", ""))
+        if not name:
+            return self.template_file
+        path = Path(name)
+        if not path.is_absolute():
+            path = Path(self.template_file).parent / path
+        return str(path)
+
+    def template_root_for(self, store_data: Dict[str, Any]) -> Optional[ET.Element]:
+        """Return the compiled template of a store, loading it once on first use."""
+        path = self.template_path_for(store_data)
+        if path == self.template_file:
+            if self.template_root is None:
+                self.load_template()
+            return self.template_root
+
+        template_root = self.templates.get(path)
+        if template_root is None:
+            try:
+                template_root = ET.parse(path).getroot()
+            except FileNotFoundError:
+                raise ValueError(f"Template file '{path}' not found")
+            except ET.ParseError as e:
+                raise ValueError(f"Invalid XML in template file '{path}': {e}")
+            self.templates[path] = template_root
+            print(f"✓ Loaded template from '{path}'")
+        return template_root
+
+    def template_systems(self, store_data: Dict[str, Any]) -> List[str]:
+        """Aliases of the systems declared by a store's template."""
+        template_root = self.template_root_for(store_data)
+        systems = template_root.find("systems") if template_root is not None else None
+        return [system.get("alias", "") for system in systems] if systems is not None else []
+
+    def template_files(self, store_ids: Optional[List[str]] = None) -> List[str]:
+        """Distinct template files used by the given stores (default: all), default template first."""
+        paths = [self.template_file]
+        if self.store_mapping:
+            stores = self.store_mapping["stores"]
+            for store_id in (store_ids if store_ids is not None else list(stores)):
+                if store_id in stores:
+                    path = self.template_path_for(stores[store_id])
+                    if path not in paths:
+                        paths.append(path)
+        return paths
+
+    def combined_template_root(self, store_ids: Optional[List[str]] = None) -> Optional[ET.Element]:
+        """
+        Template for the shared sections of a combined file: the default
+        template, with the systems of every other template in use appended.
+        """
+        if self.template_root is None:
+            self.load_template()
+        paths = self.template_files(store_ids)
+        if len(paths) == 1 or self.template_root is None:
+            return self.template_root
+
+        merged = ET.fromstring(ET.tostring(self.template_root))
+        systems = merged.find("systems")
+        if systems is None:
+            systems = ET.SubElement(merged, "systems")
+        known = {system.get("alias") for system in systems}
+        stores = self.store_mapping["stores"] if self.store_mapping else {}
+        for path in paths[1:]:
+            store_data = next(data for data in stores.values() if self.template_path_for(data) == path)
+            template_systems = self.template_root_for(store_data).find("systems")
+            for system in (template_systems if template_systems is not None else []):
+                if system.get("alias") not in known:
+                    known.add(system.get("alias"))
+                    systems.append(ET.fromstring(ET.tostring(system)))
+        return merged
+
+    def group_by_template(self, store_ids: List[str]) -> List[str]:
+        """Order store IDs so stores sharing a template are adjacent (stable within a template)."""
+        if not self.store_mapping:
+            return list(store_ids)
+        stores = self.store_mapping["stores"]
+        order = {path: position for position, path in enumerate(self.template_files(store_ids))}
+        return sorted(store_ids, key=lambda store_id: order.get(
+            self.template_path_for(stores[store_id]) if store_id in stores else self.template_file, 0))
+
     def validate_ip_address(self, ip: str) -> bool:
         """Validate IP address format."""
         try:
@@ -198,7 +749,214 @@ class StoreConfigGenerator:
             return True
         except ipaddress.AddressValueError:
             return False
-    
+
+    def preflight_check(self, store_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Check the whole mapping in one batch before any XML is built.
+
+        Covers wall definitions, mandatory walls, empty and invalid IPs,
+        duplicate IPs within a store and /24 subnet consistency between a
+        store's walls and its IP mapping entry (or wall 1 when there is none).
+        Walls outside the store subnet are warnings; everything else is an
+        error. Returns every problem found instead of stopping at the first
+        one, with the stores that have errors in "failed_stores".
+        """
+        if self.store_mapping is None:
+            self.load_store_mapping()
+
+        if self.store_ip_mapping is None:
+            self.load_store_ip_mapping()
+
+        if self.store_mapping is None:
+            raise ValueError("Store mapping not loaded")
+
+        stores = self.store_mapping["stores"]
+        ip_mapping = self.store_ip_mapping or {}
+        selected = stores.keys() if store_ids is None else [s for s in store_ids if s in stores]
+
+        errors: List[str] = []
+        warnings: List[str] = []
+        # Stores with at least one error, in the order they were found
+        failed: Dict[str, None] = {}
+
+        def fail(store_id: str, message: str) -> None:
+            errors.append(message)
+            failed[store_id] = None
+
+        # Flatten every wall of every selected store so the IPs are parsed in a single pass
+        wall_rows: List[Tuple[str, str, str]] = []
+        for store_id in selected:
+            store_data = stores[store_id]
+            for message in self._check_store_walls(store_id, store_data):
+                fail(store_id, message)
+            walls = store_data.get("walls")
+            if store_data.get("skip_wdm", False) or not isinstance(walls, dict):
+                continue
+            if not walls:
+                fail(store_id, f"Store {store_id} has no wall definitions")
+            for wall_id, ip_address in walls.items():
+                wall_rows.append((store_id, wall_id, ip_address if isinstance(ip_address, str) else ""))
+
+        parsed = [ipv4_to_int(ip_address) for _, _, ip_address in wall_rows]
+
+        # Subnet (first three octets) each store is expected to live in
+        store_subnets: Dict[str, int] = {}
+        for store_id in selected:
+            reference = ipv4_to_int(ip_mapping.get(store_id, ""))
+            if reference is not None:
+                store_subnets[store_id] = reference >> 8
+        for (store_id, wall_id, _), value in zip(wall_rows, parsed):
+            if wall_id == "1" and value is not None:
+                store_subnets.setdefault(store_id, value >> 8)
+
+        seen_ips: Dict[Tuple[str, int], str] = {}
+        for (store_id, wall_id, ip_address), value in zip(wall_rows, parsed):
+            if not ip_address.strip():
+                fail(store_id, f"Store {store_id} wall {wall_id} has an empty IP address")
+                continue
+            if value is None:
+                fail(store_id, f"Invalid IP address '{ip_address}' for store {store_id}, wall {wall_id}")
+                continue
+            other_wall = seen_ips.get((store_id, value))
+            if other_wall is not None:
+                fail(store_id, f"Store {store_id} walls {other_wall} and {wall_id} share IP address {ip_address}")
+            seen_ips[(store_id, value)] = wall_id
+            subnet = store_subnets.get(store_id)
+            if subnet is not None and value >> 8 != subnet:
+                expected = int_to_ipv4(subnet << 8)
+                # Some stores really do span two /24s, so this is reported but does not block generation
+                warnings.append(f"Store {store_id} wall {wall_id} IP {ip_address} is outside the store subnet {expected}/24")
+
+        for store_id in selected:
+            try:
+                self.template_root_for(stores[store_id])
+            except ValueError as e:
+                fail(store_id, f"Store {store_id}: {e}")
+
+        if self.service_cards_mapping is None:
+            self.load_service_cards_mapping()
+        card_index = self.service_card_index or ServiceCardIndex()
+        for store_id in selected:
+            card_errors, card_warnings = card_index.store_problems(store_id)
+            for message in card_errors:
+                fail(store_id, message)
+            warnings.extend(f"Store {store_id}: {warning}" for warning in card_warnings)
+
+        for store_id in selected:
+            store_data = stores[store_id]
+            if store_data.get("skip_wdm", False) or store_data.get("skip_webui", False):
+                continue
+            if self.resolve_webui_ip(store_id, store_data)[0] is None:
+                warnings.append(f"Store {store_id} has no IP mapping entry - web-ui-config change will be skipped")
+
+        return {
+            "stores": len(selected),
+            "walls": len(wall_rows),
+            "valid": len(errors) == 0,
+            "errors": errors,
+            "failed_stores": list(failed),
+            "warnings": warnings
+        }
+
+    def check_preflight(self, store_ids: Optional[List[str]] = None) -> None:
+        """Run the pre-flight check and fail fast with every problem found."""
+        result = self.preflight_check(store_ids)
+        if not result["valid"]:
+            raise ValueError("\n   - ".join(
+                [f"Pre-flight check found {len(result['errors'])} problem(s):"] + result["errors"]))
+
+        if store_ids is None:
+            print(f"✓ Pre-flight check passed for {result['stores']} stores ({result['walls']} walls)")
+
+    def preflight_passed(self, store_ids: Optional[List[str]] = None) -> List[str]:
+        """
+        Run the pre-flight check, report every problem found and return the
+        given stores (None = all) that have no errors, so only the failing
+        stores are held back.
+        """
+        result = self.preflight_check(store_ids)
+        stores = self.store_mapping["stores"] if self.store_mapping else {}
+        selected = list(stores) if store_ids is None else store_ids
+        if result["valid"]:
+            if store_ids is None:
+                print(f"✓ Pre-flight check passed for {result['stores']} stores ({result['walls']} walls)")
+            return selected
+
+        print(f"🚨 Pre-flight check found {len(result['errors'])} problem(s):")
+        for error in result["errors"]:
+            print(f"   - {error}")
+        failed = set(result["failed_stores"])
+        print(f"🚫 Held back {len(failed)} store(s) with pre-flight errors: {', '.join(result['failed_stores'])}")
+        return [store_id for store_id in selected if store_id not in failed]
+
+    def build_collision_index(self) -> CollisionIndex:
+        """Index store unique-names, child node unique-names and rsids in one pass."""
+        if self.store_mapping is None:
+            self.load_store_mapping()
+
+        if self.template_root is None:
+            self.load_template()
+
+        if self.store_mapping is None:
+            raise ValueError("Store mapping not loaded")
+
+        # Child node unique-names only differ by the 9999 placeholder, so resolve each template once
+        template_child_names: Dict[str, List[Tuple[str, str]]] = {}
+
+        def child_names_for(store_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+            path = self.template_path_for(store_data)
+            if path not in template_child_names:
+                names: List[Tuple[str, str]] = []
+                try:
+                    template_root = self.template_root_for(store_data)
+                except ValueError:
+                    template_root = None  # reported by the pre-flight check
+                template_store_node = template_root.find(".//node[@alias='GKR-Store']") if template_root is not None else None
+                if template_store_node is not None:
+                    for child_node in template_store_node:
+                        unique_name = child_node.get("unique-name")
+                        if child_node.tag == "node" and unique_name:
+                            names.append((child_node.get("alias", ""), unique_name))
+                template_child_names[path] = names
+            return template_child_names[path]
+
+        child_names = child_names_for({})
+
+        index = CollisionIndex()
+        for store_id in self.duplicate_store_ids:
+            index.add_rsid(store_id, "GKR-Store, duplicate key in mapping")
+
+        for store_id, store_data in self.store_mapping["stores"].items():
+            index.add_rsid(store_id)
+            index.add_unique_name(store_unique_name(store_data), store_id, "GKR-Store")
+            for alias, unique_name in child_names_for(store_data):
+                index.add_unique_name(unique_name.replace("9999", store_id), store_id, alias)
+
+        # Stores that were not decoded still take part through their indexed names
+        for store_id, store_name in self.indexed_store_names.items():
+            index.add_rsid(store_id)
+            if store_name:
+                index.add_unique_name(store_name, store_id, "GKR-Store")
+            for alias, unique_name in child_names:
+                index.add_unique_name(unique_name.replace("9999", store_id), store_id, alias)
+
+        self.collision_index = index
+        return index
+
+    def check_collisions(self, store_ids: Optional[List[str]] = None) -> None:
+        """
+        Fail fast if any unique-name or rsid is used more than once.
+
+        With store_ids, only collisions involving those stores are reported.
+        """
+        index = self.collision_index or self.build_collision_index()
+        conflicts = index.conflicts(store_ids)
+        if conflicts:
+            raise ValueError(index.format_report(conflicts))
+
+        if store_ids is None:
+            print(f"✓ No unique-name or rsid collisions across {len(index.rsids)} stores")
+
     def generate_wall_changes(self, store_id: str, store_data: Dict[str, Any]) -> List[ET.Element]:
         """Generate wall configuration change elements for a store."""
         if store_data.get("skip_wdm", False):
@@ -209,34 +967,12 @@ class StoreConfigGenerator:
         if not walls:
             raise ValueError(f"No wall definitions found for store {store_id}")
 
-        changes: List[ET.Element] = []
-
-        # Get store-level wall type descriptions (opt-in feature)
-        wall_type_descriptions = store_data.get("wall_type_descriptions", {})
-
         for wall_id, ip_address in walls.items():
             if not self.validate_ip_address(ip_address):
                 raise ValueError(f"Invalid IP address '{ip_address}' for store {store_id}, wall {wall_id}")
 
-            # Add clientId change (always generated)
-            change = ET.Element("change")
-            change.set("file", "wall-config.xml")
-            change.set("url", f"wall-config.walls.{wall_id}.clientId")
-            change.set("value", ip_address)
-            changes.append(change)
-
-            # Add wallType change ONLY if this wall has a description defined in wall_type_descriptions
-            if wall_id in wall_type_descriptions:
-                # Auto-derive wall type from wall ID
-                wall_type = "WALL_TYPE_DISPOSAL" if wall_id == "100" else f"WALL_TYPE_{wall_id}"
-
-                wall_type_change = ET.Element("change")
-                wall_type_change.set("file", "wall-config.xml")
-                wall_type_change.set("url", f"wall-config.walls.{wall_id}.wallType")
-                wall_type_change.set("value", wall_type)
-                changes.append(wall_type_change)
-
-        return changes
+        # clientId for every wall; wallType ONLY for walls with an entry in wall_type_descriptions (opt-in)
+        return self.change_builder.wall_changes(walls, store_data.get("wall_type_descriptions", {}))
 
     def generate_wall_type_description_changes(self, store_id: str, store_data: Dict[str, Any]) -> List[ET.Element]:
         """Generate wall type description change elements for a store."""
@@ -248,8 +984,6 @@ class StoreConfigGenerator:
         if not walls:
             return []
 
-        changes: List[ET.Element] = []
-
         # Get store-level wall type descriptions (opt-in feature)
         wall_type_descriptions = store_data.get("wall_type_descriptions", {})
 
@@ -257,28 +991,98 @@ class StoreConfigGenerator:
         if not wall_type_descriptions:
             return []
 
-        # Generate description change for each wall that has a description
-        for wall_id, description in wall_type_descriptions.items():
-            # Skip if this wall is not actually used by the store
-            if wall_id not in walls:
-                continue
-
-            # Auto-derive wall type from wall ID
-            wall_type = "WALL_TYPE_DISPOSAL" if wall_id == "100" else f"WALL_TYPE_{wall_id}"
-
-            # Only create change if description is not empty
-            if description and description.strip():
-                change = ET.Element("change")
-                change.set("file", "wall-config.xml")
-                change.set("url", f"wall-config.wall-types.{wall_type}.description")
-                change.set("value", description)
-                changes.append(change)
+        # One description change per used wall with a non-empty description
+        changes = self.change_builder.wall_type_description_changes(walls, wall_type_descriptions)
 
         if changes:
             print(f"   Added {len(changes)} wall type description(s) for store {store_id}")
 
         return changes
 
+    def effective_webui_rule(self) -> Optional[str]:
+        """Return the web-ui derivation rule from the constructor or the mapping metadata."""
+        if self.webui_rule:
+            return self.webui_rule
+        if self.store_mapping:
+            return self.store_mapping.get("metadata", {}).get("webui_address_rule")
+        return None
+
+    def derive_webui_ip(self, store_data: Dict[str, Any], rule: str) -> Optional[str]:
+        """Derive a store's web-ui server IP from its walls using a rule."""
+        kind, number = parse_webui_rule(rule)
+        walls = store_data.get("walls") or {}
+
+        if kind == "wall":
+            ip_address = walls.get(str(number), "")
+            return ip_address if ipv4_to_int(ip_address) is not None else None
+
+        wall_1 = ipv4_to_int(walls.get("1", ""))
+        if wall_1 is None:
+            return None
+        return int_to_ipv4((wall_1 & ~0xFF) | number)
+
+    def resolve_webui_ip(self, store_id: str, store_data: Dict[str, Any]) -> Tuple[Optional[str], str]:
+        """
+        Return (ip_address, source) for a store's web-ui server address.
+
+        The properties entry wins; the derivation rule is only used when the
+        store has no entry. source is 'properties', the rule, or '' if unresolved.
+        """
+        if self.store_ip_mapping is None:
+            self.load_store_ip_mapping()
+
+        if self.store_ip_mapping and store_id in self.store_ip_mapping:
+            return self.store_ip_mapping[store_id], "properties"
+
+        rule = self.effective_webui_rule()
+        if rule:
+            derived = self.derive_webui_ip(store_data, rule)
+            if derived is not None:
+                return derived, rule
+
+        return None, ""
+
+    def ip_mapping_consistency_report(self) -> Dict[str, List[str]]:
+        """
+        Compare store_ip_mapping.properties with addresses derived from the mapping.
+
+        Uses the configured rule, or wall 1 when none is set.
+        """
+        if self.store_mapping is None:
+            self.load_store_mapping()
+
+        if self.store_ip_mapping is None:
+            self.load_store_ip_mapping()
+
+        if self.store_mapping is None:
+            raise ValueError("Store mapping not loaded")
+
+        rule = self.effective_webui_rule() or "wall:1"
+        stores = self.store_mapping["stores"]
+        ip_mapping = self.store_ip_mapping or {}
+        report: Dict[str, List[str]] = {"matching": [], "mismatched": [], "missing": [], "orphaned": []}
+
+        for store_id, store_data in stores.items():
+            if store_data.get("skip_wdm", False) or store_data.get("skip_webui", False):
+                continue
+            derived = self.derive_webui_ip(store_data, rule)
+            entry = ip_mapping.get(store_id)
+            if entry is None:
+                hint = f"would derive {derived}" if derived else "cannot derive an address"
+                report["missing"].append(f"Store {store_id} has no properties entry ({rule}: {hint})")
+            elif derived is None:
+                report["mismatched"].append(f"Store {store_id}: properties {entry}, {rule} has no valid IP")
+            elif derived != entry:
+                report["mismatched"].append(f"Store {store_id}: properties {entry}, {rule} gives {derived}")
+            else:
+                report["matching"].append(store_id)
+
+        for store_id in ip_mapping:
+            if store_id not in stores:
+                report["orphaned"].append(f"Store {store_id} is in the properties file but not in the mapping")
+
+        return report
+
     def generate_webui_changes(self, store_id: str, store_data: Dict[str, Any]) -> List[ET.Element]:
         """Generate web-ui-config changes for a store based on IP mapping."""
         if store_data.get("skip_wdm", False) or store_data.get("skip_webui", False):
@@ -288,22 +1092,16 @@ class StoreConfigGenerator:
 
         changes: List[ET.Element] = []
 
-        # Load IP mapping if not already loaded
-        if self.store_ip_mapping is None:
-            self.load_store_ip_mapping()
-
-        # Check if store has IP mapping
-        if self.store_ip_mapping and store_id in self.store_ip_mapping:
-            ip_address = self.store_ip_mapping[store_id]
+        # Properties entry first, then the derivation rule if one is configured
+        ip_address, source = self.resolve_webui_ip(store_id, store_data)
 
+        if ip_address is not None:
             # Create web-ui-config change
-            change = ET.Element("change")
-            change.set("file", "web-ui-config.xml")
-            change.set("url", "webUiConfig.system.serverAddress")
-            change.set("value", f"http://{ip_address}:8080/app-wdm")
-            changes.append(change)
+            changes.append(ChangeBuilder.change("web-ui-config.xml", "webUiConfig.system.serverAddress",
+                                                f"http://{ip_address}:8080/app-wdm"))
 
-            print(f"   Added web-ui-config change for store {store_id}: http://{ip_address}:8080/app-wdm")
+            derived_note = "" if source == "properties" else f" (derived, {source})"
+            print(f"   Added web-ui-config change for store {store_id}: http://{ip_address}:8080/app-wdm{derived_note}")
 
         return changes
     
@@ -319,18 +1117,8 @@ class StoreConfigGenerator:
         if self.service_cards_mapping and store_id in self.service_cards_mapping.get('stores', {}):
             cards = self.service_cards_mapping['stores'][store_id]['cards']
             
-            for idx, card_number in enumerate(cards):
-                change = ET.Element("change")
-                change.set("file", "service-cards.xml")
-                
-                # First card has no index suffix, subsequent cards have :2, :3, etc.
-                if idx == 0:
-                    change.set("url", "service-cards-config.service-cards.service-card")
-                else:
-                    change.set("url", f"service-cards-config.service-cards.service-card:{idx + 1}")
-                
-                change.set("value", card_number)
-                changes.append(change)
+            # First card has no index suffix, subsequent cards have :2, :3, etc.
+            changes = self.change_builder.card_changes(cards)
             
             print(f"   Added {len(cards)} service card(s) for store {store_id}")
         
@@ -341,41 +1129,78 @@ class StoreConfigGenerator:
         changes: List[ET.Element] = []
         
         # Create wdm-config.properties change for businessUnitId
-        change = ET.Element("change")
-        change.set("file", "wdm-config.properties")
-        change.set("url", "remote-services.businessUnitId")
-        change.set("value", store_id)
-        changes.append(change)
+        changes.append(ChangeBuilder.change("wdm-config.properties", "remote-services.businessUnitId", store_id))
         
         print(f"   Added wdm-config change for store {store_id}: businessUnitId={store_id}")
         
         return changes
     
+    def collect_store_changes(self, store_id: str, store_data: Dict[str, Any]) -> List[ET.Element]:
+        """All change elements of a store's CSE-wdm node, in output order."""
+        changes = self.generate_wall_changes(store_id, store_data)
+        changes += self.generate_wall_type_description_changes(store_id, store_data)
+        changes += self.generate_webui_changes(store_id, store_data)
+        changes += self.generate_service_card_changes(store_id)
+        changes += self.generate_wdm_config_changes(store_id)
+        return changes
+
+    def fragment_renderer(self, store_data: Optional[Dict[str, Any]] = None) -> Optional[FragmentRenderer]:
+        """
+        Return the cached serializer for a store's template (default: the
+        default template), or None if the template does not support it.
+        """
+        path = self.template_path_for(store_data or {})
+        if path not in self._fragment_renderers:
+            template_root = self.template_root_for(store_data or {})
+            try:
+                renderer = FragmentRenderer(template_root, self.format_xml) if template_root is not None else None
+            except ValueError:
+                renderer = None
+            self._fragment_renderers[path] = renderer
+        return self._fragment_renderers[path]
+
+    def combined_renderer(self, store_ids: Optional[List[str]] = None) -> Optional[FragmentRenderer]:
+        """Serializer whose header declares the systems of every template the stores use."""
+        paths = self.template_files(store_ids)
+        if len(paths) == 1:
+            return self.fragment_renderer()
+        key = "\n".join(paths)
+        if key not in self._fragment_renderers:
+            template_root = self.combined_template_root(store_ids)
+            try:
+                renderer = FragmentRenderer(template_root, self.format_xml) if template_root is not None else None
+            except ValueError:
+                renderer = None
+            self._fragment_renderers[key] = renderer
+        return self._fragment_renderers[key]
+
     def create_store_structure(self, store_id: str, store_data: Dict[str, Any]) -> ET.Element:
         """Create a complete store structure based on template."""
+        template_root = self.template_root_for(store_data)
+        
         # Create a deep copy of the template
         structure = ET.Element("structure")
         
         # Copy systems section
         systems = ET.SubElement(structure, "systems")
-        if self.template_root is not None:
-            template_systems = self.template_root.find("systems")
+        if template_root is not None:
+            template_systems = template_root.find("systems")
             if template_systems is not None:
                 for system in template_systems:
                     systems.append(ET.fromstring(ET.tostring(system)))
         
         # Copy time-regimes section
         time_regimes = ET.SubElement(structure, "time-regimes")
-        if self.template_root is not None:
-            template_time_regimes = self.template_root.find("time-regimes")
+        if template_root is not None:
+            template_time_regimes = template_root.find("time-regimes")
             if template_time_regimes is not None:
                 for child in template_time_regimes:
                     time_regimes.append(ET.fromstring(ET.tostring(child)))
         
         # Copy central-is section
         central_is = ET.SubElement(structure, "central-is")
-        if self.template_root is not None:
-            template_central_is = self.template_root.find("central-is")
+        if template_root is not None:
+            template_central_is = template_root.find("central-is")
             if template_central_is is not None:
                 for child in template_central_is:
                     central_is.append(ET.fromstring(ET.tostring(child)))
@@ -390,11 +1215,11 @@ class StoreConfigGenerator:
         store_node.set("name", store_data["name"])
         store_node.set("parent-node-ident", store_data["parent_node"])
         store_node.set("rsid", store_id)
-        store_node.set("unique-name", f"{store_data['parent_node']}.{normalize_identifier(store_data['name']).upper()}")
+        store_node.set("unique-name", store_unique_name(store_data))
         
         # Add child nodes from template
-        if self.template_root is not None:
-            template_store_node = self.template_root.find(".//node[@alias='GKR-Store']")
+        if template_root is not None:
+            template_store_node = template_root.find(".//node[@alias='GKR-Store']")
             if template_store_node is not None:
                 for child_node in template_store_node:
                     if child_node.tag == "node":
@@ -405,31 +1230,9 @@ class StoreConfigGenerator:
                             if unique_name:
                                 new_child.set("unique-name", unique_name.replace("9999", store_id))
                         
-                        # Add wall changes to CSE-wdm node
+                        # Add wall, web-ui, service card and wdm-config changes to CSE-wdm node
                         if new_child.get("alias") == "CSE-wdm":
-                            wall_changes = self.generate_wall_changes(store_id, store_data)
-                            for change in wall_changes:
-                                new_child.append(change)
-
-                            # Add wall type description changes to CSE-wdm node
-                            wall_type_desc_changes = self.generate_wall_type_description_changes(store_id, store_data)
-                            for change in wall_type_desc_changes:
-                                new_child.append(change)
-
-                            # Add web-ui-config changes to CSE-wdm node
-                            webui_changes = self.generate_webui_changes(store_id, store_data)
-                            for change in webui_changes:
-                                new_child.append(change)
-
-                            # Add service card changes to CSE-wdm node
-                            service_card_changes = self.generate_service_card_changes(store_id)
-                            for change in service_card_changes:
-                                new_child.append(change)
-
-                            # Add wdm-config.properties changes to CSE-wdm node
-                            wdm_config_changes = self.generate_wdm_config_changes(store_id)
-                            for change in wdm_config_changes:
-                                new_child.append(change)
+                            new_child.extend(self.collect_store_changes(store_id, store_data))
                         
                         store_node.append(new_child)
         
@@ -441,8 +1244,13 @@ class StoreConfigGenerator:
         reparsed = minidom.parseString(rough_string)
         return reparsed.toprettyxml(indent="    ")[23:]  # Remove XML declaration
     
-    def generate_store_config(self, store_id: str) -> str:
-        """Generate configuration for a specific store."""
+    def build_store_structure(self, store_id: str) -> ET.Element:
+        """Check a store and build its structure tree in memory."""
+        store_data = self._checked_store_data(store_id)
+        return self.create_store_structure(store_id, store_data)
+
+    def _checked_store_data(self, store_id: str) -> Dict[str, Any]:
+        """Run the store checks and return its mapping entry."""
         if self.store_mapping is None:
             self.load_store_mapping()
         
@@ -455,12 +1263,22 @@ class StoreConfigGenerator:
         if store_id not in self.store_mapping["stores"]:
             raise ValueError(f"Store {store_id} not found in mapping")
         
-        store_data = self.store_mapping["stores"][store_id]
-        structure = self.create_store_structure(store_id, store_data)
+        self.check_preflight([store_id])
+        self.check_collisions([store_id])
+
+        return self.store_mapping["stores"][store_id]
+    
+    def generate_store_config(self, store_id: str) -> str:
+        """Generate configuration for a specific store."""
+        store_data = self._checked_store_data(store_id)
         
         # Add XML declaration
         xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        xml_content += self.format_xml(structure)
+        renderer = self.fragment_renderer(store_data)
+        if renderer is not None:
+            xml_content += renderer.render([(store_id, store_data, self.collect_store_changes(store_id, store_data))])
+        else:
+            xml_content += self.format_xml(self.create_store_structure(store_id, store_data))
         
         return xml_content
     
@@ -485,8 +1303,215 @@ class StoreConfigGenerator:
             print(f"❌ Error generating config for store {store_id}: {e}")
             raise
     
-    def generate_combined_config(self, output_dir: str = "output") -> str:
-        """Generate a single configuration file containing all stores."""
+    def save_store_structure(self, store_id: str, store_data: Dict[str, Any], structure: ET.Element,
+                             output_dir: str = "output") -> str:
+        """Serialize an already built store structure and save it."""
+        renderer = self.fragment_renderer(store_data)
+        wdm_node = structure.find(".//node[@alias='CSE-wdm']")
+        xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
+        if renderer is not None and wdm_node is not None:
+            xml_content += renderer.render([(store_id, store_data, wdm_node.findall("change"))])
+        else:
+            xml_content += self.format_xml(structure)
+        
+        output_file = f"{output_dir}/store_{store_id}_config.xml"
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(xml_content)
+        
+        print(f"✓ Generated configuration for store {store_id}: {output_file}")
+        return output_file
+    
+    def iter_validated_store_configs(self, store_ids: List[str], output_dir: str = "output",
+                                     validator: Optional[ConfigValidator] = None
+                                     ) -> Iterator[Tuple[str, Optional[str], Dict[str, Any]]]:
+        """
+        Pipelined generate-then-validate: each store's tree is validated in
+        memory right after it is built, and only valid stores are serialized
+        and written, on a writer thread while the next store is built and
+        validated. Invalid stores are held back from output_dir. Yields
+        (store_id, output_file or None, validation result) in store order.
+        """
+        self.load_all_inputs()
+        validator = validator or ConfigValidator()
+        validator.skip_wdm_stores = self.skip_wdm_store_ids()
+        validator.store_systems = {}
+        Path(output_dir).mkdir(exist_ok=True)
+
+        def finish(store_id: str, future, result: Dict[str, Any]) -> Tuple[str, Optional[str], Dict[str, Any]]:
+            try:
+                return store_id, future.result(), result
+            except OSError as e:
+                print(f"❌ Error writing config for store {store_id}: {e}")
+                return store_id, None, result
+
+        pending = None
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            for store_id in store_ids:
+                structure = None
+                try:
+                    store_data = self._checked_store_data(store_id)
+                    structure = self.create_store_structure(store_id, store_data)
+                    validator.store_systems[store_id] = self.template_systems(store_data)
+                    result = validator.validate_element(structure, f"store {store_id}")
+                except ValueError as e:
+                    result = {"file": f"store {store_id}", "valid": False, "errors": [str(e)], "warnings": []}
+
+                # The previous store's file is written while this one was built and validated
+                if pending is not None:
+                    yield finish(*pending)
+                    pending = None
+
+                if structure is not None and result["valid"]:
+                    pending = (store_id, writer.submit(self.save_store_structure, store_id, store_data,
+                                                       structure, output_dir), result)
+                else:
+                    print(f"🚫 Held back store {store_id}: {len(result['errors'])} error(s)")
+                    yield store_id, None, result
+
+            if pending is not None:
+                yield finish(*pending)
+
+    def generate_validated_combined_config(self, output_dir: str = "output",
+                                           store_ids: Optional[List[str]] = None,
+                                           validator: Optional[ConfigValidator] = None
+                                           ) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """
+        Validate each store's tree in memory and write a combined file with
+        the valid stores only. Returns (output_file or None, results of the
+        held back stores).
+        """
+        self.load_all_inputs()
+        validator = validator or ConfigValidator()
+        validator.skip_wdm_stores = self.skip_wdm_store_ids()
+        validator.store_systems = {}
+        selected = store_ids if store_ids is not None else list(self.store_mapping["stores"])
+
+        valid_ids: List[str] = []
+        held_back: List[Dict[str, Any]] = []
+        for store_id in selected:
+            try:
+                structure = self.build_store_structure(store_id)
+                validator.store_systems[store_id] = self.template_systems(self.store_mapping["stores"][store_id])
+                result = validator.validate_element(structure, f"store {store_id}")
+            except ValueError as e:
+                result = {"file": f"store {store_id}", "valid": False, "errors": [str(e)], "warnings": []}
+            if result["valid"]:
+                valid_ids.append(store_id)
+            else:
+                print(f"🚫 Held back store {store_id}: {len(result['errors'])} error(s)")
+                held_back.append(result)
+
+        if not valid_ids:
+            return None, held_back
+        return self.generate_combined_config(output_dir, valid_ids), held_back
+
+    def select_stores(self, store_ids: Optional[List[str]] = None, parent_node: Optional[str] = None,
+                      region: Optional[str] = None, country: Optional[str] = None) -> List[str]:
+        """
+        Return the store IDs matching an explicit list and/or filters.
+
+        Region and parent node matching ignores case and Swedish characters,
+        so "ostra" selects "Östra - ..." stores.
+        """
+        if self.store_mapping is None:
+            self.load_store_mapping()
+
+        if self.store_mapping is None:
+            raise ValueError("Store mapping not loaded")
+
+        stores = self.store_mapping["stores"]
+        if store_ids is not None:
+            missing = [store_id for store_id in store_ids if store_id not in stores]
+            if missing:
+                raise ValueError(f"Store(s) not found in mapping: {', '.join(missing)}")
+            candidates = store_ids
+        else:
+            candidates = list(stores)
+
+        def matches(value: str, wanted: Optional[str]) -> bool:
+            return wanted is None or normalize_identifier(value).lower() == normalize_identifier(wanted).lower()
+
+        return [store_id for store_id in candidates
+                if matches(stores[store_id].get("parent_node", ""), parent_node)
+                and matches(store_region(stores[store_id]), region)
+                and (country is None or stores[store_id].get("country", "").upper() == country.upper())]
+
+    def load_all_inputs(self) -> None:
+        """Load every lazily loaded input so worker threads only read shared state."""
+        if self.store_mapping is None:
+            self.load_store_mapping()
+        if self.template_root is None:
+            self.load_template()
+        if self.store_ip_mapping is None:
+            self.load_store_ip_mapping()
+        if self.service_cards_mapping is None:
+            self.load_service_cards_mapping()
+        if self.collision_index is None:
+            self.build_collision_index()
+        # Compile every template in use once, so worker threads only read the caches
+        if self.store_mapping is not None:
+            for store_data in self.store_mapping["stores"].values():
+                try:
+                    self.fragment_renderer(store_data)
+                except ValueError:
+                    pass  # reported by the pre-flight check
+
+    def iter_store_configs(self, store_ids: List[str], output_dir: str = "output",
+                           workers: int = 1) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Generate and save the given stores, yielding (store_id, output_file, error)
+        as each one completes. With workers > 1 stores are generated on a thread pool.
+        """
+        self.load_all_inputs()
+
+        if workers <= 1:
+            for store_id in store_ids:
+                try:
+                    yield store_id, self.save_store_config(store_id, output_dir), None
+                except Exception as e:
+                    yield store_id, None, str(e)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Submit stores grouped by template so concurrent workers share compiled skeletons
+            futures = {executor.submit(self.save_store_config, store_id, output_dir): store_id
+                       for store_id in self.group_by_template(store_ids)}
+            for future in as_completed(futures):
+                store_id = futures[future]
+                try:
+                    yield store_id, future.result(), None
+                except Exception as e:
+                    yield store_id, None, str(e)
+
+    def generate_stores(self, store_ids: List[str], output_dir: str = "output",
+                        combined: bool = False, workers: int = 1, validate: bool = False) -> List[str]:
+        """
+        Generate configurations for a subset of stores only. With validate,
+        stores are validated in memory before writing and invalid ones are
+        held back.
+        """
+        if validate:
+            return self.generate_validated(store_ids, output_dir, combined)
+
+        if combined:
+            return [self.generate_combined_config(output_dir, store_ids)]
+
+        # Check the selection before writing any file; stores with pre-flight errors are held back
+        passed = self.preflight_passed(store_ids)
+        self.check_collisions(store_ids)
+
+        generated_files: List[str] = []
+        for store_id, output_file, error in self.iter_store_configs(passed, output_dir, workers):
+            if output_file:
+                generated_files.append(output_file)
+            else:
+                print(f"❌ Failed to generate config for store {store_id}: {error}")
+
+        print(f"\n✓ Generated {len(generated_files)} of {len(store_ids)} selected store configurations")
+        return generated_files
+
+    def build_combined_structure(self, store_ids: Optional[List[str]] = None) -> ET.Element:
+        """Build one structure containing all stores, or only the given ones."""
         if self.store_mapping is None:
             self.load_store_mapping()
         
@@ -496,32 +1521,37 @@ class StoreConfigGenerator:
         if self.store_mapping is None:
             raise ValueError("Store mapping not loaded")
         
-        # Create output directory if it doesn't exist
-        Path(output_dir).mkdir(exist_ok=True)
+        if store_ids is not None:
+            missing = [store_id for store_id in store_ids if store_id not in self.store_mapping["stores"]]
+            if missing:
+                raise ValueError(f"Store(s) not found in mapping: {', '.join(missing)}")
+        
+        # Shared sections come from the default template plus the systems of other templates in use
+        template_root = self.combined_template_root(store_ids)
         
         # Create combined structure
         structure = ET.Element("structure")
         
         # Copy systems section from template
         systems = ET.SubElement(structure, "systems")
-        if self.template_root is not None:
-            template_systems = self.template_root.find("systems")
+        if template_root is not None:
+            template_systems = template_root.find("systems")
             if template_systems is not None:
                 for system in template_systems:
                     systems.append(ET.fromstring(ET.tostring(system)))
         
         # Copy time-regimes section
         time_regimes = ET.SubElement(structure, "time-regimes")
-        if self.template_root is not None:
-            template_time_regimes = self.template_root.find("time-regimes")
+        if template_root is not None:
+            template_time_regimes = template_root.find("time-regimes")
             if template_time_regimes is not None:
                 for child in template_time_regimes:
                     time_regimes.append(ET.fromstring(ET.tostring(child)))
         
         # Copy central-is section
         central_is = ET.SubElement(structure, "central-is")
-        if self.template_root is not None:
-            template_central_is = self.template_root.find("central-is")
+        if template_root is not None:
+            template_central_is = template_root.find("central-is")
             if template_central_is is not None:
                 for child in template_central_is:
                     central_is.append(ET.fromstring(ET.tostring(child)))
@@ -530,7 +1560,9 @@ class StoreConfigGenerator:
         nodes = ET.SubElement(structure, "nodes")
         
         # Add each store as a separate node
-        for store_id, store_data in self.store_mapping["stores"].items():
+        stores = self.store_mapping["stores"]
+        for store_id in (store_ids if store_ids is not None else list(stores)):
+            store_data = stores[store_id]
             print(f"   Adding store {store_id} to combined configuration...")
             
             # Create store node
@@ -540,11 +1572,12 @@ class StoreConfigGenerator:
             store_node.set("name", store_data["name"])
             store_node.set("parent-node-ident", store_data["parent_node"])
             store_node.set("rsid", store_id)
-            store_node.set("unique-name", f"{store_data['parent_node']}.{normalize_identifier(store_data['name']).upper()}")
+            store_node.set("unique-name", store_unique_name(store_data))
             
-            # Add child nodes from template
-            if self.template_root is not None:
-                template_store_node = self.template_root.find(".//node[@alias='GKR-Store']")
+            # Add child nodes from the store's template
+            store_template = self.template_root_for(store_data)
+            if store_template is not None:
+                template_store_node = store_template.find(".//node[@alias='GKR-Store']")
                 if template_store_node is not None:
                     for child_node in template_store_node:
                         if child_node.tag == "node":
@@ -555,37 +1588,45 @@ class StoreConfigGenerator:
                                 if unique_name:
                                     new_child.set("unique-name", unique_name.replace("9999", store_id))
                             
-                            # Add wall changes to CSE-wdm node
+                            # Add wall, web-ui, service card and wdm-config changes to CSE-wdm node
                             if new_child.get("alias") == "CSE-wdm":
-                                wall_changes = self.generate_wall_changes(store_id, store_data)
-                                for change in wall_changes:
-                                    new_child.append(change)
-
-                                # Add wall type description changes to CSE-wdm node
-                                wall_type_desc_changes = self.generate_wall_type_description_changes(store_id, store_data)
-                                for change in wall_type_desc_changes:
-                                    new_child.append(change)
-
-                                # Add web-ui-config changes to CSE-wdm node
-                                webui_changes = self.generate_webui_changes(store_id, store_data)
-                                for change in webui_changes:
-                                    new_child.append(change)
-
-                                # Add service card changes to CSE-wdm node
-                                service_card_changes = self.generate_service_card_changes(store_id)
-                                for change in service_card_changes:
-                                    new_child.append(change)
-
-                                # Add wdm-config.properties changes to CSE-wdm node
-                                wdm_config_changes = self.generate_wdm_config_changes(store_id)
-                                for change in wdm_config_changes:
-                                    new_child.append(change)
+                                new_child.extend(self.collect_store_changes(store_id, store_data))
                             
                             store_node.append(new_child)
         
-        # Generate XML content
-        xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        xml_content += self.format_xml(structure)
+        return structure
+    
+    def generate_combined_xml(self, store_ids: Optional[List[str]] = None) -> str:
+        """Generate the combined configuration XML in memory, after the fleet checks."""
+        if self.store_mapping is None:
+            self.load_store_mapping()
+        
+        self.check_preflight(store_ids)
+        self.check_collisions(store_ids)
+        
+        stores = self.store_mapping["stores"] if self.store_mapping else {}
+        selected = store_ids if store_ids is not None else list(stores)
+        renderer = self.combined_renderer(store_ids)
+        store_renderers = [self.fragment_renderer(stores[store_id]) for store_id in selected if store_id in stores]
+        if renderer is None or not selected or len(store_renderers) < len(selected) or None in store_renderers:
+            structure = self.build_combined_structure(store_ids)
+            return '<?xml version="1.0" encoding="UTF-8"?>\n' + self.format_xml(structure)
+        
+        # Template sections are serialized once; only store values and changes are written per store
+        out = ['<?xml version="1.0" encoding="UTF-8"?>\n', renderer.header]
+        for store_id, store_renderer in zip(selected, store_renderers):
+            store_data = stores[store_id]
+            print(f"   Adding store {store_id} to combined configuration...")
+            store_renderer.render_store(store_id, store_data, self.collect_store_changes(store_id, store_data), out)
+        out.append(renderer.footer)
+        return "".join(out)
+    
+    def generate_combined_config(self, output_dir: str = "output", store_ids: Optional[List[str]] = None) -> str:
+        """Generate a single configuration file containing all stores, or only the given ones."""
+        xml_content = self.generate_combined_xml(store_ids)
+        
+        # Create output directory if it doesn't exist
+        Path(output_dir).mkdir(exist_ok=True)
         
         # Save to file
         output_file = f"{output_dir}/all_stores_config.xml"
@@ -593,10 +1634,51 @@ class StoreConfigGenerator:
             f.write(xml_content)
         
         print(f"✓ Generated combined configuration: {output_file}")
+        
+        # Sidecar rsid -> byte range index for single-store access without a full parse
+        try:
+            CombinedConfigIndex(output_file).build_index()
+        except ValueError as e:
+            print(f"⚠️  Warning: Could not index combined configuration: {e}")
         return output_file
 
-    def generate_all_stores(self, output_dir: str = "output", combined: bool = False) -> List[str]:
+    def generate_validated(self, store_ids: Optional[List[str]], output_dir: str = "output",
+                           combined: bool = False) -> List[str]:
+        """Generate-then-validate the given stores (None = all) and report the held back ones."""
+        if self.store_mapping is None:
+            self.load_store_mapping()
+        selected = store_ids if store_ids is not None else list(self.store_mapping["stores"])
+
+        if combined:
+            output_file, held_back = self.generate_validated_combined_config(output_dir, selected)
+            generated_files = [output_file] if output_file else []
+        else:
+            generated_files = []
+            held_back = []
+            for store_id, output_file, result in self.iter_validated_store_configs(selected, output_dir):
+                if output_file:
+                    generated_files.append(output_file)
+                elif result["valid"]:
+                    held_back.append(dict(result, errors=["Could not write the configuration file"]))
+                else:
+                    held_back.append(result)
+
+        if held_back:
+            print(f"\n🚫 {len(held_back)} store(s) held back from {output_dir}:")
+            for result in held_back:
+                print(f"   {result['file']}")
+                for error in result["errors"]:
+                    print(f"      - {error}")
+        print(f"\n✓ Validated {len(selected)} stores: {len(selected) - len(held_back)} written, "
+              f"{len(held_back)} held back")
+        return generated_files
+
+    def generate_all_stores(self, output_dir: str = "output", combined: bool = False,
+                            validate: bool = False) -> List[str]:
         """Generate configurations for all stores in the mapping."""
+        if validate:
+            return self.generate_validated(None, output_dir, combined)
+
         if combined:
             # Generate single combined file
             combined_file = self.generate_combined_config(output_dir)
@@ -605,21 +1687,214 @@ class StoreConfigGenerator:
             # Generate separate files for each store
             if self.store_mapping is None:
                 self.load_store_mapping()
+
+            # Check the whole fleet before writing any file; stores with pre-flight errors are held back
+            passed = self.preflight_passed()
+            self.check_collisions()
             
             generated_files: List[str] = []
             
             if self.store_mapping is not None:
-                for store_id in self.store_mapping["stores"]:
-                    try:
-                        output_file = self.save_store_config(store_id, output_dir)
+                for store_id, output_file, error in self.iter_store_configs(passed, output_dir):
+                    if output_file:
                         generated_files.append(output_file)
-                    except Exception as e:
-                        print(f"❌ Failed to generate config for store {store_id}: {e}")
+                    else:
+                        print(f"❌ Failed to generate config for store {store_id}: {error}")
             
             print(f"\n✓ Generated {len(generated_files)} store configurations")
             return generated_files
 
 
+class InputWatcher:
+    """
+    Watch mode: keeps the generator's inputs in memory, polls the input files
+    for mtime changes and regenerates and revalidates only the affected stores.
+    """
+
+    def __init__(self, generator: StoreConfigGenerator, output_dir: str = "output",
+                 store_ids: Optional[List[str]] = None, combined: bool = False,
+                 interval: float = 0.5):
+        self.generator = generator
+        self.output_dir = output_dir
+        self.store_ids = store_ids
+        self.combined = combined
+        self.interval = interval
+        self.validator = ConfigValidator()
+        self.file_stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        # Stamps of inputs that failed to load, so a missing or broken file is reported once
+        self.failed_stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.fingerprints: Dict[str, str] = {}
+        self.global_fingerprint = ""
+
+    def input_files(self) -> Dict[str, str]:
+        """Return the watched input files by role."""
+        files = {
+            "mapping": self.generator.mapping_file,
+            "template": self.generator.template_file,
+            "ip_mapping": self.generator.ip_mapping_file,
+            "service_cards": self.generator.service_cards_file,
+        }
+        # Templates selected per store or per country in the mapping
+        for path in self.generator.template_files()[1:]:
+            files[f"template:{path}"] = path
+        return files
+
+    def _stamp(self, path: str) -> Optional[Tuple[int, int]]:
+        """Return (mtime_ns, size) of a file, or None if it does not exist."""
+        try:
+            stat = Path(path).stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _reload(self, role: str) -> bool:
+        """Reload one input in memory; on a broken edit keep the previous state."""
+        generator = self.generator
+        path = self.input_files()[role]
+        try:
+            if role == "mapping":
+                previous = generator.store_mapping
+                try:
+                    generator.load_store_mapping()
+                except SystemExit:
+                    generator.store_mapping = previous
+                    generator.collision_index = None
+                    return False
+            elif role == "template":
+                ET.parse(path)
+                try:
+                    generator.load_template()
+                except SystemExit:
+                    # The default template disappeared again between the check and the load
+                    return False
+            elif role.startswith("template:"):
+                ET.parse(path)
+                # Reloaded on first use
+                generator.forget_template(path)
+            elif role == "ip_mapping":
+                generator.load_store_ip_mapping()
+            elif role == "service_cards":
+                if Path(path).exists():
+                    with open(path, 'r', encoding='utf-8') as f:
+                        json.load(f)
+                generator.load_service_cards_mapping()
+            return True
+        except (ET.ParseError, json.JSONDecodeError) as e:
+            print(f"⚠️  {path} is not valid yet ({e}) - keeping previous inputs")
+            return False
+        except OSError as e:
+            # e.g. an editor's atomic save deletes the file before renaming the new one in place
+            print(f"⚠️  {path} cannot be read right now ({e}) - keeping previous inputs")
+            return False
+
+    def _compute_fingerprints(self) -> Tuple[str, Dict[str, str]]:
+        """Fingerprint everything a store's output depends on, per store and fleet-wide."""
+        generator = self.generator
+        stores = generator.store_mapping["stores"] if generator.store_mapping else {}
+        ip_mapping = generator.store_ip_mapping or {}
+        cards = (generator.service_cards_mapping or {}).get("stores", {})
+
+        metadata = generator.store_mapping.get("metadata", {}) if generator.store_mapping else {}
+        template_stamps = {role: stamp for role, stamp in self.file_stamps.items() if role.startswith("template")}
+        global_fingerprint = json.dumps([metadata, template_stamps], sort_keys=True)
+
+        fingerprints: Dict[str, str] = {}
+        for store_id, store_data in stores.items():
+            if self.store_ids is not None and store_id not in self.store_ids:
+                continue
+            fingerprints[store_id] = json.dumps(
+                [store_data, ip_mapping.get(store_id), cards.get(store_id)], sort_keys=True)
+        return global_fingerprint, fingerprints
+
+    def regenerate(self, store_ids: List[str]) -> None:
+        """Regenerate and revalidate the given stores (or the combined file)."""
+        started = time.perf_counter()
+
+        # Stores are validated in memory before writing; invalid ones keep their previous file
+        if self.combined:
+            try:
+                self.generator.generate_validated_combined_config(self.output_dir, self.store_ids, self.validator)
+            except Exception as e:
+                print(f"❌ Failed to generate combined configuration: {e}")
+        else:
+            try:
+                for _ in self.generator.iter_validated_store_configs(store_ids, self.output_dir, self.validator):
+                    pass
+            except Exception as e:
+                print(f"❌ Failed to generate store configurations: {e}")
+
+        elapsed = time.perf_counter() - started
+        print(f"⏱️  Regenerated {len(store_ids)} store(s) in {elapsed:.2f}s")
+
+    def poll(self) -> List[str]:
+        """Check the inputs once; reload changed files and return the affected store IDs."""
+        changed_roles = []
+        for role, path in self.input_files().items():
+            stamp = self._stamp(path)
+            if stamp != self.file_stamps.get(role) and (role not in self.failed_stamps
+                                                        or stamp != self.failed_stamps[role]):
+                changed_roles.append(role)
+
+        if not changed_roles:
+            return []
+
+        for role in changed_roles:
+            print(f"\n🔄 Change detected in {self.input_files()[role]}")
+            # Only remember the new stamp once the file loaded, so the next edit is retried
+            stamp = self._stamp(self.input_files()[role])
+            if self._reload(role):
+                self.file_stamps[role] = stamp
+                self.failed_stamps.pop(role, None)
+            else:
+                self.failed_stamps[role] = stamp
+
+        global_fingerprint, fingerprints = self._compute_fingerprints()
+        if global_fingerprint != self.global_fingerprint:
+            affected = list(fingerprints)
+        else:
+            affected = [store_id for store_id, fingerprint in fingerprints.items()
+                        if self.fingerprints.get(store_id) != fingerprint]
+
+        for store_id in self.fingerprints:
+            if store_id not in fingerprints:
+                print(f"⚠️  Store {store_id} was removed from the mapping; its output file was left in place")
+
+        self.global_fingerprint = global_fingerprint
+        self.fingerprints = fingerprints
+        return affected
+
+    def run(self) -> None:
+        """Generate once, then regenerate on every change until interrupted."""
+        generator = self.generator
+        for role, path in self.input_files().items():
+            self.file_stamps[role] = self._stamp(path)
+        generator.load_store_mapping()
+        generator.load_template()
+        generator.load_store_ip_mapping()
+        generator.load_service_cards_mapping()
+        for role, path in self.input_files().items():
+            self.file_stamps.setdefault(role, self._stamp(path))
+
+        self.global_fingerprint, self.fingerprints = self._compute_fingerprints()
+        if self.store_ids is not None:
+            for store_id in self.store_ids:
+                if store_id not in self.fingerprints:
+                    print(f"⚠️  Store {store_id} not found in mapping - waiting for it to be added")
+        self.regenerate(list(self.fingerprints))
+
+        print(f"\n👀 Watching {len(self.file_stamps)} input files (every {self.interval}s) - press Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(self.interval)
+                affected = self.poll()
+                if affected:
+                    print(f"📦 {len(affected)} store(s) affected: {', '.join(affected[:20])}"
+                          f"{' ...' if len(affected) > 20 else ''}")
+                    self.regenerate(affected)
+        except KeyboardInterrupt:
+            print("\n👋 Watch mode stopped")
+
+
 def main() -> None:
     """Main entry point for the script."""
     parser = argparse.ArgumentParser(
@@ -631,6 +1906,16 @@ Examples:
   python generate_store_config.py --all --combined
   python generate_store_config.py --store 9999
   python generate_store_config.py --store 1674 --output custom_output
+  python generate_store_config.py --stores 1008,1014,1018 --workers 4
+  python generate_store_config.py --stores-file wave1.txt --combined
+  python generate_store_config.py --region Östra --country SE
+  python generate_store_config.py --preflight --mapping store_wall_mapping_PROD-20251111-134645.json
+  python generate_store_config.py --all --derive-webui wall:1
+  python generate_store_config.py --ip-report
+  python generate_store_config.py --all --watch
+  python generate_store_config.py --all --validate
+  python generate_store_config.py --all --index
+  python generate_store_config.py --all --render-files
         """
     )
     
@@ -638,6 +1923,22 @@ Examples:
                        help="Generate configurations for all stores")
     parser.add_argument("--store", type=str,
                        help="Generate configuration for specific store ID")
+    parser.add_argument("--stores", type=str,
+                       help="Generate configurations for a comma-separated list of store IDs")
+    parser.add_argument("--stores-file", type=str,
+                       help="Generate configurations for the store IDs listed in a file")
+    parser.add_argument("--parent-node", type=str,
+                       help="Only stores with this parent_node")
+    parser.add_argument("--region", type=str,
+                       help="Only stores whose name starts with this region (e.g. Östra)")
+    parser.add_argument("--country", type=str,
+                       help="Only stores in this country (e.g. SE)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Number of worker threads for batch generation (default: 1)")
+    parser.add_argument("--validate", action="store_true",
+                       help="Validate each store in memory before writing it; invalid stores are not written")
+    parser.add_argument("--preflight", action="store_true",
+                       help="Only check the mapping (walls, IPs, subnets, collisions) without generating")
     parser.add_argument("--combined", action="store_true",
                        help="Generate all stores in a single combined file (use with --all)")
     parser.add_argument("--output", type=str, default="output",
@@ -651,34 +1952,147 @@ Examples:
                        help="Store IP mapping file for web-ui-config (default: config/mappings/store_ip_mapping.properties)")
     parser.add_argument("--service-cards", type=str, default="config/mappings/service_cards_mapping.json",
                        help="Service cards mapping file (default: config/mappings/service_cards_mapping.json)")
+    parser.add_argument("--derive-webui", type=str, nargs="?", const="wall:1", metavar="RULE",
+                       help="Derive the web-ui server address for stores without an IP mapping entry "
+                            "('wall:<id>' or 'host:<octet>', default: wall:1)")
+    parser.add_argument("--watch", action="store_true",
+                       help="Keep running and regenerate affected stores when an input file changes (use with --all or --store)")
+    parser.add_argument("--watch-interval", type=float, default=0.5,
+                       help="Polling interval in seconds for --watch (default: 0.5)")
+    parser.add_argument("--ip-report", action="store_true",
+                       help="Report mismatches between the IP mapping file and wall-derived addresses")
+    parser.add_argument("--render-files", action="store_true",
+                       help="Also render full wall-config.xml and web-ui-config.xml per store into <output>/files")
+    parser.add_argument("--index", action="store_true",
+                       help="Update the fleet query index in the output directory after generating")
     
     args = parser.parse_args()
     
-    if not args.all and not args.store:
+    batch = bool(args.stores or args.stores_file or args.parent_node or args.region or args.country)
+    
+    if not args.all and not args.store and not batch and not args.preflight and not args.ip_report:
         parser.print_help()
         sys.exit(1)
     
-    # Initialize generator
-    generator = StoreConfigGenerator(args.mapping, args.template, args.ip_mapping, args.service_cards)
-    
     try:
-        if args.all:
+        # Initialize generator
+        generator = StoreConfigGenerator(args.mapping, args.template, args.ip_mapping, args.service_cards,
+                                         webui_rule=args.derive_webui)
+
+        # Runs over explicitly listed stores only decode those stores from the mapping
+        lazy = not (args.all or args.watch or args.ip_report or args.parent_node or args.region or args.country)
+
+        # Resolve a batch selection (explicit IDs and/or filters)
+        selection: Optional[List[str]] = None
+        if batch:
+            explicit: List[str] = parse_store_ids(args.stores) if args.stores else []
+            if args.stores_file:
+                with open(args.stores_file, 'r', encoding='utf-8-sig') as f:
+                    explicit += [store_id for store_id in parse_store_ids(f.read()) if store_id not in explicit]
+            if lazy:
+                generator.load_store_mapping(explicit)
+            selection = generator.select_stores(explicit or None, args.parent_node, args.region, args.country)
+            if not selection:
+                raise ValueError("No stores match the selection")
+            print(f"🎯 Selected {len(selection)} store(s)")
+        elif lazy and args.store:
+            generator.load_store_mapping([args.store])
+
+        if args.ip_report:
+            print("🔍 Comparing IP mapping with wall-derived addresses...")
+            report = generator.ip_mapping_consistency_report()
+            for key in ("mismatched", "missing", "orphaned"):
+                for line in report[key]:
+                    print(f"   ⚠️  {line}")
+            print(f"\n📊 IP mapping consistency: {len(report['matching'])} matching, "
+                  f"{len(report['mismatched'])} mismatched, {len(report['missing'])} missing, "
+                  f"{len(report['orphaned'])} orphaned")
+            if report["mismatched"] or report["orphaned"]:
+                sys.exit(1)
+            return
+
+        if args.preflight:
+            print("🔍 Running pre-flight check...")
+            store_ids = selection if selection is not None else ([args.store] if args.store else None)
+            result = generator.preflight_check(store_ids)
+            for warning in result["warnings"]:
+                print(f"   ⚠️  {warning}")
+            for error in result["errors"]:
+                print(f"   🚨 {error}")
+            if not result["valid"]:
+                print(f"\n❌ Pre-flight check failed: {len(result['errors'])} error(s), {len(result['warnings'])} warning(s)")
+                sys.exit(1)
+            generator.check_collisions(store_ids)
+            print(f"\n✅ Pre-flight check passed for {result['stores']} stores ({result['walls']} walls)")
+            return
+
+        if args.watch:
+            if selection is not None:
+                store_ids = selection
+            else:
+                store_ids = None if args.all else [args.store]
+            watcher = InputWatcher(generator, args.output, store_ids,
+                                   combined=args.combined and (args.all or selection is not None),
+                                   interval=args.watch_interval)
+            watcher.run()
+            return
+
+        if selection is not None:
+            if args.combined:
+                print(f"🚀 Generating combined configuration for {len(selection)} stores...")
+                generated_files = generator.generate_stores(selection, args.output, combined=True,
+                                                            validate=args.validate)
+                if not generated_files:
+                    raise ValueError("No store passed validation")
+                print(f"\n📁 Generated combined file: {generated_files[0]}")
+            else:
+                print(f"🚀 Generating configurations for {len(selection)} stores...")
+                generated_files = generator.generate_stores(selection, args.output, workers=args.workers,
+                                                            validate=args.validate)
+                if len(generated_files) < len(selection):
+                    raise ValueError(f"{len(selection) - len(generated_files)} store(s) failed")
+
+        elif args.all:
             if args.combined:
                 print("🚀 Generating combined configuration for all stores...")
-                generated_files = generator.generate_all_stores(args.output, combined=True)
+                generated_files = generator.generate_all_stores(args.output, combined=True, validate=args.validate)
+                if not generated_files:
+                    raise ValueError("No store passed validation")
                 print(f"\n📁 Generated combined file: {generated_files[0]}")
             else:
                 print("🚀 Generating separate configurations for all stores...")
-                generated_files = generator.generate_all_stores(args.output, combined=False)
+                generated_files = generator.generate_all_stores(args.output, combined=False, validate=args.validate)
                 print("\n📁 Generated files:")
                 for file_path in generated_files:
                     print(f"   {file_path}")
                 
         elif args.store:
             print(f"🚀 Generating configuration for store {args.store}...")
-            output_file = generator.save_store_config(args.store, args.output)
+            if args.validate:
+                generated_files = generator.generate_stores([args.store], args.output, validate=True)
+                if not generated_files:
+                    raise ValueError(f"Store {args.store} failed validation and was not written")
+                output_file = generated_files[0]
+            else:
+                output_file = generator.save_store_config(args.store, args.output)
             
             print(f"\n📁 Generated file: {output_file}")
+
+        if args.render_files:
+            # Imported here: render_files builds on this module
+            from render_files import StoreFileRenderer
+            if selection is not None:
+                store_ids = selection
+            else:
+                store_ids = list(generator.store_mapping["stores"]) if args.all else [args.store]
+            StoreFileRenderer(generator).render_stores(store_ids, f"{args.output}/files", args.workers)
+
+        if args.index:
+            # Imported here: fleet_index builds on this module
+            from fleet_index import FleetIndex
+            with FleetIndex(args.output) as index:
+                stats = index.update()
+            print(f"🔎 Fleet index updated: {stats['parsed']} file(s) parsed, {stats['unchanged']} unchanged")
         
         print("\n✅ Configuration generation completed successfully!")
         
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Store Configuration Generation Service
+
+A small local HTTP service that keeps the generator and validator inputs
+warm in memory, so deployment tooling can request store configurations
+without paying interpreter startup and input parsing for every store.
+Inputs are reloaded automatically when their files change.
+
+Endpoints:
+    GET /health                      Service status and store count
+    GET /stores                      Store IDs in the mapping
+    GET /config/<store_id>           Structure XML for one store
+    GET /config?stores=1008,1014     Combined structure XML for a list of stores
+    GET /config/combined             Combined structure XML for all stores
+    GET /validate/<store_id>         Validation result (JSON) for one store
+    GET /validate?stores=1008,1014   Validation results (JSON) for a list of stores
+    GET /validate/combined           Validation result (JSON) for the combined structure
+
+Usage:
+    python generation_server.py
+    python generation_server.py --port 8765
+    python generation_server.py --help
+"""
+
+import argparse
+import json
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from generate_store_config import StoreConfigGenerator
+from validate_config import ConfigValidator
+
+# Size of each chunk when streaming XML back to the client
+CHUNK_SIZE = 64 * 1024
+
+
+class GenerationService:
+    """Warm generator state shared by all request threads."""
+
+    def __init__(self, mapping_file: str = "config/mappings/store_wall_mapping.json",
+                 template_file: str = "config/templates/template.xml",
+                 ip_mapping_file: str = "config/mappings/store_ip_mapping.properties",
+                 service_cards_file: str = "config/mappings/service_cards_mapping.json",
+                 webui_rule: Optional[str] = None):
+        self.input_files = [mapping_file, template_file, ip_mapping_file, service_cards_file]
+        # Per-store/per-country templates named in the mapping, watched as well
+        self.extra_templates: List[str] = []
+        self.webui_rule = webui_rule
+        self.lock = threading.Lock()
+        self.file_stamps: List[Optional[Tuple[int, int]]] = []
+        self.generator = self._build_generator()
+
+    def _stamps(self) -> List[Optional[Tuple[int, int]]]:
+        """Return (mtime_ns, size) for every input file, None for missing files."""
+        stamps: List[Optional[Tuple[int, int]]] = []
+        for path in self.input_files + self.extra_templates:
+            try:
+                stat = Path(path).stat()
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append(None)
+        return stamps
+
+    def _build_generator(self) -> StoreConfigGenerator:
+        """
+        Load every input into a fresh generator.
+
+        All lazy state is built here, so request threads only ever read
+        from a fully loaded generator.
+        """
+        stamps = self._stamps()
+        generator = StoreConfigGenerator(*self.input_files, webui_rule=self.webui_rule)
+        try:
+            generator.load_store_mapping()
+            generator.load_template()
+        except SystemExit:
+            raise ValueError("Could not load store mapping or template")
+        generator.load_store_ip_mapping()
+        generator.load_service_cards_mapping()
+        # Builds the collision index and compiles every template in use
+        generator.load_all_inputs()
+        extra_templates = generator.template_files()[1:]
+        if extra_templates != self.extra_templates:
+            # Templates named in the mapping are only known once it is loaded
+            self.extra_templates = extra_templates
+            stamps = self._stamps()
+        self.file_stamps = stamps
+        return generator
+
+    def current_generator(self) -> StoreConfigGenerator:
+        """Return the warm generator, reloading it first if an input file changed."""
+        with self.lock:
+            if self._stamps() != self.file_stamps:
+                print("🔄 Input files changed - reloading")
+                try:
+                    # Swap in a complete new generator; in-flight requests keep the old one
+                    self.generator = self._build_generator()
+                except ValueError as e:
+                    print(f"⚠️  Reload failed ({e}) - keeping previous inputs")
+                    self.file_stamps = self._stamps()
+            return self.generator
+
+    def store_ids(self) -> List[str]:
+        """Return all store IDs in the mapping."""
+        generator = self.current_generator()
+        return list(generator.store_mapping["stores"]) if generator.store_mapping else []
+
+    def generate(self, store_ids: Optional[List[str]], combined: bool) -> str:
+        """Generate XML for one store, or a combined file for a list (None = all stores)."""
+        generator = self.current_generator()
+        if not combined and store_ids and len(store_ids) == 1:
+            return generator.generate_store_config(store_ids[0])
+        return generator.generate_combined_xml(store_ids)
+
+    def validate(self, store_ids: Optional[List[str]], combined: bool) -> List[Dict[str, Any]]:
+        """Validate in-memory structures without writing any file."""
+        generator = self.current_generator()
+        validator = ConfigValidator(skip_wdm_stores=generator.skip_wdm_store_ids())
+        results: List[Dict[str, Any]] = []
+
+        if combined:
+            label = "combined" if store_ids is None else f"combined({','.join(store_ids)})"
+            structure = self._checked(generator, store_ids)
+            stores = generator.store_mapping["stores"]
+            validator.store_systems = {store_id: generator.template_systems(stores[store_id])
+                                       for store_id in (store_ids if store_ids is not None else stores)}
+            results.append(validator.validate_element(structure, label))
+            return results
+
+        for store_id in store_ids or []:
+            try:
+                structure = generator.build_store_structure(store_id)
+                validator.store_systems[store_id] = generator.template_systems(
+                    generator.store_mapping["stores"][store_id])
+                results.append(validator.validate_element(structure, f"store {store_id}"))
+            except ValueError as e:
+                results.append({"file": f"store {store_id}", "valid": False, "errors": [str(e)], "warnings": []})
+        return results
+
+    def _checked(self, generator: StoreConfigGenerator, store_ids: Optional[List[str]]) -> ET.Element:
+        """Run the fleet checks and build a combined structure."""
+        generator.check_preflight(store_ids)
+        generator.check_collisions(store_ids)
+        return generator.build_combined_structure(store_ids)
+
+
+class GenerationRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler routing requests to the shared GenerationService."""
+
+    protocol_version = "HTTP/1.1"
+    service: GenerationService
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        parts = [part for part in parsed.path.split("/") if part]
+        query = parse_qs(parsed.query)
+
+        try:
+            if parts == ["health"]:
+                self._send_json(200, {"status": "ok", "stores": len(self.service.store_ids())})
+            elif parts == ["stores"]:
+                self._send_json(200, {"stores": self.service.store_ids()})
+            elif parts and parts[0] in ("config", "validate") and len(parts) <= 2:
+                store_ids, combined = self._selection(parts, query)
+                if parts[0] == "config":
+                    self._send_stream(200, "application/xml; charset=utf-8",
+                                      self.service.generate(store_ids, combined))
+                else:
+                    results = self.service.validate(store_ids, combined)
+                    self._send_json(200, {"valid": all(r["valid"] for r in results), "results": results})
+            else:
+                self._send_json(404, {"error": f"Unknown endpoint: {parsed.path}"})
+        except ValueError as e:
+            status = 404 if "not found in mapping" in str(e) else 400
+            self._send_json(status, {"error": str(e)})
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def _selection(self, parts: List[str], query: Dict[str, List[str]]) -> Tuple[Optional[List[str]], bool]:
+        """Return (store_ids, combined) for a /config or /validate request."""
+        if len(parts) == 2:
+            if parts[1] == "combined":
+                return None, True
+            return [parts[1]], False
+
+        store_ids = [store_id.strip() for value in query.get("stores", [])
+                     for store_id in value.split(",") if store_id.strip()]
+        if not store_ids:
+            raise ValueError("Specify a store ID, 'combined', or ?stores=<id>,<id>")
+        # A list of stores is generated as one combined file but validated per store
+        return store_ids, parts[0] == "config"
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, status: int, content_type: str, text: str) -> None:
+        """Stream a response body using chunked transfer encoding."""
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for offset in range(0, len(data), CHUNK_SIZE):
+            chunk = data[offset:offset + CHUNK_SIZE]
+            self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def create_server(service: GenerationService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Create a threaded HTTP server bound to the given service."""
+    handler = type("BoundGenerationRequestHandler", (GenerationRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Run a local store configuration generation service",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python generation_server.py
+  python generation_server.py --port 9000
+  curl http://127.0.0.1:8765/config/1161
+  curl "http://127.0.0.1:8765/validate?stores=1161,1038"
+        """
+    )
+
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                       help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765,
+                       help="Port to listen on (default: 8765)")
+    parser.add_argument("--mapping", type=str, default="config/mappings/store_wall_mapping.json",
+                       help="Store mapping file (default: config/mappings/store_wall_mapping.json)")
+    parser.add_argument("--template", type=str, default="config/templates/template.xml",
+                       help="Template file (default: config/templates/template.xml)")
+    parser.add_argument("--ip-mapping", type=str, default="config/mappings/store_ip_mapping.properties",
+                       help="Store IP mapping file (default: config/mappings/store_ip_mapping.properties)")
+    parser.add_argument("--service-cards", type=str, default="config/mappings/service_cards_mapping.json",
+                       help="Service cards mapping file (default: config/mappings/service_cards_mapping.json)")
+    parser.add_argument("--derive-webui", type=str, nargs="?", const="wall:1", metavar="RULE",
+                       help="Derive the web-ui server address for stores without an IP mapping entry")
+
+    args = parser.parse_args()
+
+    try:
+        service = GenerationService(args.mapping, args.template, args.ip_mapping, args.service_cards,
+                                    webui_rule=args.derive_webui)
+        server = create_server(service, args.host, args.port)
+    except (ValueError, OSError) as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+    print(f"\n🌐 Generation service listening on http://{args.host}:{args.port} - press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Generation service stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
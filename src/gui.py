@@ -18,16 +18,25 @@ from typing import Optional
 import json
 
 # Import existing modules
-from generate_store_config import StoreConfigGenerator
-from validate_config import ConfigValidator
+from generate_store_config import StoreConfigGenerator, StoreIpTable, store_region
+from validate_config import ConfigValidator, skip_wdm_stores_from_mapping
+from fleet_index import FleetIndex, format_results
+from store_search import StoreSearchIndex
+from preview import PreviewResult, StorePreview
 
 # Import for Excel conversion (optional - will check if available)
 try:
     import pandas as pd
+    from convert_wall_ips_to_json import convert_wall_ips_to_json, summary_lines
     PANDAS_AVAILABLE = True
 except ImportError:
     PANDAS_AVAILABLE = False
 
+IP_MAPPING_FILE = "config/mappings/store_ip_mapping.properties"
+
+# Stores listed in the picker at once; typing narrows the list
+STORE_PICKER_LIMIT = 200
+
 
 class StoreConfigGUI:
     """Simple GUI for Store Configuration Generator."""
@@ -42,6 +51,16 @@ class StoreConfigGUI:
         self.generator: Optional[StoreConfigGenerator] = None
         self.validator = ConfigValidator()
         self.store_list: list = []
+        self.store_regions: dict = {}
+        self.store_search = StoreSearchIndex()
+        
+        # Preview: the latest request is rendered by one background worker
+        self.preview: Optional[StorePreview] = None
+        self.preview_request: Optional[tuple] = None
+        self.preview_event = threading.Event()
+        preview_thread = threading.Thread(target=self._preview_worker)
+        preview_thread.daemon = True
+        preview_thread.start()
         
         # Create UI
         self.create_widgets()
@@ -92,7 +111,7 @@ class StoreConfigGUI:
         output_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), padx=5)
         
         # ===== Excel Conversion Section =====
-        excel_frame = ttk.LabelFrame(main_frame, text="Service Cards Conversion", padding="10")
+        excel_frame = ttk.LabelFrame(main_frame, text="Excel Conversion", padding="10")
         excel_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
         excel_frame.columnconfigure(1, weight=1)
         
@@ -114,9 +133,21 @@ class StoreConfigGUI:
         json_entry = ttk.Entry(excel_frame, textvariable=self.json_output_var, width=30)
         json_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=5)
         
-        # Convert button
+        # Wall IP sheet (merged into the store mapping above)
+        ttk.Label(excel_frame, text="Wall IP Sheet:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        self.wall_sheet_var = tk.StringVar(value="wall-ips.xlsx")
+        wall_sheet_entry = ttk.Entry(excel_frame, textvariable=self.wall_sheet_var, width=30)
+        wall_sheet_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), padx=5)
+        
+        ttk.Button(
+            excel_frame, 
+            text="Browse...", 
+            command=self.browse_wall_sheet
+        ).grid(row=2, column=2, padx=5)
+        
+        # Convert buttons
         convert_button_frame = ttk.Frame(excel_frame)
-        convert_button_frame.grid(row=2, column=0, columnspan=3, pady=10)
+        convert_button_frame.grid(row=3, column=0, columnspan=3, pady=10)
         
         self.convert_btn = ttk.Button(
             convert_button_frame, 
@@ -125,6 +156,13 @@ class StoreConfigGUI:
         )
         self.convert_btn.pack(side=tk.LEFT, padx=5)
         
+        self.wall_import_btn = ttk.Button(
+            convert_button_frame, 
+            text="🧱 Import Wall IPs", 
+            command=self.import_wall_ips
+        )
+        self.wall_import_btn.pack(side=tk.LEFT, padx=5)
+        
         # Show warning if pandas not available
         if not PANDAS_AVAILABLE:
             warning_label = ttk.Label(
@@ -132,8 +170,9 @@ class StoreConfigGUI:
                 text="⚠️ pandas not installed. Install with: pip install pandas openpyxl",
                 foreground="orange"
             )
-            warning_label.grid(row=3, column=0, columnspan=3, pady=5)
+            warning_label.grid(row=4, column=0, columnspan=3, pady=5)
             self.convert_btn.config(state="disabled")
+            self.wall_import_btn.config(state="disabled")
         
         # ===== Store Selection Section =====
         store_frame = ttk.LabelFrame(main_frame, text="Store Selection", padding="10")
@@ -167,13 +206,73 @@ class StoreConfigGUI:
             value="single"
         ).pack(side=tk.LEFT, padx=5)
         
+        ttk.Radiobutton(
+            radio_frame, 
+            text="Generate Selected Stores", 
+            variable=self.gen_mode, 
+            value="batch"
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # Validate each store in memory before writing; invalid stores are held back
+        self.validate_before_write = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            radio_frame,
+            text="Validate Before Writing",
+            variable=self.validate_before_write
+        ).pack(side=tk.LEFT, padx=5)
+        
         # Store selection combobox
         store_select_frame = ttk.Frame(store_frame)
         store_select_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=5)
         
-        ttk.Label(store_select_frame, text="Select Store:").pack(side=tk.LEFT, padx=5)
-        self.store_combo = ttk.Combobox(store_select_frame, width=50, state="readonly")
-        self.store_combo.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        store_select_frame.columnconfigure(1, weight=1)
+        
+        # Type part of an ID, name, region or IP to filter the list
+        ttk.Label(store_select_frame, text="Select Store:").grid(row=0, column=0, sticky=tk.W, padx=5)
+        self.store_filter_var = tk.StringVar()
+        self.store_filter_var.trace_add("write", lambda *args: self.filter_store_picker())
+        ttk.Entry(store_select_frame, textvariable=self.store_filter_var, width=50).grid(
+            row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 0))
+        self.store_match_label = ttk.Label(store_select_frame, text="")
+        self.store_match_label.grid(row=0, column=2, sticky=tk.W, padx=5)
+        
+        self.store_picker = tk.Listbox(store_select_frame, height=4, exportselection=False)
+        self.store_picker.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=(5, 0), pady=(5, 0))
+        picker_scrollbar = ttk.Scrollbar(store_select_frame, orient=tk.VERTICAL, command=self.store_picker.yview)
+        picker_scrollbar.grid(row=1, column=2, sticky=(tk.W, tk.N, tk.S), pady=(5, 0))
+        self.store_picker.config(yscrollcommand=picker_scrollbar.set)
+        self.store_picker.bind("<<ListboxSelect>>", lambda event: self.request_preview())
+        
+        # Multi-select store list for batch generation
+        batch_frame = ttk.Frame(store_frame)
+        batch_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=5)
+        batch_frame.columnconfigure(1, weight=1)
+        
+        ttk.Label(batch_frame, text="Selected Stores:").grid(row=0, column=0, sticky=(tk.W, tk.N), padx=5)
+        self.store_listbox = tk.Listbox(batch_frame, selectmode=tk.EXTENDED, height=6, exportselection=False)
+        self.store_listbox.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 0))
+        listbox_scrollbar = ttk.Scrollbar(batch_frame, orient=tk.VERTICAL, command=self.store_listbox.yview)
+        listbox_scrollbar.grid(row=0, column=2, sticky=(tk.N, tk.S))
+        self.store_listbox.config(yscrollcommand=listbox_scrollbar.set)
+        
+        region_frame = ttk.Frame(batch_frame)
+        region_frame.grid(row=1, column=1, sticky=tk.W, pady=(5, 0))
+        
+        ttk.Label(region_frame, text="Region:").pack(side=tk.LEFT, padx=5)
+        self.region_combo = ttk.Combobox(region_frame, width=20, state="readonly")
+        self.region_combo.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(
+            region_frame, 
+            text="Select Region", 
+            command=self.select_region
+        ).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(
+            region_frame, 
+            text="Clear Selection", 
+            command=lambda: self.store_listbox.selection_clear(0, tk.END)
+        ).pack(side=tk.LEFT, padx=5)
         
         # ===== Action Buttons =====
         button_frame = ttk.Frame(main_frame)
@@ -207,11 +306,32 @@ class StoreConfigGUI:
             command=self.load_store_list
         ).pack(side=tk.LEFT, padx=5)
         
+        # Log and preview side by side
+        output_pane = ttk.PanedWindow(main_frame, orient=tk.HORIZONTAL)
+        output_pane.grid(row=5, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        
         # ===== Output Log =====
-        log_frame = ttk.LabelFrame(main_frame, text="Output Log", padding="10")
-        log_frame.grid(row=5, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        log_frame = ttk.LabelFrame(output_pane, text="Output Log", padding="10")
+        output_pane.add(log_frame, weight=1)
         log_frame.columnconfigure(0, weight=1)
-        log_frame.rowconfigure(0, weight=1)
+        log_frame.rowconfigure(1, weight=1)
+        
+        # Fleet search: IP, wall type, store ID, card or part of a store name
+        search_frame = ttk.Frame(log_frame)
+        search_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        ttk.Label(search_frame, text="Fleet Search:").pack(side=tk.LEFT, padx=5)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=40)
+        search_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        search_entry.bind("<Return>", lambda event: self.fleet_search())
+        
+        self.search_btn = ttk.Button(
+            search_frame, 
+            text="🔎 Search", 
+            command=self.fleet_search
+        )
+        self.search_btn.pack(side=tk.LEFT, padx=5)
         
         # Create scrolled text widget
         self.log_text = scrolledtext.ScrolledText(
@@ -221,14 +341,40 @@ class StoreConfigGUI:
             wrap=tk.WORD,
             font=("Consolas", 9)
         )
-        self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.log_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Clear log button
         ttk.Button(
             log_frame, 
             text="Clear Log", 
             command=self.clear_log
-        ).grid(row=1, column=0, pady=(5, 0))
+        ).grid(row=2, column=0, pady=(5, 0))
+        
+        # ===== XML Preview =====
+        preview_frame = ttk.LabelFrame(output_pane, text="XML Preview", padding="10")
+        output_pane.add(preview_frame, weight=1)
+        preview_frame.columnconfigure(0, weight=1)
+        preview_frame.rowconfigure(1, weight=1)
+        
+        self.preview_status = ttk.Label(preview_frame, text="Select a store to preview its configuration")
+        self.preview_status.grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
+        
+        self.preview_text = scrolledtext.ScrolledText(
+            preview_frame, 
+            height=15, 
+            width=60,
+            wrap=tk.NONE,
+            font=("Consolas", 9)
+        )
+        self.preview_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        # Lines that differ from the file in the output folder
+        self.preview_text.tag_configure("changed", background="#fff2a8")
+        
+        ttk.Button(
+            preview_frame, 
+            text="🔄 Refresh Preview", 
+            command=self.request_preview
+        ).grid(row=2, column=0, pady=(5, 0))
         
         # ===== Status Bar =====
         self.status_var = tk.StringVar(value="Ready")
@@ -259,17 +405,31 @@ class StoreConfigGUI:
         """Load list of stores from mapping file."""
         try:
             mapping_file = self.mapping_var.get()
-            with open(mapping_file, 'r', encoding='utf-8') as f:
+            with open(mapping_file, 'r', encoding='utf-8-sig') as f:
                 data = json.load(f)
                 
+            try:
+                webui_ips = StoreIpTable.load(IP_MAPPING_FILE).entries
+            except OSError:
+                webui_ips = {}
+                
             self.store_list = []
+            self.store_regions = {}
+            searchable = []
             for store_id, store_data in data.get('stores', {}).items():
                 store_name = store_data.get('name', 'Unknown')
                 self.store_list.append(f"{store_id} - {store_name}")
+                self.store_regions[store_id] = store_region(store_data)
+                searchable.append((store_id, store_name, self.store_regions[store_id],
+                                   list(store_data.get('walls', {}).values()) + [webui_ips.get(store_id, "")]))
             
-            self.store_combo['values'] = self.store_list
-            if self.store_list:
-                self.store_combo.current(0)
+            self.store_search.build(searchable)
+            self.filter_store_picker()
+            
+            self.store_listbox.delete(0, tk.END)
+            for entry in self.store_list:
+                self.store_listbox.insert(tk.END, entry)
+            self.region_combo['values'] = sorted({r for r in self.store_regions.values() if r})
                 
             self.log(f"✓ Loaded {len(self.store_list)} stores from {mapping_file}")
             
@@ -280,6 +440,86 @@ class StoreConfigGUI:
         except Exception as e:
             self.log(f"❌ Error loading stores: {e}")
             
+    def filter_store_picker(self):
+        """Refill the store picker with the stores matching the filter text."""
+        matches = self.store_search.search(self.store_filter_var.get(), STORE_PICKER_LIMIT + 1)
+        shown = matches[:STORE_PICKER_LIMIT]
+        self.store_picker.delete(0, tk.END)
+        if shown:
+            self.store_picker.insert(tk.END, *shown)
+            self.store_picker.selection_set(0)
+        more = "+" if len(matches) > STORE_PICKER_LIMIT else ""
+        self.store_match_label.config(text=f"{len(shown)}{more} of {len(self.store_search)}")
+        self.request_preview()
+        
+    def get_picked_store(self) -> str:
+        """Return the "<id> - <name>" entry chosen in the store picker, or ''."""
+        selection = self.store_picker.curselection()
+        return self.store_picker.get(selection[0]) if selection else ""
+        
+    def request_preview(self):
+        """Ask the preview worker to render the picked store; only the latest request is rendered."""
+        selected = self.get_picked_store()
+        if selected:
+            self.preview_request = (selected.split(" - ")[0], self.mapping_var.get(), self.template_var.get(),
+                                    self.output_var.get())
+        else:
+            self.preview_request = None
+        self.preview_event.set()
+        
+    def _preview_worker(self):
+        """Background worker rendering previews, so typing and selection never wait for it."""
+        while True:
+            self.preview_event.wait()
+            self.preview_event.clear()
+            request = self.preview_request
+            if request is None:
+                self.root.after(0, self._show_preview, request, None, None)
+                continue
+            
+            store_id, mapping_file, template_file, output_dir = request
+            try:
+                if self.preview is None or (self.preview.generator.mapping_file,
+                                            self.preview.generator.template_file) != (mapping_file, template_file):
+                    self.preview = StorePreview(mapping_file, template_file, IP_MAPPING_FILE,
+                                                "config/mappings/service_cards_mapping.json")
+                result = self.preview.preview(store_id, output_dir)
+                self.root.after(0, self._show_preview, request, result, None)
+            except Exception as e:
+                self.root.after(0, self._show_preview, request, None, str(e))
+                
+    def _show_preview(self, request, result: Optional[PreviewResult], error: Optional[str]):
+        """Show a rendered preview, unless another store was picked meanwhile."""
+        if request != self.preview_request:
+            return
+        self.preview_text.delete(1.0, tk.END)
+        if request is None:
+            self.preview_status.config(text="Select a store to preview its configuration")
+            return
+        if error is not None:
+            self.preview_status.config(text=f"❌ Store {request[0]}: {error}")
+            return
+        
+        self.preview_text.insert(tk.END, result.xml)
+        for line in result.changed_lines:
+            self.preview_text.tag_add("changed", f"{line}.0", f"{line}.0 lineend +1c")
+        if result.changed_lines:
+            self.preview_text.see(f"{result.changed_lines[0]}.0")
+        self.preview_status.config(text=f"Store {result.store_id}: {result.summary()}")
+        
+    def select_region(self):
+        """Add all stores of the chosen region to the batch selection."""
+        region = self.region_combo.get()
+        if not region:
+            return
+        for index, entry in enumerate(self.store_list):
+            if self.store_regions.get(entry.split(" - ")[0]) == region:
+                self.store_listbox.selection_set(index)
+        
+    def get_selected_store_ids(self) -> list:
+        """Return store IDs selected in the batch list."""
+        return [self.store_list[index].split(" - ")[0] for index in self.store_listbox.curselection()]
+            
     def generate_config(self):
         """Generate configuration files."""
         # Disable button during generation
@@ -301,14 +541,28 @@ class StoreConfigGUI:
             generator = StoreConfigGenerator(
                 mapping_file=self.mapping_var.get(),
                 template_file=self.template_var.get(),
-                ip_mapping_file="config/mappings/store_ip_mapping.properties",
+                ip_mapping_file=IP_MAPPING_FILE,
                 service_cards_file="config/mappings/service_cards_mapping.json"
             )
             
             output_dir = self.output_var.get()
             mode = self.gen_mode.get()
+            held_back = 0
             
-            if mode == "all":
+            if self.validate_before_write.get():
+                if mode in ("all", "combined"):
+                    store_ids = None
+                elif mode == "batch":
+                    store_ids = self.get_selected_store_ids()
+                else:
+                    selected = self.get_picked_store()
+                    store_ids = [selected.split(" - ")[0]] if selected else []
+                if store_ids == []:
+                    self.log("❌ Please select one or more stores")
+                    return
+                held_back = self._generate_validated(generator, store_ids, output_dir, mode == "combined")
+                
+            elif mode == "all":
                 # Generate all stores (separate files)
                 self.log("📦 Generating separate files for all stores...")
                 files = generator.generate_all_stores(output_dir, combined=False)
@@ -323,9 +577,32 @@ class StoreConfigGUI:
                 self.log(f"\n✅ Generated combined configuration file!")
                 self.log(f"   📄 {files[0]}")
                 
+            elif mode == "batch":
+                # Generate only the selected stores, logging each as it completes
+                store_ids = self.get_selected_store_ids()
+                if not store_ids:
+                    self.log("❌ Please select one or more stores")
+                    return
+                
+                self.log(f"📦 Generating {len(store_ids)} selected stores...")
+                # Stores with pre-flight errors are held back, the rest are generated
+                passed = generator.preflight_passed(store_ids)
+                generator.check_collisions(store_ids)
+                
+                generated = 0
+                for store_id, output_file, error in generator.iter_store_configs(passed, output_dir, workers=4):
+                    if output_file:
+                        generated += 1
+                        self.log(f"   📄 {output_file}")
+                    else:
+                        self.log(f"   ❌ Store {store_id}: {error}")
+                    self.set_status(f"Generating... {generated}/{len(store_ids)}")
+                
+                self.log(f"\n✅ Generated {generated} of {len(store_ids)} configuration files!")
+                
             else:  # single
                 # Generate single store
-                selected = self.store_combo.get()
+                selected = self.get_picked_store()
                 if not selected:
                     self.log("❌ Please select a store")
                     return
@@ -337,8 +614,13 @@ class StoreConfigGUI:
                 self.log(f"\n✅ Generated configuration file!")
                 self.log(f"   📄 {output_file}")
             
-            self.set_status("Generation completed successfully!")
-            messagebox.showinfo("Success", "Configuration generated successfully!")
+            if held_back:
+                self.set_status(f"Generation completed: {held_back} store(s) held back")
+                messagebox.showwarning("Warning", f"{held_back} store(s) failed validation and were not written. "
+                                                  "Check log for details.")
+            else:
+                self.set_status("Generation completed successfully!")
+                messagebox.showinfo("Success", "Configuration generated successfully!")
             
         except Exception as e:
             self.log(f"\n❌ Error: {e}")
@@ -348,7 +630,44 @@ class StoreConfigGUI:
         finally:
             # Re-enable button
             self.generate_btn.config(state="normal")
+            # The output file may have changed
+            self.root.after(0, self.request_preview)
             
+    def _generate_validated(self, generator: StoreConfigGenerator, store_ids, output_dir: str,
+                            combined: bool) -> int:
+        """Generate-then-validate in memory, logging held back stores; returns how many were held back."""
+        generator.load_all_inputs()
+        if store_ids is None:
+            store_ids = list(generator.store_mapping["stores"])
+        self.log(f"📦 Generating and validating {len(store_ids)} store(s)...")
+        
+        if combined:
+            output_file, held_back = generator.generate_validated_combined_config(output_dir, store_ids)
+            if output_file:
+                self.log(f"   📄 {output_file}")
+        else:
+            held_back = []
+            written = 0
+            for store_id, output_file, result in generator.iter_validated_store_configs(store_ids, output_dir):
+                if output_file:
+                    written += 1
+                    self.log(f"   📄 {output_file}")
+                elif result["valid"]:
+                    held_back.append(dict(result, errors=["Could not write the configuration file"]))
+                else:
+                    held_back.append(result)
+                self.set_status(f"Generating... {written + len(held_back)}/{len(store_ids)}")
+        
+        if held_back:
+            self.log(f"\n🚫 {len(held_back)} store(s) held back (not written):")
+            for result in held_back:
+                self.log(f"\n   {result['file']}")
+                for error in result["errors"]:
+                    self.log(f"      - {error}")
+        self.log(f"\n✅ Validated {len(store_ids)} store(s): {len(store_ids) - len(held_back)} written, "
+                 f"{len(held_back)} held back")
+        return len(held_back)
+    
     def validate_output(self):
         """Validate generated configuration files."""
         # Disable button during validation
@@ -373,6 +692,12 @@ class StoreConfigGUI:
                 self.set_status("Validation failed")
                 return
             
+            # skip_wdm stores of the selected mapping need no wall changes
+            try:
+                self.validator.skip_wdm_stores = skip_wdm_stores_from_mapping(self.mapping_var.get())
+            except (OSError, ValueError):
+                self.validator.skip_wdm_stores = set()
+            
             # Validate all files in output directory
             results = self.validator.validate_directory(output_dir)
             
@@ -415,6 +740,46 @@ class StoreConfigGUI:
             # Re-enable button
             self.validate_btn.config(state="normal")
             
+    def fleet_search(self):
+        """Look up the search text in the fleet index of the output directory."""
+        text = self.search_var.get().strip()
+        if not text:
+            return
+        self.search_btn.config(state="disabled")
+        
+        thread = threading.Thread(target=self._fleet_search_thread, args=(text,))
+        thread.daemon = True
+        thread.start()
+        
+    def _fleet_search_thread(self, text: str):
+        """Thread worker for fleet search."""
+        try:
+            output_dir = self.output_var.get()
+            if not Path(output_dir).exists():
+                self.log(f"❌ Output directory not found: {output_dir}")
+                return
+            
+            self.set_status("Searching...")
+            # Updating first only parses files that changed since the last search
+            with FleetIndex(output_dir) as index:
+                stats = index.update()
+                results = index.search(text)
+            if stats["parsed"]:
+                self.log(f"🔎 Indexed {stats['parsed']} changed file(s)")
+            
+            self.log(f"\n🔎 {text}:")
+            for line in format_results(results):
+                self.log(f"   {line}")
+            self.log(f"   {len(results)} store(s) found")
+            self.set_status(f"Search complete: {len(results)} store(s)")
+            
+        except Exception as e:
+            self.log(f"\n❌ Error: {e}")
+            self.set_status("Search failed")
+            
+        finally:
+            self.search_btn.config(state="normal")
+            
     def open_output_folder(self):
         """Open the output folder in file explorer."""
         try:
@@ -574,6 +939,105 @@ class StoreConfigGUI:
         finally:
             # Re-enable button
             self.convert_btn.config(state="normal")
+    
+    def browse_wall_sheet(self):
+        """Browse for the wall IP sheet."""
+        filename = filedialog.askopenfilename(
+            title="Select Wall IP Sheet",
+            filetypes=[
+                ("Excel files", "*.xlsx *.xls"),
+                ("CSV files", "*.csv"),
+                ("All files", "*.*")
+            ],
+            initialdir="."
+        )
+        if filename:
+            self.wall_sheet_var.set(filename)
+            self.log(f"📄 Selected wall IP sheet: {filename}")
+    
+    def import_wall_ips(self):
+        """Merge the wall IP sheet into the store mapping."""
+        if not PANDAS_AVAILABLE:
+            messagebox.showerror(
+                "Error", 
+                "pandas library is not installed.\n\n"
+                "Please install it with:\n"
+                "pip install pandas openpyxl"
+            )
+            return
+        
+        # Disable button during the import
+        self.wall_import_btn.config(state="disabled")
+        
+        thread = threading.Thread(target=self._import_wall_ips_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def _import_wall_ips_thread(self):
+        """Thread worker for the wall IP import."""
+        sheet_file = self.wall_sheet_var.get()
+        mapping_file = self.mapping_var.get()
+        try:
+            self.clear_log()
+            self.log("🧱 Starting wall IP import...")
+            self.set_status("Importing wall IPs...")
+            
+            if not Path(sheet_file).exists():
+                self.log(f"❌ Error: Wall IP sheet not found: {sheet_file}")
+                self.set_status("Import failed")
+                messagebox.showerror("Error", f"Wall IP sheet not found:\n{sheet_file}")
+                return
+            
+            self.log(f"📖 Reading wall IP sheet: {sheet_file}")
+            report = convert_wall_ips_to_json(sheet_file, mapping_file)
+            
+            self.log(f"\n📊 Summary:")
+            for line in summary_lines(report):
+                self.log(line)
+            
+            if not report["written"]:
+                # Rejected rows: the mapping is only touched once the user has seen them
+                rejected = len(report["problems"])
+                self.log(f"\n🚫 Nothing written: {rejected} row(s) rejected")
+                if not messagebox.askyesno(
+                    "Rows rejected",
+                    f"{rejected} row(s) of the sheet were rejected (see the log).\n\n"
+                    f"Import the {report['imported']} valid row(s) into {report['output_file']} anyway?"
+                ):
+                    self.set_status(f"Wall IP import cancelled, {rejected} row(s) rejected")
+                    return
+                report = convert_wall_ips_to_json(sheet_file, mapping_file, allow_partial=True)
+            
+            self.log(f"\n✅ Merged into {report['output_file']}")
+            
+            # New stores and IPs show up in the picker
+            self.root.after(0, self.load_store_list)
+            
+            message = (f"Wall IPs imported into {report['output_file']}\n\n"
+                       f"Stores: {report['stores']} ({len(report['new_stores'])} new)\n"
+                       f"Walls added or changed: {report['changed_walls']}")
+            if report["problems"]:
+                self.set_status(f"Wall IPs imported, {len(report['problems'])} row(s) rejected")
+                messagebox.showwarning(
+                    "Imported with problems",
+                    f"{message}\n\n{len(report['problems'])} row(s) were rejected and skipped."
+                )
+            else:
+                self.set_status("Wall IPs imported successfully!")
+                messagebox.showinfo("Success", message)
+            
+        except KeyError as e:
+            self.log(f"\n❌ Error: {e.args[0] if e.args else e}")
+            self.set_status("Import failed")
+            messagebox.showerror("Error", f"Wall IP sheet is missing columns:\n{e.args[0] if e.args else e}")
+            
+        except Exception as e:
+            self.log(f"\n❌ Error: {e}")
+            self.set_status("Import failed")
+            messagebox.showerror("Error", f"Wall IP import failed:\n{e}")
+            
+        finally:
+            self.wall_import_btn.config(state="normal")
 
 
 def main():
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Wall IP Allocation Planner
+
+Proposes IP addresses for walls that have none yet (empty "" entries and
+missing mandatory walls) and flags walls outside their store's /24 subnet.
+Every address used anywhere in the fleet (wall IPs and web-ui addresses
+from the properties file) is kept per subnet as sorted runs of used host
+numbers, so checking an address or finding the next free one is a binary
+search. A store's subnet comes from its properties entry, or wall 1, or
+the subnet most of its walls are in (the same reference the pre-flight
+check uses, with the last fallback for stores without wall 1).
+
+Proposals start at the store's lowest used host, so new walls join the
+store's existing block, or at FIRST_HOST for stores with no walls yet.
+
+Usage:
+    python ip_planner.py --mapping store_wall_mapping_PROD-20251111-134645.json
+    python ip_planner.py --store 1161 --count 2
+    python ip_planner.py --ip 10.29.27.33
+    python ip_planner.py --write --output store_wall_mapping_planned.json
+"""
+
+import argparse
+import json
+import sys
+from bisect import bisect_right
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from generate_store_config import StoreIpTable, int_to_ipv4, ipv4_to_int, parse_store_ids
+
+# Host number proposals start at for stores without any wall IP yet
+FIRST_HOST = 30
+# Usable host numbers of a /24 subnet (network and broadcast excluded)
+LOWEST_HOST = 1
+HIGHEST_HOST = 254
+
+
+class SubnetIntervals:
+    """Used host numbers of one /24 subnet as sorted, non-adjacent [start, end] runs."""
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    @classmethod
+    def from_hosts(cls, hosts: Iterable[int]) -> "SubnetIntervals":
+        intervals = cls()
+        for host in sorted(set(hosts)):
+            if intervals.ends and intervals.ends[-1] == host - 1:
+                intervals.ends[-1] = host
+            else:
+                intervals.starts.append(host)
+                intervals.ends.append(host)
+        return intervals
+
+    def __contains__(self, host: int) -> bool:
+        i = bisect_right(self.starts, host) - 1
+        return i >= 0 and self.ends[i] >= host
+
+    def __len__(self) -> int:
+        return sum(end - start + 1 for start, end in zip(self.starts, self.ends))
+
+    def add(self, host: int) -> None:
+        """Mark a host as used, joining it with the runs next to it."""
+        i = bisect_right(self.starts, host) - 1
+        if i >= 0 and self.ends[i] >= host:
+            return
+        joins_left = i >= 0 and self.ends[i] == host - 1
+        joins_right = i + 1 < len(self.starts) and self.starts[i + 1] == host + 1
+        if joins_left and joins_right:
+            self.ends[i] = self.ends[i + 1]
+            del self.starts[i + 1], self.ends[i + 1]
+        elif joins_left:
+            self.ends[i] = host
+        elif joins_right:
+            self.starts[i + 1] = host
+        else:
+            self.starts.insert(i + 1, host)
+            self.ends.insert(i + 1, host)
+
+    def next_free(self, start: int) -> Optional[int]:
+        """Lowest free host at or above start, wrapping around to LOWEST_HOST; None if the subnet is full."""
+        for low in (max(start, LOWEST_HOST), LOWEST_HOST):
+            host = low
+            i = bisect_right(self.starts, host) - 1
+            if i >= 0 and self.ends[i] >= host:
+                # Runs never touch, so the host after a run is free
+                host = self.ends[i] + 1
+            if host <= HIGHEST_HOST:
+                return host
+        return None
+
+
+class IpPlanner:
+    """Fleet-wide index of used IPs per /24 subnet, with free address proposals per store."""
+
+    def __init__(self, mapping_file: str = "config/mappings/store_wall_mapping.json",
+                 ip_mapping_file: str = "config/mappings/store_ip_mapping.properties",
+                 first_host: int = FIRST_HOST):
+        self.mapping_file = mapping_file
+        self.ip_mapping_file = ip_mapping_file
+        self.first_host = first_host
+        self.mapping: Dict[str, Any] = {}
+        self.webui_ips: Dict[str, str] = {}
+        # subnet (address >> 8) -> used hosts
+        self.subnets: Dict[int, SubnetIntervals] = {}
+        # address -> "store X wall Y" / "store X web-ui" entries using it
+        self.owners: Dict[int, List[str]] = {}
+        self.store_subnets: Dict[str, int] = {}
+
+    def load(self) -> None:
+        """Read the mapping and the properties file and build the index."""
+        with open(self.mapping_file, 'r', encoding='utf-8-sig') as f:
+            self.mapping = json.load(f)
+        try:
+            self.webui_ips = StoreIpTable.load(self.ip_mapping_file).entries
+        except OSError:
+            self.webui_ips = {}
+        self.build()
+
+    @property
+    def stores(self) -> Dict[str, Any]:
+        return self.mapping.get("stores", {})
+
+    def mandatory_walls(self) -> List[str]:
+        return [str(wall_id) for wall_id in self.mapping.get("metadata", {}).get("mandatory_walls", [])]
+
+    def build(self) -> None:
+        """Index every wall and web-ui address of the fleet and work out each store's subnet."""
+        hosts: Dict[int, List[int]] = {}
+        self.owners = {}
+        self.store_subnets = {}
+
+        def use(value: int, owner: str) -> None:
+            hosts.setdefault(value >> 8, []).append(value & 0xFF)
+            self.owners.setdefault(value, []).append(owner)
+
+        for store_id, store_data in self.stores.items():
+            walls = store_data.get("walls")
+            walls = walls if isinstance(walls, dict) else {}
+            parsed = {wall_id: ipv4_to_int(ip) for wall_id, ip in walls.items() if isinstance(ip, str)}
+            for wall_id, value in parsed.items():
+                if value is not None:
+                    use(value, f"store {store_id} wall {wall_id}")
+
+            webui = ipv4_to_int(self.webui_ips.get(store_id, ""))
+            if webui is not None:
+                if webui not in parsed.values():
+                    use(webui, f"store {store_id} web-ui")
+                self.store_subnets[store_id] = webui >> 8
+            elif parsed.get("1") is not None:
+                self.store_subnets[store_id] = parsed["1"] >> 8
+            else:
+                subnets = Counter(value >> 8 for value in parsed.values() if value is not None)
+                if subnets:
+                    self.store_subnets[store_id] = subnets.most_common(1)[0][0]
+
+        self.subnets = {subnet: SubnetIntervals.from_hosts(used) for subnet, used in hosts.items()}
+
+    def is_used(self, ip: str) -> bool:
+        value = ipv4_to_int(ip)
+        if value is None:
+            raise ValueError(f"Invalid IP address '{ip}'")
+        intervals = self.subnets.get(value >> 8)
+        return intervals is not None and (value & 0xFF) in intervals
+
+    def _start_host(self, store_id: str, subnet: int) -> int:
+        """The store's lowest used host in its subnet, or first_host."""
+        walls = self.stores[store_id].get("walls") or {}
+        hosts = [value & 0xFF for value in (ipv4_to_int(ip) for ip in walls.values() if isinstance(ip, str))
+                 if value is not None and value >> 8 == subnet]
+        return min(hosts) if hosts else self.first_host
+
+    def suggest(self, store_id: str, count: int = 1, reserve: bool = False) -> List[str]:
+        """
+        Up to count free addresses in the store's subnet. With reserve the
+        addresses are marked as used, so later suggestions skip them.
+        """
+        if store_id not in self.stores:
+            raise ValueError(f"Store {store_id} not found in mapping")
+        subnet = self.store_subnets.get(store_id)
+        if subnet is None:
+            raise ValueError(f"Store {store_id} has no IP in its walls or the properties file to take the subnet from")
+
+        intervals = self.subnets.setdefault(subnet, SubnetIntervals())
+        start = self._start_host(store_id, subnet)
+        taken: List[int] = []
+        while len(taken) < count:
+            host = intervals.next_free(start)
+            # Back at the first suggestion after wrapping around: no free hosts left
+            if host is None or (taken and host == taken[0]):
+                break
+            taken.append(host)
+            start = host + 1
+        if reserve:
+            for host in taken:
+                intervals.add(host)
+                self.owners.setdefault((subnet << 8) | host, []).append(f"store {store_id} (planned)")
+        return [int_to_ipv4((subnet << 8) | host) for host in taken]
+
+    def open_walls(self, store_id: str) -> List[str]:
+        """Walls of a store that need an address: empty entries and missing mandatory walls."""
+        store_data = self.stores[store_id]
+        if store_data.get("skip_wdm", False):
+            return []
+        walls = store_data.get("walls")
+        walls = walls if isinstance(walls, dict) else {}
+        open_walls = [wall_id for wall_id, ip in walls.items() if isinstance(ip, str) and not ip.strip()]
+        open_walls += [wall_id for wall_id in self.mandatory_walls() if wall_id not in walls]
+        return open_walls
+
+    def check(self, store_ids: Optional[List[str]] = None) -> List[str]:
+        """Walls with an invalid IP, outside their store's subnet or sharing an IP with another store."""
+        problems: List[str] = []
+        for store_id in store_ids if store_ids is not None else list(self.stores):
+            store_data = self.stores[store_id]
+            subnet = self.store_subnets.get(store_id)
+            for wall_id, ip in (store_data.get("walls") or {}).items():
+                if not isinstance(ip, str) or not ip.strip():
+                    continue
+                value = ipv4_to_int(ip)
+                if value is None:
+                    problems.append(f"Store {store_id} wall {wall_id} has an invalid IP address '{ip}'")
+                elif subnet is not None and value >> 8 != subnet:
+                    problems.append(f"Store {store_id} wall {wall_id} IP {ip} is outside the store subnet "
+                                    f"{int_to_ipv4(subnet << 8)}/24")
+                if value is not None:
+                    others = [owner for owner in self.owners.get(value, [])
+                              if not owner.startswith(f"store {store_id} ")]
+                    if others:
+                        problems.append(f"Store {store_id} wall {wall_id} IP {ip} is also used by {', '.join(others)}")
+        return problems
+
+    def plan(self, store_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Propose addresses for every open wall of the stores. Proposals are
+        reserved in the index as they are made, so no two walls get the same
+        address.
+        """
+        selected = store_ids if store_ids is not None else list(self.stores)
+        proposals: List[Tuple[str, str, str]] = []
+        unplanned: List[str] = []
+        for store_id in selected:
+            open_walls = self.open_walls(store_id)
+            if not open_walls:
+                continue
+            try:
+                addresses = self.suggest(store_id, len(open_walls), reserve=True)
+            except ValueError as e:
+                unplanned.append(f"{e} ({len(open_walls)} wall(s) without an address)")
+                continue
+            proposals.extend((store_id, wall_id, address) for wall_id, address in zip(open_walls, addresses))
+            if len(addresses) < len(open_walls):
+                unplanned.append(f"Store {store_id}: subnet is full, walls {', '.join(open_walls[len(addresses):])} "
+                                 f"have no address")
+        return {"stores": len(selected), "proposals": proposals, "unplanned": unplanned,
+                "problems": self.check(selected)}
+
+    def apply(self, proposals: List[Tuple[str, str, str]]) -> None:
+        """Write proposals into the mapping; empty walls keep their position, missing walls are appended."""
+        for store_id, wall_id, address in proposals:
+            self.stores[store_id].setdefault("walls", {})[wall_id] = address
+
+    def save(self, output_file: Optional[str] = None) -> str:
+        output_file = output_file or self.mapping_file
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(self.mapping, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        return output_file
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Propose free wall IPs and flag walls outside the store subnet")
+    parser.add_argument("--store", type=str,
+                       help="Only plan for this store")
+    parser.add_argument("--stores", type=str,
+                       help="Only plan for these stores (comma-separated)")
+    parser.add_argument("--count", type=int,
+                       help="Suggest this many free addresses for --store instead of planning its open walls")
+    parser.add_argument("--ip", type=str,
+                       help="Show whether an address is in use and by what")
+    parser.add_argument("--write", action="store_true",
+                       help="Write the proposals into the mapping")
+    parser.add_argument("--output", type=str,
+                       help="With --write: write the mapping here instead of over --mapping")
+    parser.add_argument("--first-host", type=int, default=FIRST_HOST,
+                       help=f"Host number to start at for stores without wall IPs (default: {FIRST_HOST})")
+    parser.add_argument("--mapping", type=str, default="config/mappings/store_wall_mapping.json",
+                       help="Store mapping JSON file")
+    parser.add_argument("--ip-mapping", type=str, default="config/mappings/store_ip_mapping.properties",
+                       help="Store IP mapping properties file")
+
+    args = parser.parse_args()
+
+    if not LOWEST_HOST <= args.first_host <= HIGHEST_HOST:
+        parser.error(f"--first-host must be between {LOWEST_HOST} and {HIGHEST_HOST}")
+    if args.count is not None and not args.store:
+        parser.error("--count requires --store")
+
+    planner = IpPlanner(args.mapping, args.ip_mapping, args.first_host)
+    try:
+        planner.load()
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    if args.ip:
+        try:
+            used = planner.is_used(args.ip)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        owners = planner.owners.get(ipv4_to_int(args.ip), [])
+        print(f"{args.ip}: used by {', '.join(owners)}" if used else f"{args.ip}: free")
+        return
+
+    store_ids = None
+    if args.store or args.stores:
+        store_ids = parse_store_ids(args.stores) if args.stores else [args.store]
+        missing = [store_id for store_id in store_ids if store_id not in planner.stores]
+        if missing:
+            print(f"❌ Error: Store(s) not found in mapping: {', '.join(missing)}")
+            sys.exit(1)
+
+    if args.count is not None:
+        try:
+            addresses = planner.suggest(args.store, args.count)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        for address in addresses:
+            print(address)
+        if len(addresses) < args.count:
+            print(f"⚠️  Only {len(addresses)} free address(es) in the subnet", file=sys.stderr)
+        return
+
+    result = planner.plan(store_ids)
+    print(f"🧮 Planning wall IPs for {result['stores']} store(s) "
+          f"({len(planner.subnets)} subnets, {len(planner.owners)} addresses in use)")
+    for store_id, wall_id, address in result["proposals"]:
+        print(f"   Store {store_id} wall {wall_id}: {address}")
+    for message in result["unplanned"]:
+        print(f"   ⚠️  {message}")
+    for problem in result["problems"]:
+        print(f"   🚨 {problem}")
+
+    print(f"\n📊 Summary: {len(result['proposals'])} address(es) proposed, "
+          f"{len(result['unplanned'])} store(s) not planned, {len(result['problems'])} wall(s) flagged")
+
+    if args.write and result["proposals"]:
+        planner.apply(result["proposals"])
+        print(f"✅ Saved to: {planner.save(args.output)}")
+    elif not args.write and result["proposals"]:
+        print("   Run with --write to save the proposals to the mapping")
+
+    if result["problems"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Lazy Mapping Reader
+
+Reads single stores out of a large store_wall_mapping JSON file without
+decoding the whole fleet. On first use the file is scanned once and a
+sidecar offset index (<mapping>.idx) is written next to it, recording the
+byte range of every store. Later runs load the small index, memory-map the
+mapping and decode only the requested stores. The index is rebuilt
+automatically when the mapping file changes.
+
+Usage:
+    python mapping_reader.py --mapping store_wall_mapping_PROD-20251111-134645.json --build
+    python mapping_reader.py --mapping config/mappings/store_wall_mapping.json --store 1161
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+from json.decoder import scanstring
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Bump when the sidecar layout changes so old indexes are rebuilt
+INDEX_VERSION = 1
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def _unique_name(store_data: Any) -> Optional[str]:
+    """Store node unique-name, or None if the store lacks name/parent_node."""
+    # Imported here to keep this module loadable without the generator
+    from generate_store_config import store_unique_name
+    try:
+        return store_unique_name(store_data)
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+
+class LazyMappingReader:
+    """Memory-mapped mapping file with a sidecar store offset index."""
+
+    def __init__(self, mapping_file: str, index_file: Optional[str] = None):
+        self.mapping_file = Path(mapping_file)
+        self.index_file = Path(index_file) if index_file else Path(f"{mapping_file}.idx")
+        # top-level key (other than "stores") -> [start, end] byte range
+        self.sections: Dict[str, List[int]] = {}
+        # store ID -> [start, end, unique-name] (last occurrence wins, like json.load)
+        self.stores: Dict[str, List[Any]] = {}
+        self.duplicates: List[str] = []
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+
+    def __enter__(self) -> "LazyMappingReader":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """Load (or build) the index and memory-map the mapping file."""
+        if self._map is not None:
+            return
+        stat = self.mapping_file.stat()
+        if not self._load_index(stat):
+            self.build_index(stat)
+        if stat.st_size == 0:
+            raise ValueError(f"Mapping file '{self.mapping_file}' is empty")
+        self._file = open(self.mapping_file, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _load_index(self, stat: os.stat_result) -> bool:
+        """Load the sidecar index if it exists and matches the mapping file."""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (index.get("version") != INDEX_VERSION or index.get("source_size") != stat.st_size
+                or index.get("source_mtime_ns") != stat.st_mtime_ns):
+            return False
+        self.sections = index["sections"]
+        self.stores = index["stores"]
+        self.duplicates = index.get("duplicates", [])
+        return True
+
+    def build_index(self, stat: Optional[os.stat_result] = None) -> None:
+        """Scan the whole mapping once and write the sidecar index."""
+        stat = stat or self.mapping_file.stat()
+        data = self.mapping_file.read_bytes()
+        bom = 3 if data.startswith(b'\xef\xbb\xbf') else 0
+        text = data[bom:].decode('utf-8')
+        self._scan(text, bom)
+
+        index = {
+            "version": INDEX_VERSION,
+            "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns,
+            "sections": self.sections,
+            "stores": self.stores,
+            "duplicates": self.duplicates,
+        }
+        temp_file = self.index_file.with_name(self.index_file.name + ".tmp")
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file, self.index_file)
+            print(f"✓ Built mapping index for {len(self.stores)} stores: {self.index_file}")
+        except OSError as e:
+            # Read-only location: the index is still usable for this run
+            print(f"⚠️  Warning: Could not write mapping index '{self.index_file}': {e}")
+
+    def _scan(self, text: str, bom: int) -> None:
+        """Record byte ranges of the top-level sections and of each store."""
+        decoder = json.JSONDecoder()
+        self.sections, self.stores, self.duplicates = {}, {}, []
+
+        # Character positions only grow, so byte offsets are tracked incrementally
+        last_char, last_byte = 0, bom
+
+        def byte_offset(char_pos: int) -> int:
+            nonlocal last_char, last_byte
+            last_byte += len(text[last_char:char_pos].encode('utf-8'))
+            last_char = char_pos
+            return last_byte
+
+        def walk(pos: int, on_member: Callable[[str, int], int]) -> int:
+            """Call on_member(key, value_start) -> value_end for each member of the object at pos."""
+            pos = WHITESPACE.match(text, pos).end()
+            if text[pos:pos + 1] != '{':
+                raise ValueError(f"Expected a JSON object at character {pos}")
+            pos = WHITESPACE.match(text, pos + 1).end()
+            if text[pos:pos + 1] == '}':
+                return pos + 1
+            while True:
+                if text[pos:pos + 1] != '"':
+                    raise ValueError(f"Expected a property name at character {pos}")
+                key, pos = scanstring(text, pos + 1)
+                pos = WHITESPACE.match(text, pos).end()
+                if text[pos:pos + 1] != ':':
+                    raise ValueError(f"Expected ':' at character {pos}")
+                pos = on_member(key, WHITESPACE.match(text, pos + 1).end())
+                pos = WHITESPACE.match(text, pos).end()
+                if text[pos:pos + 1] == '}':
+                    return pos + 1
+                if text[pos:pos + 1] != ',':
+                    raise ValueError(f"Expected ',' or '}}' at character {pos}")
+                pos = WHITESPACE.match(text, pos + 1).end()
+
+        def on_store(store_id: str, start: int) -> int:
+            store_data, end = decoder.raw_decode(text, start)
+            if store_id in self.stores:
+                self.duplicates.append(store_id)
+            self.stores[store_id] = [byte_offset(start), byte_offset(end), _unique_name(store_data)]
+            return end
+
+        def on_section(key: str, start: int) -> int:
+            if key == "stores":
+                return walk(start, on_store)
+            _, end = decoder.raw_decode(text, start)
+            self.sections[key] = [byte_offset(start), byte_offset(end)]
+            return end
+
+        try:
+            walk(0, on_section)
+        except (json.JSONDecodeError, ValueError) as e:
+            raise ValueError(f"Invalid JSON in mapping file '{self.mapping_file}': {e}")
+
+    def _decode(self, span: List[Any]) -> Any:
+        if self._map is None:
+            self.open()
+        return json.loads(self._map[span[0]:span[1]].decode('utf-8'))
+
+    def store_ids(self) -> List[str]:
+        """All store IDs in the mapping, in file order."""
+        if self._map is None:
+            self.open()
+        return list(self.stores)
+
+    def unique_names(self) -> Dict[str, Optional[str]]:
+        """Store ID -> store node unique-name, without decoding any store."""
+        if self._map is None:
+            self.open()
+        return {store_id: entry[2] for store_id, entry in self.stores.items()}
+
+    def load_store(self, store_id: str) -> Optional[Dict[str, Any]]:
+        """Decode one store, or return None if it is not in the mapping."""
+        if self._map is None:
+            self.open()
+        entry = self.stores.get(store_id)
+        return self._decode(entry) if entry is not None else None
+
+    def load_mapping(self, store_ids: List[str]) -> Dict[str, Any]:
+        """
+        Return a mapping structure holding every top-level section but only
+        the given stores (unknown IDs are left out).
+        """
+        if self._map is None:
+            self.open()
+        mapping: Dict[str, Any] = {key: self._decode(span) for key, span in self.sections.items()}
+        mapping["stores"] = {store_id: self._decode(self.stores[store_id])
+                             for store_id in store_ids if store_id in self.stores}
+        return mapping
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Build or query the offset index of a store mapping file")
+    parser.add_argument("--mapping", type=str, default="config/mappings/store_wall_mapping.json",
+                       help="Store mapping file (default: config/mappings/store_wall_mapping.json)")
+    parser.add_argument("--build", action="store_true",
+                       help="Rebuild the sidecar index even if it is up to date")
+    parser.add_argument("--store", type=str, action="append", default=[],
+                       help="Print the mapping entry of a store (can be repeated)")
+
+    args = parser.parse_args()
+
+    try:
+        with LazyMappingReader(args.mapping) as reader:
+            if args.build:
+                reader.build_index()
+            for store_id in args.store:
+                store_data = reader.load_store(store_id)
+                if store_data is None:
+                    print(f"❌ Store {store_id} not found in mapping")
+                    sys.exit(1)
+                print(json.dumps({store_id: store_data}, indent=2, ensure_ascii=False))
+            if not args.store:
+                print(f"📊 {len(reader.stores)} stores indexed in {reader.index_file}")
+                if reader.duplicates:
+                    print(f"   ⚠️  Duplicate store IDs: {', '.join(reader.duplicates)}")
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Store Configuration Preview
+
+Renders a store's structure XML in memory, exactly as the generator would
+write it, and compares it with the file already in the output directory.
+Rendered previews are cached per store fingerprint (the store's mapping
+entry, its web-ui address and service cards, the mapping metadata and the
+template files), so selecting a store again, or a store whose inputs did
+not change after an edit elsewhere, is answered from the cache. Cache hits
+still run the fleet-wide unique-name and rsid collision check. Input files
+are reloaded only when their mtime or size changes.
+
+Usage:
+    python preview.py --store 1161
+    python preview.py --store 1161 --diff
+"""
+
+import argparse
+import contextlib
+import difflib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from generate_store_config import StoreConfigGenerator
+
+# Rendered previews kept in memory, least recently used dropped first
+CACHE_SIZE = 256
+
+
+class PreviewResult:
+    """A rendered store next to its current output file."""
+
+    def __init__(self, store_id: str, xml: str, output_file: Path, current: Optional[str], cached: bool):
+        self.store_id = store_id
+        self.xml = xml
+        self.output_file = output_file
+        self.cached = cached
+        # None if the store has not been generated yet
+        self.current = current
+        self.changed_lines: List[int] = []
+        self.removed = 0
+        if current is not None and current != xml:
+            self._compare(current.splitlines(), xml.splitlines())
+
+    def _compare(self, old: List[str], new: List[str]) -> None:
+        """Line numbers (1-based) of the preview that differ from the file, and lines only in the file."""
+        for tag, old_start, old_end, new_start, new_end in difflib.SequenceMatcher(None, old, new,
+                                                                                   autojunk=False).get_opcodes():
+            if tag in ("replace", "insert"):
+                self.changed_lines.extend(range(new_start + 1, new_end + 1))
+            if tag in ("replace", "delete"):
+                self.removed += old_end - old_start
+
+    @property
+    def up_to_date(self) -> bool:
+        return self.current == self.xml
+
+    def summary(self) -> str:
+        if self.current is None:
+            return f"Not generated yet: {self.output_file}"
+        if self.up_to_date:
+            return f"Same as {self.output_file}"
+        return (f"{len(self.changed_lines)} line(s) new or changed, {self.removed} line(s) removed "
+                f"compared to {self.output_file}")
+
+    def unified_diff(self) -> List[str]:
+        return list(difflib.unified_diff((self.current or "").splitlines(), self.xml.splitlines(),
+                                         str(self.output_file), f"store {self.store_id} (preview)",
+                                         lineterm=""))
+
+
+class StorePreview:
+    """In-memory rendering of single stores with a per-fingerprint cache."""
+
+    def __init__(self, mapping_file: str = "config/mappings/store_wall_mapping.json",
+                 template_file: str = "config/templates/template.xml",
+                 ip_mapping_file: str = "config/mappings/store_ip_mapping.properties",
+                 service_cards_file: str = "config/mappings/service_cards_mapping.json",
+                 webui_rule: Optional[str] = None):
+        self.generator = StoreConfigGenerator(mapping_file, template_file, ip_mapping_file, service_cards_file,
+                                              webui_rule=webui_rule)
+        self.stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        # store ID -> (fingerprint, rendered XML)
+        self.cache: Dict[str, Tuple[str, str]] = {}
+
+    def _stamp(self, path: str) -> Optional[Tuple[int, int]]:
+        """Return (mtime_ns, size) of a file, or None if it does not exist."""
+        try:
+            stat = Path(path).stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def refresh(self) -> None:
+        """Reload the inputs whose files changed since the last preview."""
+        generator = self.generator
+        files = {
+            "mapping": generator.mapping_file,
+            "template": generator.template_file,
+            "ip_mapping": generator.ip_mapping_file,
+            "service_cards": generator.service_cards_file,
+        }
+        if generator.store_mapping is not None:
+            for path in generator.template_files()[1:]:
+                files[f"template:{path}"] = path
+        stamps = {role: self._stamp(path) for role, path in files.items()}
+        changed = [role for role, stamp in stamps.items() if self.stamps.get(role) != stamp]
+        if not changed:
+            return
+
+        try:
+            if "mapping" in changed or generator.store_mapping is None:
+                generator.load_store_mapping()
+            if "template" in changed or generator.template_root is None:
+                generator.load_template()
+            for role in changed:
+                if role.startswith("template:"):
+                    generator.forget_template(files[role])
+            if "ip_mapping" in changed or generator.store_ip_mapping is None:
+                generator.load_store_ip_mapping()
+            if "service_cards" in changed or generator.service_cards_mapping is None:
+                generator.load_service_cards_mapping()
+        except SystemExit:
+            # The loaders report the problem and exit; a preview just fails
+            raise ValueError("Could not load the inputs (see console output)")
+        # Unique-names come from the mapping and the templates, so rebuild the index on the next check
+        generator.collision_index = None
+        self.stamps = stamps
+
+    def fingerprint(self, store_id: str) -> str:
+        """Everything the store's rendered XML depends on."""
+        generator = self.generator
+        store_data = generator.store_mapping["stores"][store_id]
+        return json.dumps([
+            store_data,
+            (generator.store_ip_mapping or {}).get(store_id),
+            (generator.service_cards_mapping or {}).get("stores", {}).get(store_id),
+            generator.store_mapping.get("metadata", {}),
+            generator.webui_rule,
+            sorted((role, stamp) for role, stamp in self.stamps.items() if role.startswith("template")),
+        ], sort_keys=True)
+
+    def render(self, store_id: str) -> Tuple[str, bool]:
+        """(XML, taken from the cache) for one store."""
+        self.refresh()
+        if store_id not in self.generator.store_mapping["stores"]:
+            raise ValueError(f"Store {store_id} not found in mapping")
+
+        fingerprint = self.fingerprint(store_id)
+        cached = self.cache.get(store_id)
+        if cached is not None and cached[0] == fingerprint:
+            # Collisions depend on the rest of the fleet, which the fingerprint does not cover
+            self.generator.check_collisions([store_id])
+            # Most recently used last
+            self.cache[store_id] = self.cache.pop(store_id)
+            return cached[1], True
+
+        xml = self.generator.generate_store_config(store_id)
+        self.cache.pop(store_id, None)
+        self.cache[store_id] = (fingerprint, xml)
+        while len(self.cache) > CACHE_SIZE:
+            del self.cache[next(iter(self.cache))]
+        return xml, False
+
+    def preview(self, store_id: str, output_dir: str = "output") -> PreviewResult:
+        """Render a store and compare it with its file in the output directory."""
+        xml, cached = self.render(store_id)
+        output_file = Path(output_dir) / f"store_{store_id}_config.xml"
+        try:
+            # Universal newlines, so a file written with CRLF on Windows compares equal
+            with open(output_file, 'r', encoding='utf-8') as f:
+                current: Optional[str] = f.read()
+        except OSError:
+            current = None
+        return PreviewResult(store_id, xml, output_file, current, cached)
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Preview a store's configuration without writing it")
+    parser.add_argument("--store", type=str, required=True,
+                       help="Store ID to preview")
+    parser.add_argument("--output", type=str, default="output",
+                       help="Output directory to compare with (default: output)")
+    parser.add_argument("--diff", action="store_true",
+                       help="Print a unified diff against the output file instead of the XML")
+    parser.add_argument("--mapping", type=str, default="config/mappings/store_wall_mapping.json",
+                       help="Store mapping JSON file")
+    parser.add_argument("--template", type=str, default="config/templates/template.xml",
+                       help="Template file")
+
+    args = parser.parse_args()
+
+    try:
+        # Generator progress goes to stderr so stdout holds only the XML or diff
+        with contextlib.redirect_stdout(sys.stderr):
+            result = StorePreview(args.mapping, args.template).preview(args.store, args.output)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    if args.diff:
+        for line in result.unified_diff():
+            print(line)
+    else:
+        print(result.xml, end="")
+    print(f"📊 {result.summary()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Full-File Renderer
+
+Renders complete wall-config.xml and web-ui-config.xml files per store from
+config/templates/, for test rigs and offline installs that need the real
+files rather than structure <change> overrides. Each template is compiled
+once into a plan of literal text and substitution slots (wall clientIds
+and wallTypes, wall type descriptions, the web-ui server address); per
+store the generator's own wall and web-ui changes are applied to the plan,
+so the files carry exactly the values the structure XML would set. Parts
+of the template that no change touches are copied unchanged.
+
+Usage:
+    python render_files.py --all
+    python render_files.py --store 1161 --output rendered
+    python render_files.py --stores 1161,1346 --workers 4
+"""
+
+import argparse
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape, unescape
+
+from generate_store_config import StoreConfigGenerator, parse_store_ids
+
+WALL_FILE = "wall-config.xml"
+WEBUI_FILE = "web-ui-config.xml"
+
+WALL_CLIENT_ID = re.compile(r"wall-config\.walls\.(?P<wall>[^.]+)\.clientId")
+WALL_TYPE = re.compile(r"wall-config\.walls\.(?P<wall>[^.]+)\.wallType")
+WALL_DESCRIPTION = re.compile(r"wall-config\.wall-types\.(?P<wall_type>.+)\.description")
+SERVER_ADDRESS_URL = "webUiConfig.system.serverAddress"
+
+WALL_TAG = re.compile(r"<wall(?=[\s>])[^>]*>")
+WALL_TYPE_TAG = re.compile(r"<wall-type(?=[\s/>])[^>]*>")
+CLIENT_ID = re.compile(r"<(?P<tag>clientId)(?:>(?P<value>[^<]*)</clientId>|\s*/>)")
+SERVER_ADDRESS = re.compile(r"<(?P<tag>serverAddress)(?:>(?P<value>[^<]*)</serverAddress>|\s*/>)")
+
+
+def attribute(tag_match: "re.Match", name: str) -> Optional[Tuple[int, int, str]]:
+    """Span and raw value of an attribute inside a matched start tag."""
+    match = re.search(r'\s' + re.escape(name) + r'="([^"]*)"', tag_match.group(0))
+    if match is None:
+        return None
+    offset = tag_match.start()
+    return offset + match.start(1), offset + match.end(1), match.group(1)
+
+
+def element_text(match: "re.Match", name: str) -> Tuple[int, int, str, str, Optional[str]]:
+    """
+    Slot for a matched element's text. An empty element (<clientId/>) has no
+    text position, so the slot covers the whole element and a filled value
+    is wrapped in start and end tags.
+    """
+    if match.group("value") is not None:
+        return match.start("value"), match.end("value"), name, match.group("value"), None
+    return match.start(), match.end(), name, match.group(0), match.group("tag")
+
+
+def line_start(text: str, position: int) -> int:
+    return text.rfind("\n", 0, position) + 1
+
+
+class TextPlan:
+    """
+    Template text compiled into alternating literal parts and slot names.
+    Slots are (start, end, name, default[, tag]); each defaults to the
+    template's own (escaped) text, and a slot with a tag wraps its value in
+    that element.
+    """
+
+    def __init__(self, text: str, slots: List[Tuple]):
+        self.parts: List[str] = []
+        self.defaults: Dict[str, str] = {}
+        self.wrappers: Dict[str, str] = {}
+        position = 0
+        for start, end, name, default, *tag in sorted(slots):
+            self.parts.append(text[position:start])
+            self.parts.append(name)
+            self.defaults[name] = default
+            if tag and tag[0]:
+                self.wrappers[name] = tag[0]
+            position = end
+        self.parts.append(text[position:])
+
+    def render(self, values: Dict[str, str], out: List[str]) -> None:
+        """Append the text with the given (already escaped) slot values to out."""
+        defaults, wrappers = self.defaults, self.wrappers
+        for position, part in enumerate(self.parts):
+            if not position % 2:
+                out.append(part)
+            elif part not in values:
+                out.append(defaults.get(part, ""))
+            elif part in wrappers:
+                out.append(f"<{wrappers[part]}>{values[part]}</{wrappers[part]}>")
+            else:
+                out.append(values[part])
+
+
+class WallConfigPlan:
+    """Compiled wall-config.xml template."""
+
+    def __init__(self, text: str):
+        slots: List[Tuple] = []
+        # wall ID -> default wallType; the first wall's block is the pattern for walls the template lacks
+        self.wall_types: Dict[str, str] = {}
+        self.wall_block: Optional[TextPlan] = None
+        # wall type name -> its definition line, the pattern for wall types the template lacks
+        self.type_lines: Dict[str, TextPlan] = {}
+
+        for tag in WALL_TAG.finditer(text):
+            wall_id, wall_type = attribute(tag, "wallId"), attribute(tag, "wallType")
+            close = text.find("</wall>", tag.end())
+            client = CLIENT_ID.search(text, tag.end(), close)
+            if wall_id is None or wall_type is None or close == -1 or client is None:
+                raise ValueError(f"Unsupported <wall> element in {WALL_FILE} template: {tag.group(0)}")
+            wall = unescape(wall_id[2])
+            self.wall_types[wall] = unescape(wall_type[2])
+            slots.append(wall_type[:2] + (f"wall:{wall}:wallType", wall_type[2]))
+            slots.append(element_text(client, f"wall:{wall}:clientId"))
+
+            if self.wall_block is None:
+                block_start, block_end = line_start(text, tag.start()), text.index("\n", close) + 1
+                client_slot = element_text(client, "clientId")
+                self.wall_block = TextPlan(text[block_start:block_end], [
+                    (wall_id[0] - block_start, wall_id[1] - block_start, "wallId", wall_id[2]),
+                    (wall_type[0] - block_start, wall_type[1] - block_start, "wallType", wall_type[2]),
+                    (client_slot[0] - block_start, client_slot[1] - block_start) + client_slot[2:],
+                ])
+
+        for tag in WALL_TYPE_TAG.finditer(text):
+            name, description = attribute(tag, "name"), attribute(tag, "description")
+            if name is None or description is None:
+                raise ValueError(f"Unsupported <wall-type> element in {WALL_FILE} template: {tag.group(0)}")
+            wall_type = unescape(name[2])
+            slots.append(description[:2] + (f"type:{wall_type}:description", description[2]))
+            type_start, type_end = line_start(text, tag.start()), text.index("\n", tag.end()) + 1
+            self.type_lines[wall_type] = TextPlan(text[type_start:type_end], [
+                (name[0] - type_start, name[1] - type_start, "name", name[2]),
+                (description[0] - type_start, description[1] - type_start, "description", description[2]),
+            ])
+
+        for closing, slot in (("</walls>", "extra_walls"), ("</wall-types>", "extra_types")):
+            position = text.find(closing)
+            if position == -1:
+                raise ValueError(f"{WALL_FILE} template has no {closing} element")
+            slots.append((line_start(text, position), line_start(text, position), slot, ""))
+
+        if self.wall_block is None or not self.type_lines:
+            raise ValueError(f"{WALL_FILE} template needs at least one <wall> and one <wall-type>")
+        self.plan = TextPlan(text, slots)
+
+    def render(self, walls: Dict[str, str], wall_types: Dict[str, str], descriptions: Dict[str, str]) -> str:
+        """
+        The file with the given clientIds, wallTypes and wall type descriptions
+        (wall ID / wall type -> unescaped value). Walls and wall types missing
+        from the template are added; a new wall type copies the definition of
+        the type the wall had in the template.
+        """
+        values: Dict[str, str] = {}
+        extra_walls: List[str] = []
+        effective_types = dict(self.wall_types)
+        effective_types.update(wall_types)
+        first_type = next(iter(self.type_lines))
+
+        for wall_id, client_id in walls.items():
+            if wall_id in self.wall_types:
+                values[f"wall:{wall_id}:clientId"] = escape(client_id)
+            else:
+                effective_types.setdefault(wall_id, self.wall_block.defaults["wallType"])
+                self.wall_block.render({"wallId": escape(wall_id, {'"': "&quot;"}),
+                                        "wallType": escape(effective_types[wall_id], {'"': "&quot;"}),
+                                        "clientId": escape(client_id)}, extra_walls)
+        for wall_id, wall_type in wall_types.items():
+            if wall_id in self.wall_types:
+                values[f"wall:{wall_id}:wallType"] = escape(wall_type, {'"': "&quot;"})
+
+        # Every wall type in use needs a definition
+        extra_types: List[str] = []
+        added = set()
+        for wall_id, wall_type in effective_types.items():
+            if wall_type in self.type_lines or wall_type in added:
+                continue
+            added.add(wall_type)
+            pattern = self.type_lines.get(self.wall_types.get(wall_id, ""), self.type_lines[first_type])
+            fields = {"name": escape(wall_type, {'"': "&quot;"})}
+            if wall_type in descriptions:
+                fields["description"] = escape(descriptions[wall_type], {'"': "&quot;"})
+            pattern.render(fields, extra_types)
+        for wall_type, description in descriptions.items():
+            if wall_type in self.type_lines:
+                values[f"type:{wall_type}:description"] = escape(description, {'"': "&quot;"})
+
+        values["extra_walls"] = "".join(extra_walls)
+        values["extra_types"] = "".join(extra_types)
+        out: List[str] = []
+        self.plan.render(values, out)
+        return "".join(out)
+
+
+class WebUiConfigPlan:
+    """Compiled web-ui-config.xml template."""
+
+    def __init__(self, text: str):
+        system = text.find("<system>")
+        match = SERVER_ADDRESS.search(text, system) if system != -1 else None
+        if match is None:
+            raise ValueError(f"{WEBUI_FILE} template has no <system><serverAddress> element")
+        self.plan = TextPlan(text, [element_text(match, "serverAddress")])
+
+    def render(self, server_address: Optional[str]) -> str:
+        """The file with the given server address (None keeps the template's)."""
+        values = {"serverAddress": escape(server_address)} if server_address is not None else {}
+        out: List[str] = []
+        self.plan.render(values, out)
+        return "".join(out)
+
+
+class StoreFileRenderer:
+    """Renders the full configuration files of stores with a generator's inputs."""
+
+    def __init__(self, generator: StoreConfigGenerator, templates_dir: str = "config/templates"):
+        self.generator = generator
+        self.templates_dir = Path(templates_dir)
+        self.wall_plan = WallConfigPlan(self._read(WALL_FILE))
+        self.webui_plan = WebUiConfigPlan(self._read(WEBUI_FILE))
+
+    def _read(self, file_name: str) -> str:
+        # newline='' keeps the template's line endings byte for byte
+        with open(self.templates_dir / file_name, 'r', encoding='utf-8-sig', newline='') as f:
+            return f.read()
+
+    def render_store(self, store_id: str) -> Dict[str, str]:
+        """File name -> content for one store, built from its wall and web-ui changes."""
+        generator = self.generator
+        store_data = generator.store_mapping["stores"][store_id]
+        changes = generator.generate_wall_changes(store_id, store_data)
+        changes += generator.generate_wall_type_description_changes(store_id, store_data)
+        changes += generator.generate_webui_changes(store_id, store_data)
+
+        walls: Dict[str, str] = {}
+        wall_types: Dict[str, str] = {}
+        descriptions: Dict[str, str] = {}
+        server_address: Optional[str] = None
+        for change in changes:
+            url, value = change.get("url", ""), change.get("value", "")
+            match = WALL_CLIENT_ID.fullmatch(url)
+            if match:
+                walls[match.group("wall")] = value
+                continue
+            match = WALL_TYPE.fullmatch(url)
+            if match:
+                wall_types[match.group("wall")] = value
+                continue
+            match = WALL_DESCRIPTION.fullmatch(url)
+            if match:
+                descriptions[match.group("wall_type")] = value
+                continue
+            if url == SERVER_ADDRESS_URL:
+                server_address = value
+
+        return {
+            WALL_FILE: self.wall_plan.render(walls, wall_types, descriptions),
+            WEBUI_FILE: self.webui_plan.render(server_address),
+        }
+
+    def write_store(self, store_id: str, output_dir: str = "output/files") -> List[str]:
+        """Write a store's files into <output_dir>/<store_id>/ and return them."""
+        store_dir = Path(output_dir) / store_id
+        store_dir.mkdir(parents=True, exist_ok=True)
+        written: List[str] = []
+        for file_name, content in self.render_store(store_id).items():
+            output_file = store_dir / file_name
+            with open(output_file, 'w', encoding='utf-8', newline='') as f:
+                f.write(content)
+            written.append(str(output_file))
+        return written
+
+    def iter_store_files(self, store_ids: List[str], output_dir: str = "output/files",
+                         workers: int = 1) -> Iterator[Tuple[str, Optional[List[str]], Optional[str]]]:
+        """
+        Render and write the given stores, yielding (store_id, files, error) as
+        each one completes. Stores with skip_wdm get no files. With workers > 1
+        stores are rendered on a thread pool.
+        """
+        generator = self.generator
+        generator.load_all_inputs()
+        # Stores with pre-flight errors are held back
+        store_ids = [store_id for store_id in generator.preflight_passed(store_ids)
+                     if not generator.store_mapping["stores"][store_id].get("skip_wdm", False)]
+
+        if workers <= 1:
+            for store_id in store_ids:
+                try:
+                    yield store_id, self.write_store(store_id, output_dir), None
+                except Exception as e:
+                    yield store_id, None, str(e)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.write_store, store_id, output_dir): store_id for store_id in store_ids}
+            for future in as_completed(futures):
+                store_id = futures[future]
+                try:
+                    yield store_id, future.result(), None
+                except Exception as e:
+                    yield store_id, None, str(e)
+
+    def render_stores(self, store_ids: List[str], output_dir: str = "output/files", workers: int = 1) -> List[str]:
+        """Render the given stores and return the files written."""
+        written: List[str] = []
+        rendered = 0
+        for store_id, files, error in self.iter_store_files(store_ids, output_dir, workers):
+            if files:
+                rendered += 1
+                written.extend(files)
+                print(f"✓ Rendered store {store_id}: {Path(files[0]).parent}")
+            else:
+                print(f"❌ Failed to render files for store {store_id}: {error}")
+        print(f"\n✓ Rendered full configuration files for {rendered} store(s) into {output_dir}")
+        return written
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Render full wall-config.xml and web-ui-config.xml files per store",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python render_files.py --all
+  python render_files.py --store 1161 --output rendered
+  python render_files.py --stores 1161,1346 --workers 4
+        """
+    )
+    parser.add_argument("--all", action="store_true",
+                       help="Render files for all stores in the mapping")
+    parser.add_argument("--store", type=str,
+                       help="Render files for a specific store ID")
+    parser.add_argument("--stores", type=str,
+                       help="Comma-separated list of store IDs")
+    parser.add_argument("--output", type=str, default="output/files",
+                       help="Output directory; each store gets a subdirectory (default: output/files)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Number of stores rendered in parallel (default: 1)")
+    parser.add_argument("--templates", type=str, default="config/templates",
+                       help="Directory with wall-config.xml and web-ui-config.xml (default: config/templates)")
+    parser.add_argument("--mapping", type=str, default="config/mappings/store_wall_mapping.json",
+                       help="Store mapping JSON file")
+    parser.add_argument("--ip-mapping", type=str, default="config/mappings/store_ip_mapping.properties",
+                       help="Store IP mapping properties file")
+    parser.add_argument("--derive-webui", type=str, nargs="?", const="wall:1", metavar="RULE",
+                       help="Derive the web-ui address for stores missing from the IP mapping")
+
+    args = parser.parse_args()
+
+    if not args.all and not args.store and not args.stores:
+        parser.print_help()
+        sys.exit(1)
+
+    try:
+        generator = StoreConfigGenerator(args.mapping, ip_mapping_file=args.ip_mapping, webui_rule=args.derive_webui)
+        renderer = StoreFileRenderer(generator, args.templates)
+        if args.all:
+            store_ids = list(generator.load_store_mapping()["stores"])
+        else:
+            store_ids = parse_store_ids(args.stores) if args.stores else [args.store]
+            generator.load_store_mapping()
+            missing = [store_id for store_id in store_ids if store_id not in generator.store_mapping["stores"]]
+            if missing:
+                raise ValueError(f"Store(s) not found in mapping: {', '.join(missing)}")
+        renderer.render_stores(store_ids, args.output, args.workers)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
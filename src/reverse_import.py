@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Reverse Import
+
+Rebuilds store_wall_mapping.json, store_ip_mapping.properties and
+service_cards_mapping.json entries from deployed structure XML files
+(separate store files and/or combined files). Files are scanned in
+parallel streaming passes: each GKR-Store node is read from its CSE-wdm
+changes and released before the next one is parsed. The imported stores
+are merged into the current mappings and every disagreement is reported,
+so the fleet can be reconciled without hand-editing entries.
+
+Usage:
+    python reverse_import.py output
+    python reverse_import.py deployed/all_stores_config.xml --output imported --report conflicts.json
+    python reverse_import.py deployed --workers 8 --prefer-xml
+"""
+
+import argparse
+import json
+import re
+import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from generate_store_config import StoreIpTable
+
+WALL_CLIENT_ID = re.compile(r"wall-config\.walls\.(?P<wall>[^.]+)\.clientId")
+WALL_TYPE = re.compile(r"wall-config\.walls\.(?P<wall>[^.]+)\.wallType")
+WALL_DESCRIPTION = re.compile(r"wall-config\.wall-types\.(?P<wall_type>.+)\.description")
+SERVICE_CARD = re.compile(r"service-cards-config\.service-cards\.service-card(?::(?P<position>\d+))?")
+SERVER_ADDRESS = re.compile(r"http://(?P<ip>[^:/]+):8080/app-wdm.*")
+
+# Mapping entry fields compared against the current mapping, in entry order
+STORE_FIELDS = ("name", "country", "parent_node")
+
+
+def wall_id_for(wall_type: str) -> str:
+    """Inverse of wall_type_for: WALL_TYPE_DISPOSAL -> 100, WALL_TYPE_<id> -> <id>."""
+    if wall_type == "WALL_TYPE_DISPOSAL":
+        return "100"
+    return wall_type[len("WALL_TYPE_"):] if wall_type.startswith("WALL_TYPE_") else wall_type
+
+
+def read_store(store_node: ET.Element) -> Dict[str, Any]:
+    """
+    Reconstruct one store from its node: the mapping entry, the web-ui IP,
+    the wallType values, the service cards and problems found while reading.
+    """
+    store_id = store_node.get("rsid", "")
+    walls: Dict[str, str] = {}
+    wall_types: Dict[str, str] = {}
+    descriptions: Dict[str, str] = {}
+    cards: List[Tuple[int, str]] = []
+    webui_ip: Optional[str] = None
+    business_unit_id: Optional[str] = None
+    problems: List[str] = []
+
+    for change in store_node.iter("change"):
+        url, value = change.get("url", ""), change.get("value", "")
+        file_name = change.get("file")
+        if file_name == "wall-config.xml":
+            match = WALL_CLIENT_ID.fullmatch(url)
+            if match:
+                walls[match.group("wall")] = value
+                continue
+            match = WALL_TYPE.fullmatch(url)
+            if match:
+                wall_types[match.group("wall")] = value
+                continue
+            match = WALL_DESCRIPTION.fullmatch(url)
+            if match:
+                descriptions[wall_id_for(match.group("wall_type"))] = value
+                continue
+        elif file_name == "web-ui-config.xml" and url == "webUiConfig.system.serverAddress":
+            match = SERVER_ADDRESS.fullmatch(value)
+            if match:
+                webui_ip = match.group("ip")
+                continue
+        elif file_name == "service-cards.xml":
+            match = SERVICE_CARD.fullmatch(url)
+            if match:
+                cards.append((int(match.group("position") or 1), value))
+                continue
+        elif file_name == "wdm-config.properties" and url == "remote-services.businessUnitId":
+            business_unit_id = value
+            continue
+        problems.append(f"Unrecognized change {file_name}:{url}")
+
+    if business_unit_id is not None and business_unit_id != store_id:
+        problems.append(f"businessUnitId {business_unit_id} does not match rsid {store_id}")
+
+    # skip_wdm stores carry no wall or web-ui changes at all
+    entry: Dict[str, Any] = {
+        "name": store_node.get("name", ""),
+        "country": store_node.get("country", ""),
+        "parent_node": store_node.get("parent-node-ident", ""),
+    }
+    if not walls and webui_ip is None:
+        entry["skip_wdm"] = True
+    entry["walls"] = walls
+    # A wallType change means the wall had a (possibly empty) description entry
+    described = {wall_id: descriptions.get(wall_id, "") for wall_id in wall_types}
+    described.update(descriptions)
+    if described:
+        entry["wall_type_descriptions"] = described
+
+    return {
+        "entry": entry,
+        "ip": webui_ip,
+        "wall_types": wall_types,
+        "cards": [card for _, card in sorted(cards, key=lambda item: item[0])],
+        "problems": problems,
+    }
+
+
+def scan_file(path: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """Stream one structure file and return (rsid, imported store) in file order."""
+    stores: List[Tuple[str, Dict[str, Any]]] = []
+    parents: List[ET.Element] = []
+    try:
+        for event, element in ET.iterparse(path, events=("start", "end")):
+            if event == "start":
+                parents.append(element)
+                continue
+            parents.pop()
+            if element.tag == "node" and element.get("alias") == "GKR-Store":
+                if element.get("rsid"):
+                    stores.append((element.get("rsid"), read_store(element)))
+                # Release the store before parsing the next one
+                if parents:
+                    parents[-1].remove(element)
+    except ET.ParseError as e:
+        raise ValueError(f"XML parsing error in '{path}': {e}")
+    return stores
+
+
+def collect_files(sources: List[str]) -> List[str]:
+    """Expand directories to their XML files (sorted); files are taken as given."""
+    files: List[str] = []
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            files += [str(xml_file) for xml_file in sorted(path.glob("*.xml"))]
+        elif path.exists():
+            files.append(str(path))
+        else:
+            raise ValueError(f"Source not found: {source}")
+    return files
+
+
+class ReverseImporter:
+    """Imports stores from structure XML and reconciles them with the current mappings."""
+
+    def __init__(self, mapping_file: str = "config/mappings/store_wall_mapping.json",
+                 ip_mapping_file: str = "config/mappings/store_ip_mapping.properties",
+                 service_cards_file: str = "config/mappings/service_cards_mapping.json"):
+        self.mapping = self._load_json(mapping_file) or {"metadata": {
+            "description": "Store to wall IP address mapping for WDM configuration",
+            "version": "1.0", "mandatory_walls": [1]}, "stores": {}}
+        self.service_cards = self._load_json(service_cards_file) or {"metadata": {
+            "description": "Store to service card mapping for WDM configuration", "version": "1.0"}, "stores": {}}
+        try:
+            self.ip_mapping: Dict[str, str] = dict(StoreIpTable.load(ip_mapping_file).entries)
+        except FileNotFoundError:
+            self.ip_mapping = {}
+        # rsid -> imported store (first source wins) and the file it came from
+        self.stores: Dict[str, Dict[str, Any]] = {}
+        self.sources: Dict[str, str] = {}
+        self.conflicts: List[Dict[str, Any]] = []
+        self.problems: List[str] = []
+
+    @staticmethod
+    def _load_json(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in '{path}': {e}")
+        if not isinstance(data, dict) or not isinstance(data.get("stores"), dict):
+            raise ValueError(f"'{path}' has no 'stores' object")
+        return data
+
+    def scan(self, files: List[str], workers: int = 1) -> None:
+        """Import every store of the given files, one streaming pass per file."""
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            # map() keeps file order, so the first file listing a store wins deterministically
+            for path, stores in zip(files, executor.map(scan_file, files)):
+                for store_id, imported in stores:
+                    self.problems += [f"Store {store_id} ({path}): {problem}" for problem in imported["problems"]]
+                    if store_id not in self.stores:
+                        self.stores[store_id] = imported
+                        self.sources[store_id] = path
+                    elif self._comparable(self.stores[store_id]) != self._comparable(imported):
+                        self.problems.append(f"Store {store_id} differs between {self.sources[store_id]} and {path}; "
+                                             f"keeping {self.sources[store_id]}")
+        self._find_conflicts()
+
+    @staticmethod
+    def _comparable(imported: Dict[str, Any]) -> Tuple[str, Any, Any]:
+        return json.dumps(imported["entry"], sort_keys=True), imported["ip"], imported["cards"]
+
+    def _conflict(self, store_id: str, field: str, current: Any, imported: Any) -> None:
+        self.conflicts.append({"store": store_id, "field": field, "current": current, "imported": imported,
+                               "source": self.sources[store_id]})
+
+    def _find_conflicts(self) -> None:
+        """Compare each imported store with the current mappings, field by field."""
+        self.conflicts = []
+        current_stores = self.mapping["stores"]
+        current_cards = self.service_cards["stores"]
+        for store_id, imported in self.stores.items():
+            entry = imported["entry"]
+            current = current_stores.get(store_id)
+            if current is not None:
+                for field in STORE_FIELDS:
+                    if current.get(field) != entry[field]:
+                        self._conflict(store_id, field, current.get(field), entry[field])
+                if bool(current.get("skip_wdm")) != bool(entry.get("skip_wdm")):
+                    self._conflict(store_id, "skip_wdm", bool(current.get("skip_wdm")), bool(entry.get("skip_wdm")))
+                elif not entry.get("skip_wdm"):
+                    current_walls = current.get("walls") or {}
+                    for wall_id in list(current_walls) + [w for w in entry["walls"] if w not in current_walls]:
+                        if current_walls.get(wall_id) != entry["walls"].get(wall_id):
+                            self._conflict(store_id, f"walls.{wall_id}", current_walls.get(wall_id),
+                                           entry["walls"].get(wall_id))
+                    current_descriptions = current.get("wall_type_descriptions") or {}
+                    imported_descriptions = entry.get("wall_type_descriptions", {})
+                    for wall_id in sorted(set(current_descriptions) | set(imported_descriptions)):
+                        # Descriptions of unused walls are never generated, so they cannot be compared
+                        if wall_id not in entry["walls"]:
+                            continue
+                        if (current_descriptions.get(wall_id) or "") != (imported_descriptions.get(wall_id) or ""):
+                            self._conflict(store_id, f"wall_type_descriptions.{wall_id}",
+                                           current_descriptions.get(wall_id), imported_descriptions.get(wall_id))
+
+            if imported["ip"] is not None and store_id in self.ip_mapping and self.ip_mapping[store_id] != imported["ip"]:
+                self._conflict(store_id, "ip_mapping", self.ip_mapping[store_id], imported["ip"])
+
+            if store_id in current_cards and current_cards[store_id].get("cards", []) != imported["cards"]:
+                self._conflict(store_id, "cards", current_cards[store_id].get("cards", []), imported["cards"])
+
+        # The same wall IP imported for two stores is a conflict in the fleet itself
+        owners: Dict[str, str] = {}
+        for store_id, imported in self.stores.items():
+            for wall_id, ip_address in imported["entry"]["walls"].items():
+                other = owners.setdefault(ip_address, f"{store_id}/{wall_id}")
+                if other != f"{store_id}/{wall_id}":
+                    self.problems.append(f"IP {ip_address} imported for wall {other} and wall {store_id}/{wall_id}")
+
+    def merged(self, prefer_xml: bool = False) -> Tuple[Dict[str, Any], Dict[str, str], Dict[str, Any]]:
+        """
+        Return (store mapping, IP mapping, service cards mapping) with the
+        imported stores merged in. New stores are added; for stores already
+        mapped, the current values are kept unless prefer_xml is set.
+        """
+        mapping = {"metadata": dict(self.mapping.get("metadata", {})), "stores": dict(self.mapping["stores"])}
+        ip_mapping = dict(self.ip_mapping)
+        cards = {"metadata": dict(self.service_cards.get("metadata", {})),
+                 "stores": dict(self.service_cards["stores"])}
+
+        for store_id, imported in self.stores.items():
+            current = mapping["stores"].get(store_id)
+            if current is None:
+                mapping["stores"][store_id] = imported["entry"]
+            elif prefer_xml:
+                merged_entry = dict(current)
+                merged_entry.update(imported["entry"])
+                if not imported["entry"].get("skip_wdm"):
+                    merged_entry.pop("skip_wdm", None)
+                if imported["entry"].get("skip_wdm"):
+                    # Walls of skip_wdm stores are not in the XML; keep the known ones
+                    merged_entry["walls"] = current.get("walls", {})
+                mapping["stores"][store_id] = merged_entry
+
+            if imported["ip"] is not None and (prefer_xml or store_id not in ip_mapping):
+                ip_mapping[store_id] = imported["ip"]
+
+            if imported["cards"] and (prefer_xml or store_id not in cards["stores"]):
+                cards["stores"][store_id] = {"cards": imported["cards"], "card_count": len(imported["cards"])}
+
+        cards["metadata"]["total_stores"] = len(cards["stores"])
+        cards["metadata"]["total_cards"] = sum(len(store["cards"]) for store in cards["stores"].values())
+        return mapping, ip_mapping, cards
+
+    def write(self, output_dir: str, prefer_xml: bool = False, source_label: str = "") -> List[str]:
+        """Write the merged mappings into output_dir and return the files written."""
+        mapping, ip_mapping, cards = self.merged(prefer_xml)
+        if source_label and not self.service_cards["stores"]:
+            cards["metadata"]["source"] = source_label
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+
+        files = [out / "store_wall_mapping.json", out / "store_ip_mapping.properties",
+                 out / "service_cards_mapping.json"]
+        with open(files[0], 'w', encoding='utf-8') as f:
+            json.dump(mapping, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        with open(files[1], 'w', encoding='utf-8') as f:
+            f.write("# Store IP Mapping Properties File\n")
+            f.write("# Format: StoreID:IPAddress\n")
+            f.write(f"# Rebuilt by reverse_import.py{' from ' + source_label if source_label else ''}\n\n")
+            for store_id, ip_address in ip_mapping.items():
+                f.write(f"{store_id}:{ip_address}\n")
+        with open(files[2], 'w', encoding='utf-8') as f:
+            json.dump(cards, f, indent=2, ensure_ascii=False)
+        return [str(path) for path in files]
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(
+        description="Rebuild the mapping files from deployed structure XML and report conflicts",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python reverse_import.py output
+  python reverse_import.py deployed/all_stores_config.xml --output imported --report conflicts.json
+  python reverse_import.py deployed --workers 8 --prefer-xml
+        """
+    )
+
+    parser.add_argument("sources", nargs="+", help="Structure XML files and/or directories of them")
+    parser.add_argument("--output", type=str, default="imported",
+                       help="Directory for the rebuilt mapping files (default: imported)")
+    parser.add_argument("--workers", type=int, default=4,
+                       help="Number of files scanned in parallel (default: 4)")
+    parser.add_argument("--prefer-xml", action="store_true",
+                       help="For stores already mapped, take the XML values instead of keeping the current ones")
+    parser.add_argument("--report", type=str, metavar="FILE",
+                       help="Write conflicts and problems as JSON ('-' for stdout)")
+    parser.add_argument("--mapping", type=str, default="config/mappings/store_wall_mapping.json",
+                       help="Current store mapping (default: config/mappings/store_wall_mapping.json)")
+    parser.add_argument("--ip-mapping", type=str, default="config/mappings/store_ip_mapping.properties",
+                       help="Current IP mapping (default: config/mappings/store_ip_mapping.properties)")
+    parser.add_argument("--service-cards", type=str, default="config/mappings/service_cards_mapping.json",
+                       help="Current service cards mapping (default: config/mappings/service_cards_mapping.json)")
+
+    args = parser.parse_args()
+
+    try:
+        importer = ReverseImporter(args.mapping, args.ip_mapping, args.service_cards)
+        files = collect_files(args.sources)
+        print(f"🔍 Scanning {len(files)} file(s)...")
+        importer.scan(files, args.workers)
+        written = importer.write(args.output, args.prefer_xml, ", ".join(args.sources))
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    new_stores = [store_id for store_id in importer.stores if store_id not in importer.mapping["stores"]]
+    if importer.conflicts:
+        print(f"\n⚠️  {len(importer.conflicts)} conflict(s) with the current mappings:")
+        for conflict in importer.conflicts:
+            print(f"   Store {conflict['store']} {conflict['field']}: "
+                  f"current {json.dumps(conflict['current'], ensure_ascii=False)}, "
+                  f"XML {json.dumps(conflict['imported'], ensure_ascii=False)}")
+    if importer.problems:
+        print(f"\n🚨 {len(importer.problems)} problem(s) in the XML:")
+        for problem in importer.problems:
+            print(f"   {problem}")
+
+    if args.report:
+        report = json.dumps({"conflicts": importer.conflicts, "problems": importer.problems, "new_stores": new_stores},
+                            indent=2, ensure_ascii=False) + "\n"
+        if args.report == "-":
+            sys.stdout.write(report)
+        else:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                f.write(report)
+
+    print(f"\n📊 Reverse Import Summary:")
+    print(f"   🏪 Stores imported: {len(importer.stores)} ({len(new_stores)} new)")
+    print(f"   ⚠️  Conflicts: {len(importer.conflicts)} ({'XML values taken' if args.prefer_xml else 'current values kept'})")
+    print(f"   🚨 Problems: {len(importer.problems)}")
+    for path in written:
+        print(f"   📁 {path}")
+
+    if importer.conflicts:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Service Card Index
+
+Hash-based index over service card assignments, built in a single
+O(total cards) pass. It finds cards listed twice for the same store,
+admin cards assigned to several stores, and card numbers that are not
+numeric. Used by the generator at load time and by the validator across
+a whole output directory.
+
+Usage:
+    python service_card_index.py
+    python service_card_index.py --file config/mappings/service_cards_mapping.json
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class ServiceCardIndex:
+    """Index of card number -> owning stores, with per-store problems."""
+
+    def __init__(self):
+        # card number -> store IDs using it, in first-seen order
+        self.card_owners: Dict[str, List[str]] = {}
+        # (store_id, card, occurrences) for cards listed more than once in one store
+        self.duplicates: List[Tuple[str, str, int]] = []
+        # (store_id, card) for card numbers that are not numeric
+        self.malformed: List[Tuple[str, str]] = []
+        # store ID -> its distinct valid cards, and its card errors
+        self.store_cards: Dict[str, List[str]] = {}
+        self.store_errors: Dict[str, List[str]] = {}
+        self.total_cards = 0
+
+    @classmethod
+    def from_mapping(cls, mapping: Dict[str, Any]) -> "ServiceCardIndex":
+        """Build the index from a service_cards_mapping.json structure."""
+        index = cls()
+        for store_id, store_data in mapping.get("stores", {}).items():
+            index.add_store(store_id, store_data.get("cards", []))
+        return index
+
+    def add_store(self, store_id: str, cards: Iterable[Any]) -> List[str]:
+        """
+        Add one store's card list and return the problems found in it.
+
+        Adding the same store again (e.g. from a separate and a combined
+        file) does not count as cross-store reuse.
+        """
+        problems: List[str] = []
+        store_cards = self.store_cards.setdefault(store_id, [])
+        counts: Dict[str, int] = {}
+        for card in cards:
+            card = "" if card is None else str(card)
+            counts[card] = counts.get(card, 0) + 1
+
+        for card, count in counts.items():
+            self.total_cards += count
+            if not card.isascii() or not card.isdigit():
+                self.malformed.append((store_id, card))
+                problems.append(f"Invalid service card number '{card}' for store {store_id}")
+                continue
+            if count > 1:
+                self.duplicates.append((store_id, card, count))
+                problems.append(f"Service card {card} listed {count} times for store {store_id}")
+            owners = self.card_owners.setdefault(card, [])
+            if store_id not in owners:
+                owners.append(store_id)
+                store_cards.append(card)
+
+        self.store_errors.setdefault(store_id, []).extend(problems)
+        return problems
+
+    def shared_cards(self) -> Dict[str, List[str]]:
+        """Return cards assigned to more than one store."""
+        return {card: owners for card, owners in self.card_owners.items() if len(owners) > 1}
+
+    def store_problems(self, store_id: str) -> Tuple[List[str], List[str]]:
+        """Return (errors, warnings) concerning a single store."""
+        warnings: List[str] = []
+        for card in self.store_cards.get(store_id, []):
+            owners = self.card_owners[card]
+            if len(owners) > 1:
+                others = ", ".join(owner for owner in owners if owner != store_id)
+                warnings.append(f"Service card {card} is also assigned to store(s) {others}")
+        return list(self.store_errors.get(store_id, [])), warnings
+
+    def summary_lines(self) -> List[str]:
+        """Return one line per problem, for printing."""
+        lines = [f"Invalid service card number '{card}' for store {store_id}" for store_id, card in self.malformed]
+        lines += [f"Service card {card} listed {count} times for store {store_id}"
+                  for store_id, card, count in self.duplicates]
+        lines += [f"Service card {card} assigned to {len(owners)} stores: {', '.join(owners)}"
+                  for card, owners in self.shared_cards().items()]
+        return lines
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Check service card assignments for duplicates and conflicts")
+    parser.add_argument("--file", type=str, default="config/mappings/service_cards_mapping.json",
+                       help="Service cards mapping file (default: config/mappings/service_cards_mapping.json)")
+
+    args = parser.parse_args()
+
+    try:
+        with open(args.file, 'r', encoding='utf-8-sig') as f:
+            mapping = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"❌ Error reading service cards mapping: {e}")
+        sys.exit(1)
+
+    index = ServiceCardIndex.from_mapping(mapping)
+    for line in index.summary_lines():
+        print(f"   ⚠️  {line}")
+
+    print(f"\n📊 Service Card Summary:")
+    print(f"   💳 Cards: {index.total_cards} ({len(index.card_owners)} distinct)")
+    print(f"   🔁 Duplicates within a store: {len(index.duplicates)}")
+    print(f"   🏪 Cards shared by several stores: {len(index.shared_cards())}")
+    print(f"   🚨 Malformed card numbers: {len(index.malformed)}")
+
+    if index.malformed or index.duplicates:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Combined Configuration Splitter
+
+Splits a combined all_stores_config.xml back into per-store
+store_<id>_config.xml files in a single streaming pass. The file is read
+with iterparse: the shared systems/time-regimes/central-is header is
+serialized once, and each GKR-Store node is written out and released as
+soon as it has been parsed, so memory stays bounded by one store. Writes
+can optionally be spread across a worker pool.
+
+Usage:
+    python split_combined.py --file output/all_stores_config.xml
+    python split_combined.py --file received/all_stores_config.xml --output split --workers 4 --validate
+"""
+
+import argparse
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from xml.dom import minidom
+
+from validate_config import ConfigValidator
+
+HEADER_SECTIONS = ("systems", "time-regimes", "central-is")
+
+
+def format_xml(element: ET.Element) -> str:
+    """Same indentation as StoreConfigGenerator.format_xml, without the XML declaration."""
+    return minidom.parseString(ET.tostring(element, encoding='unicode')).toprettyxml(indent="    ")[23:]
+
+
+def strip_indentation(element: ET.Element) -> None:
+    """Drop whitespace-only text and tails left by the pretty-printed input."""
+    for child in element.iter():
+        if child.text is not None and not child.text.strip():
+            child.text = None
+        if child.tail is not None and not child.tail.strip():
+            child.tail = None
+
+
+class CombinedConfigSplitter:
+    """Streams a combined configuration into one file per store."""
+
+    def __init__(self, output_dir: str = "output", workers: int = 1,
+                 validator: Optional[ConfigValidator] = None):
+        self.output_dir = output_dir
+        self.workers = workers
+        self.validator = validator
+        self.written: List[str] = []
+        self.skipped: List[str] = []
+        self.results: List[Dict[str, Any]] = []
+        self._header: Optional[str] = None
+        self._footer = "    </nodes>\n</structure>\n"
+        self._sections: List[ET.Element] = []
+
+    def _compile_header(self, root: ET.Element) -> None:
+        """Serialize the shared sections once, up to and including the opening <nodes> tag."""
+        self._sections = [root.find(section) for section in HEADER_SECTIONS]
+        missing = [name for name, section in zip(HEADER_SECTIONS, self._sections) if section is None]
+        if missing:
+            raise ValueError(f"Section(s) {', '.join(missing)} must come before <nodes>")
+        for section in self._sections:
+            strip_indentation(section)
+        skeleton = ET.Element("structure")
+        skeleton.extend(self._sections)
+        ET.SubElement(ET.SubElement(skeleton, "nodes"), "node")
+        text = format_xml(skeleton)
+        self._header = '<?xml version="1.0" encoding="UTF-8"?>\n' + text[:text.index("        <node")]
+
+    def _store_text(self, store_node: ET.Element) -> str:
+        """The store's node formatted at its depth below <structure><nodes>."""
+        wrapper = ET.Element("structure")
+        ET.SubElement(wrapper, "nodes").append(store_node)
+        text = format_xml(wrapper)
+        return text[text.index("<nodes>\n") + len("<nodes>\n"):text.rindex("    </nodes>")]
+
+    def _write(self, output_file: str, content: str) -> str:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return output_file
+
+    def _validate(self, rsid: str, store_node: ET.Element) -> None:
+        structure = ET.Element("structure")
+        structure.extend(self._sections)
+        ET.SubElement(structure, "nodes").append(store_node)
+        self.results.append(self.validator.validate_element(structure, f"store {rsid}"))
+
+    def split(self, combined_file: str) -> List[str]:
+        """Split the combined file and return the files written, in file order."""
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        self.written, self.skipped, self.results = [], [], []
+
+        # At most two stores per worker are in flight, keeping memory bounded
+        slots = threading.BoundedSemaphore(max(1, self.workers) * 2)
+        pending: List[Tuple[str, Future]] = []
+        executor = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+        def submit(rsid: str, output_file: str, content: str) -> None:
+            if executor is None:
+                self.written.append(self._write(output_file, content))
+                print(f"✓ Wrote store {rsid}: {output_file}")
+                return
+            slots.acquire()
+            future = executor.submit(self._write, output_file, content)
+            future.add_done_callback(lambda _: slots.release())
+            pending.append((rsid, future))
+
+        try:
+            root: Optional[ET.Element] = None
+            nodes: Optional[ET.Element] = None
+            depth = 0
+            for event, element in ET.iterparse(combined_file, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 1:
+                        root = element
+                        if root.tag != "structure":
+                            raise ValueError(f"Root element should be 'structure', found '{root.tag}'")
+                    elif depth == 2 and element.tag == "nodes":
+                        nodes = element
+                        self._compile_header(root)
+                    continue
+
+                depth -= 1
+                # Only direct children of <nodes> are stores; everything deeper belongs to one
+                if depth != 2 or nodes is None or element.tag != "node":
+                    continue
+                nodes.remove(element)
+                rsid = element.get("rsid")
+                if element.get("alias") != "GKR-Store" or not rsid:
+                    self.skipped.append(element.get("unique-name") or element.get("alias") or "?")
+                    continue
+                strip_indentation(element)
+                if self.validator is not None:
+                    self._validate(rsid, element)
+                content = self._header + self._store_text(element) + self._footer
+                submit(rsid, f"{self.output_dir}/store_{rsid}_config.xml", content)
+        except ET.ParseError as e:
+            raise ValueError(f"XML parsing error in '{combined_file}': {e}")
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        for rsid, future in pending:
+            self.written.append(future.result())
+            print(f"✓ Wrote store {rsid}: {self.written[-1]}")
+
+        if self._header is None:
+            raise ValueError(f"No <nodes> section found in '{combined_file}'")
+        return self.written
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Split a combined configuration into per-store files")
+    parser.add_argument("--file", type=str, default="output/all_stores_config.xml",
+                       help="Combined configuration file (default: output/all_stores_config.xml)")
+    parser.add_argument("--output", type=str, default="output",
+                       help="Output directory (default: output)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Number of writer threads (default: 1)")
+    parser.add_argument("--validate", action="store_true",
+                       help="Validate each store while splitting")
+
+    args = parser.parse_args()
+
+    splitter = CombinedConfigSplitter(args.output, args.workers, ConfigValidator() if args.validate else None)
+    try:
+        files = splitter.split(args.file)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    for name in splitter.skipped:
+        print(f"   ⚠️  Skipped non-store node: {name}")
+    print(f"\n✓ Split {args.file} into {len(files)} store configuration(s) in {args.output}")
+
+    if args.validate:
+        invalid = [result for result in splitter.results if not result["valid"]]
+        print(f"📊 Validation: {len(splitter.results) - len(invalid)} valid, {len(invalid)} invalid")
+        if invalid:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Store Search Index
+
+In-memory index for picking a store by typing part of its ID, name, region
+or IP. Every store gets a set of search tokens (ID, name words, region and
+IP addresses), normalized with normalize_identifier so "ostra" finds
+"Östra". A sorted token list answers prefix queries with a binary search
+and a trigram index narrows substring queries down to a few candidates, so
+each keystroke stays fast with 10k+ stores. A query that extends the
+previous one only filters the previous result.
+
+Usage:
+    python store_search.py krok
+    python store_search.py ostra 10.17
+"""
+
+import argparse
+import json
+import re
+import sys
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from generate_store_config import StoreIpTable, normalize_identifier, store_region
+
+# Searching for a prefix of this many characters or more also matches inside tokens
+TRIGRAM = 3
+
+
+def search_key(text: str) -> str:
+    """Lower-case, diacritic-free form of the text; words are joined by '_'."""
+    return normalize_identifier(text).lower()
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+
+
+class StoreSearchIndex:
+    """Prefix and trigram index over store IDs, names, regions and IPs."""
+
+    def __init__(self):
+        self.labels: List[str] = []
+        self.store_ids: List[str] = []
+        # Sorted (token, store position) pairs for prefix lookups
+        self.tokens: List[Tuple[str, int]] = []
+        # Normalized "id name region ips" text per store, for substring checks
+        self.keys: List[str] = []
+        self.trigrams: Dict[str, Set[int]] = {}
+        self._last_query: Optional[List[str]] = None
+        self._last_result: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def build(self, stores: Iterable[Tuple[str, str, str, Iterable[str]]]) -> None:
+        """Index (store ID, name, region, IP addresses) tuples; labels read "<id> - <name>"."""
+        self.labels, self.store_ids, self.keys = [], [], []
+        tokens: List[Tuple[str, int]] = []
+        self.trigrams = {}
+        for position, (store_id, name, region, ips) in enumerate(stores):
+            self.labels.append(f"{store_id} - {name}")
+            self.store_ids.append(store_id)
+            words = {store_id.lower(), search_key(region)}
+            words.update(ip for ip in ips if ip)
+            words.update(re.split(r"[_.-]+", search_key(name)))
+            words.discard("")
+            tokens.extend((word, position) for word in words)
+            key = " ".join(sorted(words))
+            self.keys.append(key)
+            for trigram in trigrams(key):
+                self.trigrams.setdefault(trigram, set()).add(position)
+        tokens.sort()
+        self.tokens = tokens
+        self._last_query = None
+        self._last_result = []
+
+    def _prefix_matches(self, term: str) -> Set[int]:
+        """Stores with a token starting with the term."""
+        matches: Set[int] = set()
+        start = bisect_left(self.tokens, (term, -1))
+        for token, position in self.tokens[start:]:
+            if not token.startswith(term):
+                break
+            matches.add(position)
+        return matches
+
+    def _term_matches(self, term: str) -> Set[int]:
+        """Stores matching one term: a token prefix, or a substring of their text."""
+        matches = self._prefix_matches(term)
+        if len(term) >= TRIGRAM:
+            candidates: Optional[Set[int]] = None
+            for trigram in trigrams(term):
+                found = self.trigrams.get(trigram, set())
+                candidates = set(found) if candidates is None else candidates & found
+                if not candidates:
+                    break
+            matches.update(position for position in candidates or ()
+                           if term in self.keys[position])
+        return matches
+
+    def _matches(self, term: str, position: int) -> bool:
+        """Check one store against a term without the indexes (for narrowing a previous result)."""
+        key = self.keys[position]
+        if len(term) >= TRIGRAM:
+            return term in key
+        return key.startswith(term) or f" {term}" in key
+
+    def _narrows(self, terms: List[str]) -> bool:
+        """
+        Whether the query only extends the previous one. A term growing past
+        TRIGRAM characters switches from prefix to substring matching, which
+        can match stores the shorter term did not.
+        """
+        last_query = self._last_query
+        if not last_query or len(terms) < len(last_query):
+            return False
+        return all(term.startswith(last) and (len(last) >= TRIGRAM or len(term) < TRIGRAM)
+                   for term, last in zip(terms, last_query))
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Labels of the stores matching every word of the query, in mapping
+        order with exact ID matches first.
+        """
+        terms = [term for term in (search_key(word) for word in query.split()) if term]
+        if not terms:
+            self._last_query, self._last_result = terms, list(range(len(self.labels)))
+        elif self._narrows(terms):
+            # Typing on: every match of the new query matched the previous one
+            self._last_result = [position for position in self._last_result
+                                 if all(self._matches(term, position) for term in terms)]
+            self._last_query = terms
+        else:
+            result: Optional[Set[int]] = None
+            for term in sorted(terms, key=len, reverse=True):
+                matches = self._term_matches(term)
+                result = matches if result is None else result & matches
+                if not result:
+                    break
+            self._last_query, self._last_result = terms, sorted(result or ())
+
+        exact = []
+        if len(terms) == 1:
+            exact = [position for position in self._last_result if self.store_ids[position].lower() == terms[0]]
+        ordered = exact + [position for position in self._last_result if position not in exact]
+        if limit is not None:
+            ordered = ordered[:limit]
+        return [self.labels[position] for position in ordered]
+
+
+def main() -> None:
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description="Find stores by ID, name, region or IP")
+    parser.add_argument("query", nargs="+", help="Words to match (all must match)")
+    parser.add_argument("--mapping", type=str, default="config/mappings/store_wall_mapping.json",
+                       help="Store mapping JSON file")
+    parser.add_argument("--ip-mapping", type=str, default="config/mappings/store_ip_mapping.properties",
+                       help="Store IP mapping properties file")
+    parser.add_argument("--limit", type=int, default=50,
+                       help="Maximum number of stores to list (default: 50)")
+
+    args = parser.parse_args()
+
+    try:
+        with open(args.mapping, 'r', encoding='utf-8-sig') as f:
+            stores = json.load(f).get("stores", {})
+        try:
+            webui_ips = StoreIpTable.load(args.ip_mapping).entries
+        except OSError:
+            webui_ips = {}
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    index = StoreSearchIndex()
+    index.build((store_id, store.get("name", ""), store_region(store),
+                 list(store.get("walls", {}).values()) + [webui_ips.get(store_id, "")])
+                for store_id, store in stores.items())
+    results = index.search(" ".join(args.query), args.limit)
+    for label in results:
+        print(label)
+    if not results:
+        print("No matching stores")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
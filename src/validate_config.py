@@ -13,23 +13,265 @@ Usage:
 
 import xml.etree.ElementTree as ET
 import argparse
+import hashlib
+import json
+import os
+import re
 import sys
 import ipaddress
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Optional, Set
+from typing import List, Dict, Any, Tuple, Optional, Set, Iterable, Iterator
+
+from service_card_index import ServiceCardIndex
+
+DEFAULT_RULES_FILE = "config/validation_rules.json"
+
+# Sidecar holding the results of validate_directory, keyed by file content hash
+VALIDATION_CACHE_FILE = ".validation_cache.json"
+# Bump when the cache layout or the checks implemented in code change
+CACHE_VERSION = 1
+
+
+class _MessageFields(dict):
+    """Format fields that leave unknown placeholders in the message untouched."""
+
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+class RuleSet:
+    """
+    validation_rules.json compiled into per-file lookup tables.
+
+    Exact URLs resolve with one dict lookup and URL patterns and value checks
+    are precompiled regexes, so a change costs one dispatch plus one match
+    per check. Rule sets are cached per file and only recompiled when the
+    file's mtime or size changes.
+    """
+
+    _cache: Dict[str, Tuple[Tuple[int, int], "RuleSet"]] = {}
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version: Any = None
+        # sha256 of the rules file content, so edits without a version bump are noticed
+        self.digest = ""
+        self.required_systems: Dict[str, List[str]] = {}
+        self.mandatory_walls: List[str] = []
+        # file -> exact URL -> rule
+        self.exact: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # file -> [(compiled URL pattern, rule)], tried in file order
+        self.patterns: Dict[str, List[Tuple["re.Pattern", Dict[str, Any]]]] = {}
+        # file -> message for URLs no rule matches
+        self.unexpected: Dict[str, str] = {}
+
+    @staticmethod
+    def default_path() -> Path:
+        """Rules file below the working directory, else the one shipped with the tool."""
+        local = Path(DEFAULT_RULES_FILE)
+        if local.exists():
+            return local
+        return Path(__file__).resolve().parent.parent / DEFAULT_RULES_FILE
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "RuleSet":
+        """Return the compiled rules of a file, recompiling only if it changed."""
+        path = str(path) if path else str(cls.default_path())
+        stat = Path(path).stat()
+        key = str(Path(path).resolve())
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = cls._cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        try:
+            data = json.loads(content.decode('utf-8-sig'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"Invalid JSON in validation rules '{path}': {e}")
+        rule_set = cls(path)
+        rule_set.digest = hashlib.sha256(content).hexdigest()
+        rule_set._compile(data)
+        cls._cache[key] = (signature, rule_set)
+        return rule_set
+
+    def _compile(self, data: Dict[str, Any]) -> None:
+        """Build the lookup tables, rejecting malformed rules up front."""
+        if not isinstance(data, dict) or not isinstance(data.get("files"), dict):
+            raise ValueError(f"Validation rules '{self.path}' need a 'files' object")
+        self.version = data.get("version")
+        self.required_systems = {country: list(systems)
+                                 for country, systems in data.get("required_systems", {}).items()}
+        self.mandatory_walls = [str(wall) for wall in data.get("mandatory_walls", [])]
+
+        for file_name, file_rules in data["files"].items():
+            exact: Dict[str, Dict[str, Any]] = {}
+            patterns: List[Tuple["re.Pattern", Dict[str, Any]]] = []
+            for rule in file_rules.get("rules", []):
+                name = rule.get("name", "?")
+                try:
+                    compiled = {
+                        "name": name,
+                        "section": rule.get("section"),
+                        "checks": [self._compile_check(check) for check in rule.get("checks", [])],
+                    }
+                    if "url" in rule:
+                        exact[rule["url"]] = compiled
+                    elif "url_pattern" in rule:
+                        patterns.append((re.compile(rule["url_pattern"], re.DOTALL | re.ASCII), compiled))
+                    else:
+                        raise ValueError("needs 'url' or 'url_pattern'")
+                except (re.error, ValueError, KeyError, TypeError, AttributeError) as e:
+                    raise ValueError(f"Invalid rule '{name}' for {file_name} in '{self.path}': {e}")
+            self.exact[file_name] = exact
+            self.patterns[file_name] = patterns
+            self.unexpected[file_name] = file_rules.get("unexpected", f"Unexpected {file_name} URL: {{url}}")
+
+    @staticmethod
+    def _compile_check(check: Dict[str, Any]) -> Dict[str, Any]:
+        level = check.get("level", "error")
+        if level not in ("error", "warning"):
+            raise ValueError(f"unknown level '{level}'")
+        if "pattern" in check:
+            regex = re.compile(check["pattern"], re.DOTALL | re.ASCII)
+        elif "equals" in check:
+            regex = None
+        else:
+            raise ValueError("check needs 'pattern' or 'equals'")
+        cases = check.get("cases", {})
+        return {
+            "field": check.get("field", "value"),
+            "regex": regex,
+            "equals": check.get("equals"),
+            "case_field": cases.get("field", "value"),
+            "case_values": {str(key): value for key, value in cases.get("values", {}).items()},
+            "warning": level == "warning",
+            "message": check["message"],
+        }
+
+    def match(self, file_name: str, url: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, str]]:
+        """Return (rule, named URL groups) for a change, or (None, {}) if no rule applies."""
+        rule = self.exact.get(file_name, {}).get(url)
+        if rule is not None:
+            return rule, {}
+        for regex, rule in self.patterns.get(file_name, ()):
+            found = regex.fullmatch(url)
+            if found:
+                return rule, found.groupdict(default="")
+        return None, {}
+
+    def check(self, rule: Dict[str, Any], url: str, value: str,
+              groups: Dict[str, str]) -> List[Tuple[bool, str]]:
+        """Run a rule's checks and return (is_warning, message) for each failure."""
+        fields = _MessageFields(groups)
+        fields["url"] = url
+        fields["value"] = value
+        failures: List[Tuple[bool, str]] = []
+        for check in rule["checks"]:
+            subject = fields.get(check["field"], "")
+            if check["regex"] is not None:
+                if check["regex"].fullmatch(subject):
+                    continue
+            else:
+                expected = check["case_values"].get(fields.get(check["case_field"], ""), check["equals"])
+                fields["expected"] = expected.format_map(fields)
+                if subject == fields["expected"]:
+                    continue
+            failures.append((check["warning"], check["message"].format_map(fields)))
+        return failures
+
+
+def skip_wdm_stores_from_mapping(mapping_file: str) -> Set[str]:
+    """IDs of the stores with skip_wdm set in a store mapping file."""
+    with open(mapping_file, 'r', encoding='utf-8-sig') as f:
+        stores = json.load(f).get("stores", {})
+    return {store_id for store_id, store_data in stores.items() if store_data.get("skip_wdm", False)}
 
 
 class ConfigValidator:
     """Validator for store configuration files."""
     
-    def __init__(self):
+    def __init__(self, required_systems: Optional[Dict[str, List[str]]] = None,
+                 rules_file: Optional[str] = None, skip_wdm_stores: Optional[Iterable[str]] = None,
+                 store_systems: Optional[Dict[str, List[str]]] = None):
+        """
+        Rules come from rules_file (default: config/validation_rules.json).
+        store_systems maps a store ID to the systems of the template it was
+        generated from. For other stores, required_systems maps a country
+        to the systems its template requires and overrides the rules file;
+        stores whose nodes do not use their country's systems (built from
+        another template) and countries without an entry must declare every
+        system their store's nodes use. Stores in skip_wdm_stores keep their
+        template unchanged, so they need no wall changes.
+        """
+        self.rules = RuleSet.load(rules_file)
+        self.required_systems: Dict[str, List[str]] = dict(self.rules.required_systems)
+        if required_systems:
+            self.required_systems.update(required_systems)
+        self.skip_wdm_stores: Set[str] = set(skip_wdm_stores or ())
+        self.store_systems: Dict[str, List[str]] = dict(store_systems or {})
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        # Shared across files while validating a directory, to catch cross-store card reuse
+        self.card_index: Optional[ServiceCardIndex] = None
+        # (store ID, card numbers) indexed from the last validated file
+        self.card_stores: List[Tuple[str, List[str]]] = []
+        # Changes of the last validated root, grouped by file with their matched rule
+        self._matched_root: Optional[ET.Element] = None
+        self._matched: Dict[str, List[Tuple[ET.Element, str, str, Optional[Dict[str, Any]], Dict[str, str]]]] = {}
         
     def reset(self) -> None:
         """Reset error and warning lists."""
         self.errors = []
         self.warnings = []
+        self.card_stores = []
+        self._matched_root = None
+        self._matched = {}
+    
+    def matched_changes(self, root: ET.Element, file_name: str) -> List[Tuple[ET.Element, str, str, Optional[Dict[str, Any]], Dict[str, str]]]:
+        """
+        Return (change, url, value, rule, URL groups) for the changes of one
+        file. All changes are dispatched to their rule in a single pass over
+        the tree, shared by every component check.
+        """
+        if self._matched_root is not root:
+            matched: Dict[str, List[Tuple[ET.Element, str, str, Optional[Dict[str, Any]], Dict[str, str]]]] = {}
+            for change in root.iter("change"):
+                change_file = change.get("file")
+                if change_file is None:
+                    continue
+                url = change.get("url", "")
+                rule, groups = self.rules.match(change_file, url)
+                matched.setdefault(change_file, []).append((change, url, change.get("value", ""), rule, groups))
+            self._matched_root = root
+            self._matched = matched
+        return self._matched.get(file_name, [])
+    
+    def apply_rules(self, root: ET.Element, file_name: str, section: Optional[str] = None,
+                    report_unexpected: bool = True) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, str], bool]]:
+        """
+        Check the changes of one file (limited to a rule section if given),
+        recording failures as errors or warnings as it goes, and yield
+        (value, rule, URL groups, passed) for each matched change; passed
+        is False if an error-level check failed.
+        """
+        for _, url, value, rule, groups in self.matched_changes(root, file_name):
+            if rule is None:
+                if report_unexpected:
+                    self.warnings.append(self.rules.unexpected[file_name].format_map(_MessageFields(url=url)))
+                continue
+            if section is not None and rule["section"] != section:
+                continue
+            passed = True
+            for is_warning, message in self.rules.check(rule, url, value, groups):
+                if is_warning:
+                    self.warnings.append(message)
+                else:
+                    self.errors.append(message)
+                    passed = False
+            yield value, rule, groups, passed
     
     def validate_ip_address(self, ip: str) -> bool:
         """Validate IP address format."""
@@ -44,18 +286,7 @@ class ConfigValidator:
         try:
             tree = ET.parse(file_path)
             root = tree.getroot()
-            
-            if root.tag != "structure":
-                self.errors.append(f"Root element should be 'structure', found '{root.tag}'")
-                return False, root
-            
-            # Check required sections
-            required_sections = ["systems", "time-regimes", "central-is", "nodes"]
-            for section in required_sections:
-                if root.find(section) is None:
-                    self.errors.append(f"Missing required section: {section}")
-            
-            return len(self.errors) == 0, root
+            return self.validate_root_element(root), root
             
         except ET.ParseError as e:
             self.errors.append(f"XML parsing error: {e}")
@@ -64,72 +295,52 @@ class ConfigValidator:
             self.errors.append(f"File not found: {file_path}")
             return False, None
     
+    def validate_root_element(self, root: ET.Element) -> bool:
+        """Validate the root element and its required sections."""
+        if root.tag != "structure":
+            self.errors.append(f"Root element should be 'structure', found '{root.tag}'")
+            return False
+        
+        # Check required sections
+        required_sections = ["systems", "time-regimes", "central-is", "nodes"]
+        for section in required_sections:
+            if root.find(section) is None:
+                self.errors.append(f"Missing required section: {section}")
+        
+        return len(self.errors) == 0
+    
     def validate_wall_configurations(self, root: ET.Element) -> bool:
         """Validate wall configuration changes in the XML."""
-        wall_changes = root.findall(".//change[@file='wall-config.xml']")
-
-        if not wall_changes:
+        if not self.matched_changes(root, "wall-config.xml"):
+            store_ids = {node.get("rsid", "") for node in root.findall(".//node[@alias='GKR-Store']")}
+            if store_ids and store_ids <= self.skip_wdm_stores:
+                # skip_wdm stores deliberately keep the template's walls
+                return True
             self.errors.append("No wall configuration changes found")
             return False
 
         # Track wall IDs and IP addresses
         wall_ips: Dict[str, str] = {}
-        wall_types: Dict[str, str] = {}
-        mandatory_walls: Set[str] = {"1"}
+        mandatory_walls: Set[str] = set(self.rules.mandatory_walls)
         found_walls: Set[str] = set()
         found_wall_types: Set[str] = set()
 
-        for change in wall_changes:
-            url = change.get("url", "")
-            value = change.get("value", "")
-
-            # Extract wall ID from URL (format: wall-config.walls.X.clientId or wall-config.walls.X.wallType)
-            if "wall-config.walls." in url:
-                if ".clientId" in url:
-                    # Extract wall ID between "walls." and ".clientId"
-                    start = url.find("wall-config.walls.") + 18
-                    end = url.find(".clientId")
-                    wall_id = url[start:end]
-                    found_walls.add(wall_id)
-
-                    # Validate IP address
-                    if not self.validate_ip_address(value):
-                        self.errors.append(f"Invalid IP address '{value}' for wall {wall_id}")
-                    else:
-                        if value in wall_ips.values():
-                            self.errors.append(f"Duplicate IP address '{value}' found")
-                        wall_ips[wall_id] = value
-
-                elif ".wallType" in url:
-                    # Extract wall ID between "walls." and ".wallType"
-                    start = url.find("wall-config.walls.") + 18
-                    end = url.find(".wallType")
-                    wall_id = url[start:end]
-                    found_wall_types.add(wall_id)
-
-                    # Validate wall type format
-                    if not value.startswith("WALL_TYPE_"):
-                        self.errors.append(f"Invalid wall type '{value}' for wall {wall_id} (should start with 'WALL_TYPE_')")
-                    else:
-                        wall_types[wall_id] = value
-
-                    # Validate wall type matches wall ID convention
-                    if wall_id == "100" and value != "WALL_TYPE_DISPOSAL":
-                        self.errors.append(f"Wall 100 should have type 'WALL_TYPE_DISPOSAL', found '{value}'")
-                    elif wall_id != "100" and value != f"WALL_TYPE_{wall_id}":
-                        self.errors.append(f"Wall {wall_id} should have type 'WALL_TYPE_{wall_id}', found '{value}'")
-
-            elif "wall-config.wall-types." in url:
-                # Wall type description - will be validated in separate method
-                pass
-            else:
-                if "wall-config" in url:
-                    self.warnings.append(f"Unexpected wall-config URL: {url}")
+        for value, rule, groups, passed in self.apply_rules(root, "wall-config.xml", "walls"):
+            wall_id = groups.get("wall", "")
+            if rule["name"] == "wall_client_id":
+                found_walls.add(wall_id)
+                # Only well-formed IPs take part in the duplicate check
+                if passed:
+                    if value in wall_ips.values():
+                        self.errors.append(f"Duplicate IP address '{value}' found")
+                    wall_ips[wall_id] = value
+            elif rule["name"] == "wall_type":
+                found_wall_types.add(wall_id)
 
         # Check mandatory walls
         missing_walls = mandatory_walls - found_walls
         if missing_walls:
-            self.errors.append(f"Missing mandatory walls: {', '.join(missing_walls)}")
+            self.errors.append(f"Missing mandatory walls: {', '.join(sorted(missing_walls))}")
 
         # Check that each wall with clientId also has wallType
         missing_wall_types = found_walls - found_wall_types
@@ -154,93 +365,54 @@ class ConfigValidator:
 
     def validate_wall_type_descriptions(self, root: ET.Element) -> bool:
         """Validate wall type description changes in the XML."""
-        wall_type_desc_changes = root.findall(".//change[@file='wall-config.xml']")
-
-        found_descriptions: Dict[str, str] = {}
-
-        for change in wall_type_desc_changes:
-            url = change.get("url", "")
-            value = change.get("value", "")
-
-            # Check if it's a wall type description
-            if "wall-config.wall-types." in url and ".description" in url:
-                # Extract wall type between "wall-types." and ".description"
-                start = url.find("wall-config.wall-types.") + 23
-                end = url.find(".description")
-                wall_type = url[start:end]
-
-                # Validate wall type format
-                if not wall_type.startswith("WALL_TYPE_"):
-                    self.errors.append(f"Invalid wall type name '{wall_type}' (should start with 'WALL_TYPE_')")
-
-                # Check if description is empty
-                if not value or not value.strip():
-                    self.warnings.append(f"Empty description for wall type '{wall_type}'")
-                else:
-                    found_descriptions[wall_type] = value
+        # Unexpected wall-config URLs are already reported with the walls
+        list(self.apply_rules(root, "wall-config.xml", "wall_type_descriptions", report_unexpected=False))
 
         # Wall type descriptions are optional, so just return success
         return len(self.errors) == 0
 
     def validate_webui_configurations(self, root: ET.Element) -> bool:
         """Validate web-ui-config changes in the XML."""
-        webui_changes = root.findall(".//change[@file='web-ui-config.xml']")
-        
-        for change in webui_changes:
-            url = change.get("url", "")
-            value = change.get("value", "")
-            
-            # Check if it's the expected web-ui-config URL
-            if url == "webUiConfig.system.serverAddress":
-                # Validate URL format
-                if not value.startswith("http://") or ":8080/app-wdm" not in value:
-                    self.errors.append(f"Invalid web-ui-config URL format: {value}")
-            else:
-                self.warnings.append(f"Unexpected web-ui-config URL: {url}")
+        list(self.apply_rules(root, "web-ui-config.xml"))
         
         return len(self.errors) == 0
     
     def validate_service_card_configurations(self, root: ET.Element) -> bool:
         """Validate service-cards-config changes in the XML."""
-        service_card_changes = root.findall(".//change[@file='service-cards.xml']")
-        
-        if not service_card_changes:
+        if not self.matched_changes(root, "service-cards.xml"):
             # Service cards are optional, so just note it
             return True
         
-        for change in service_card_changes:
-            url = change.get("url", "")
-            value = change.get("value", "")
-            
-            # Check if it's the expected service-cards-config URL pattern
-            if "service-cards-config.service-cards.service-card" in url:
-                # Validate card number format (should be numeric string)
-                if not value or not value.isdigit():
-                    self.errors.append(f"Invalid service card number: {value}")
-            else:
-                self.warnings.append(f"Unexpected service-cards URL: {url}")
+        list(self.apply_rules(root, "service-cards.xml"))
+        
+        # Index cards per store: duplicates within a store are errors, reuse across stores a warning
+        card_changes = {change for change, _, _, rule, _ in self.matched_changes(root, "service-cards.xml")
+                        if rule is not None and rule["name"] == "service_card"}
+        index = self.card_index if self.card_index is not None else ServiceCardIndex()
+        for store_node in root.findall(".//node[@alias='GKR-Store']"):
+            store_id = store_node.get("rsid", "")
+            cards = [change.get("value", "") for change in store_node.iter("change") if change in card_changes]
+            if not cards:
+                continue
+            known_duplicates = len(index.duplicates)
+            index.add_store(store_id, cards)
+            for dup_store, card, count in index.duplicates[known_duplicates:]:
+                self.errors.append(f"Service card {card} listed {count} times for store {dup_store}")
+            self.card_stores.append((store_id, cards))
+        
+        if self.card_index is None:
+            for card, owners in index.shared_cards().items():
+                self.warnings.append(f"Service card {card} assigned to several stores: {', '.join(owners)}")
         
         return len(self.errors) == 0
     
     def validate_wdm_config_configurations(self, root: ET.Element) -> bool:
         """Validate wdm-config.properties changes in the XML."""
-        wdm_config_changes = root.findall(".//change[@file='wdm-config.properties']")
-        
-        if not wdm_config_changes:
+        if not self.matched_changes(root, "wdm-config.properties"):
             self.warnings.append("No wdm-config.properties changes found")
             return True
         
-        for change in wdm_config_changes:
-            url = change.get("url", "")
-            value = change.get("value", "")
-            
-            # Check if it's the expected wdm-config URL
-            if url == "remote-services.businessUnitId":
-                # Validate businessUnitId format (should be numeric string)
-                if not value or not value.isdigit():
-                    self.errors.append(f"Invalid businessUnitId: {value}")
-            else:
-                self.warnings.append(f"Unexpected wdm-config URL: {url}")
+        list(self.apply_rules(root, "wdm-config.properties"))
         
         return len(self.errors) == 0
     
@@ -259,6 +431,10 @@ class ConfigValidator:
         if is_combined:
             print(f"   📦 Detected combined configuration with {len(store_nodes)} stores")
         
+        # rsids and unique-names must not repeat anywhere in the file
+        seen_rsids: Set[str] = set()
+        seen_unique_names: Set[str] = set()
+        
         # Validate each store node individually
         for i, store_node in enumerate(store_nodes):
             store_id = store_node.get("rsid", f"store_{i}")
@@ -269,6 +445,18 @@ class ConfigValidator:
                 if not store_node.get(attr):
                     self.errors.append(f"Store node {store_id} missing required attribute: {attr}")
             
+            if store_node.get("rsid"):
+                if store_id in seen_rsids:
+                    self.errors.append(f"Duplicate rsid '{store_id}'")
+                seen_rsids.add(store_id)
+            
+            for node in store_node.iter("node"):
+                unique_name = node.get("unique-name")
+                if unique_name:
+                    if unique_name in seen_unique_names:
+                        self.errors.append(f"Duplicate unique-name '{unique_name}' in store {store_id}")
+                    seen_unique_names.add(unique_name)
+            
             # Check for CSE-wdm node
             wdm_nodes = store_node.findall(".//node[@alias='CSE-wdm']")
             if not wdm_nodes:
@@ -284,10 +472,20 @@ class ConfigValidator:
         if systems is None:
             return False
         
-        required_systems = [
-            "GKR-Store", "CSE-sdc-store_SE", "CSE-pos-server-STORE_SE",
-            "GKR-mwb-store", "CSE-lps-store", "CSE-wdm"
-        ]
+        # Each store's template decides which systems are required
+        required_systems: List[str] = []
+        for store_node in root.findall(".//node[@alias='GKR-Store']"):
+            node_systems = ["GKR-Store"] + [node.get("alias", "") for node in store_node.findall("node")]
+            country_systems = self.required_systems.get(store_node.get("country", ""))
+            store_systems = self.store_systems.get(store_node.get("rsid", ""))
+            if not store_systems:
+                # A country's systems only apply to stores built from that country's template
+                uses_country_template = (country_systems is not None
+                                         and all(system in node_systems for system in country_systems))
+                store_systems = country_systems if uses_country_template else node_systems
+            required_systems.extend(system for system in store_systems if system not in required_systems)
+        if not required_systems:
+            required_systems = self.required_systems.get("SE", ["GKR-Store"])
         
         found_systems = [system.get("alias") for system in systems.findall("system")]
         
@@ -313,6 +511,26 @@ class ConfigValidator:
                 "warnings": self.warnings.copy()
             }
         
+        return self.validate_components(root, file_path)
+    
+    def validate_element(self, root: ET.Element, label: str = "<in-memory>") -> Dict[str, Any]:
+        """Validate an in-memory configuration tree without writing or re-reading a file."""
+        self.reset()
+        
+        print(f"🔍 Validating: {label}")
+        
+        if not self.validate_root_element(root):
+            return {
+                "file": label,
+                "valid": False,
+                "errors": self.errors.copy(),
+                "warnings": self.warnings.copy()
+            }
+        
+        return self.validate_components(root, label)
+    
+    def validate_components(self, root: ET.Element, label: str) -> Dict[str, Any]:
+        """Run all component checks on a structurally valid root and report the result."""
         # Validate components
         self.validate_systems(root)
         self.validate_store_node(root)
@@ -341,14 +559,46 @@ class ConfigValidator:
                 print(f"      - {warning}")
         
         return {
-            "file": file_path,
+            "file": label,
             "valid": is_valid,
             "errors": self.errors.copy(),
             "warnings": self.warnings.copy()
         }
     
-    def validate_directory(self, directory: str) -> List[Dict[str, Any]]:
-        """Validate all XML files in a directory."""
+    def cache_version(self) -> str:
+        """Everything besides file content that cached results depend on."""
+        return json.dumps([CACHE_VERSION, self.rules.version, self.rules.digest, self.required_systems,
+                           sorted(self.skip_wdm_stores), self.store_systems], sort_keys=True)
+    
+    def load_cache(self, cache_file: Path) -> Dict[str, Any]:
+        """Return file name -> cached entry, or {} if the cache is missing or stale."""
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict) or cache.get("version") != self.cache_version():
+            return {}
+        return cache.get("files", {})
+    
+    def save_cache(self, cache_file: Path, entries: Dict[str, Any]) -> None:
+        """Write the cache sidecar atomically."""
+        temp_file = cache_file.with_name(cache_file.name + ".tmp")
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.cache_version(), "files": entries}, f,
+                          ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            print(f"⚠️  Warning: Could not write validation cache '{cache_file}': {e}")
+    
+    def validate_directory(self, directory: str, use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        Validate all XML files in a directory.
+        
+        Results are cached in a sidecar file keyed by each file's content
+        hash and the rules file content, so unchanged files are not parsed again.
+        """
         dir_path = Path(directory)
         
         if not dir_path.exists():
@@ -363,10 +613,54 @@ class ConfigValidator:
         
         print(f"🔍 Validating {len(xml_files)} files in: {directory}")
         
+        cache_file = dir_path / VALIDATION_CACHE_FILE
+        cache = self.load_cache(cache_file) if use_cache else {}
+        entries: Dict[str, Any] = {}
+        cached_count = 0
+        
         results: List[Dict[str, Any]] = []
-        for xml_file in xml_files:
-            result = self.validate_file(str(xml_file))
-            results.append(result)
+        file_card_stores: List[List[str]] = []
+        self.card_index = ServiceCardIndex()
+        try:
+            for xml_file in xml_files:
+                digest = hashlib.sha256(xml_file.read_bytes()).hexdigest()
+                entry = cache.get(xml_file.name)
+                if entry is not None and entry.get("sha256") == digest:
+                    # Unchanged: replay its cards so cross-store reuse is still seen
+                    card_stores = [(store_id, cards) for store_id, cards in entry["cards"]]
+                    for store_id, cards in card_stores:
+                        self.card_index.add_store(store_id, cards)
+                    result = {"file": str(xml_file), "valid": entry["valid"],
+                              "errors": list(entry["errors"]), "warnings": list(entry["warnings"])}
+                    cached_count += 1
+                else:
+                    result = self.validate_file(str(xml_file))
+                    card_stores = list(self.card_stores)
+                    entry = {"sha256": digest, "valid": result["valid"], "errors": list(result["errors"]),
+                             "warnings": list(result["warnings"]), "cards": card_stores}
+                entries[xml_file.name] = entry
+                results.append(result)
+                file_card_stores.append([store_id for store_id, _ in card_stores])
+            card_index = self.card_index
+        finally:
+            self.card_index = None
+        
+        if use_cache:
+            if cached_count:
+                print(f"♻️  {cached_count} unchanged file(s) taken from the validation cache")
+            if entries != cache:
+                self.save_cache(cache_file, entries)
+        
+        # Cross-store card reuse can only be seen once every file has been indexed
+        shared = card_index.shared_cards()
+        if shared:
+            print(f"\n💳 {len(shared)} service card(s) assigned to several stores:")
+            for card, owners in shared.items():
+                print(f"   ⚠️  Service card {card}: stores {', '.join(owners)}")
+            for result, store_ids in zip(results, file_card_stores):
+                for store_id in store_ids:
+                    result["warnings"].extend(f"Store {store_id}: {warning}"
+                                              for warning in card_index.store_problems(store_id)[1])
         
         # Summary
         valid_count = sum(1 for r in results if r["valid"])
@@ -390,6 +684,8 @@ Examples:
   python validate_config.py --file output/store_9999_config.xml
   python validate_config.py --directory output
   python validate_config.py --directory output --summary
+  python validate_config.py --directory output --no-cache
+  python validate_config.py --directory output --mapping config/mappings/store_wall_mapping.json
         """
     )
     
@@ -399,6 +695,12 @@ Examples:
                        help="Validate all XML files in a directory")
     parser.add_argument("--summary", action="store_true",
                        help="Show only summary for directory validation")
+    parser.add_argument("--no-cache", action="store_true",
+                       help=f"Revalidate every file, ignoring the {VALIDATION_CACHE_FILE} results cache")
+    parser.add_argument("--rules", type=str,
+                       help=f"Validation rules file (default: {DEFAULT_RULES_FILE})")
+    parser.add_argument("--mapping", type=str,
+                       help="Store mapping whose skip_wdm stores need no wall changes")
     
     args = parser.parse_args()
     
@@ -406,7 +708,18 @@ Examples:
         parser.print_help()
         sys.exit(1)
     
-    validator = ConfigValidator()
+    try:
+        validator = ConfigValidator(rules_file=args.rules)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error loading validation rules: {e}")
+        sys.exit(1)
+    
+    if args.mapping:
+        try:
+            validator.skip_wdm_stores = skip_wdm_stores_from_mapping(args.mapping)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error loading store mapping: {e}")
+            sys.exit(1)
     
     try:
         if args.file:
@@ -415,7 +728,7 @@ Examples:
                 sys.exit(1)
                 
         elif args.directory:
-            results = validator.validate_directory(args.directory)
+            results = validator.validate_directory(args.directory, use_cache=not args.no_cache)
             
             if not args.summary:
                 # Show detailed results